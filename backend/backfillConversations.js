@@ -0,0 +1,61 @@
+const mongoose = require("mongoose");
+const dotenv = require("dotenv");
+const Conversation = require("./models/Conversation");
+const Message = require("./models/Message");
+
+dotenv.config();
+
+const BATCH_SIZE = 1000;
+
+// Set Conversation.unread from undelivered messages, for conversations that
+// predate the maintained counters
+// Usage: node backfillConversations.js
+async function run() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI, {
+      useNewUrlParser: true,
+      useUnifiedTopology: true,
+    });
+    console.log("✅ Connected to MongoDB");
+
+    await Conversation.syncIndexes();
+    await Message.syncIndexes();
+    console.log("✅ Conversation and message indexes in sync");
+
+    const cursor = Conversation.find().select("participants").lean().cursor();
+    let updated = 0;
+    let ops = [];
+    const flush = async () => {
+      if (ops.length === 0) return;
+      await Conversation.bulkWrite(ops, { ordered: false, timestamps: false });
+      updated += ops.length;
+      ops = [];
+      console.log(`⏳ ${updated} conversations backfilled`);
+    };
+
+    for await (const convo of cursor) {
+      // A participant's unread count = undelivered messages from anyone else
+      const counts = await Message.aggregate([
+        { $match: { conversationId: convo._id, delivered: false } },
+        { $group: { _id: "$sender", count: { $sum: 1 } } },
+      ]);
+      const unread = {};
+      convo.participants.forEach((participant) => {
+        unread[participant.toString()] = counts
+          .filter((c) => c._id.toString() !== participant.toString())
+          .reduce((sum, c) => sum + c.count, 0);
+      });
+      ops.push({ updateOne: { filter: { _id: convo._id }, update: { $set: { unread } } } });
+      if (ops.length >= BATCH_SIZE) await flush();
+    }
+    await flush();
+
+    console.log(`🎉 Backfilled unread counters on ${updated} conversations`);
+    process.exit(0);
+  } catch (error) {
+    console.error("❌ Conversation backfill error:", error);
+    process.exit(1);
+  }
+}
+
+run();
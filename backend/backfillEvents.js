@@ -0,0 +1,93 @@
+const mongoose = require("mongoose");
+const dotenv = require("dotenv");
+const Event = require("./models/Event");
+const EventAttendance = require("./models/EventAttendance");
+const User = require("./models/User");
+
+dotenv.config();
+
+const BATCH_SIZE = 1000;
+
+// Fill tagsNormalized/startsAt on events created before those fields existed,
+// and move joins recorded in User.joinedEvents into EventAttendance
+// Usage: node backfillEvents.js
+async function run() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI, {
+      useNewUrlParser: true,
+      useUnifiedTopology: true,
+    });
+    console.log("✅ Connected to MongoDB");
+
+    await Event.syncIndexes();
+    console.log("✅ Event indexes in sync");
+
+    const cursor = Event.find({ $or: [{ startsAt: { $exists: false } }, { tagsNormalized: { $exists: false } }] })
+      .select("date time tags")
+      .lean()
+      .cursor();
+
+    let updated = 0;
+    let ops = [];
+    for await (const event of cursor) {
+      ops.push({
+        updateOne: {
+          filter: { _id: event._id },
+          update: {
+            $set: {
+              tagsNormalized: Event.normalizeTags(event.tags),
+              startsAt: Event.parseStartsAt(event.date, event.time),
+            },
+          },
+        },
+      });
+      if (ops.length >= BATCH_SIZE) {
+        await Event.bulkWrite(ops, { ordered: false });
+        updated += ops.length;
+        ops = [];
+        console.log(`⏳ ${updated} events backfilled`);
+      }
+    }
+    if (ops.length > 0) {
+      await Event.bulkWrite(ops, { ordered: false });
+      updated += ops.length;
+    }
+
+    console.log(`✅ Backfilled ${updated} events`);
+
+    await EventAttendance.syncIndexes();
+    const users = User.find({ "joinedEvents.0": { $exists: true } }).select("joinedEvents").lean().cursor();
+    let joins = 0;
+    for await (const user of users) {
+      const upserts = user.joinedEvents.map((eventId) => ({
+        updateOne: {
+          filter: { eventId, userId: user._id },
+          update: { $setOnInsert: { joinedAt: new Date() } },
+          upsert: true,
+        },
+      }));
+      await EventAttendance.bulkWrite(upserts, { ordered: false });
+      joins += upserts.length;
+    }
+    console.log(`✅ Copied ${joins} joins into EventAttendance`);
+
+    // Recount attendees from the attendance rows
+    const counts = await EventAttendance.aggregate([{ $group: { _id: "$eventId", count: { $sum: 1 } } }]);
+    await Event.updateMany({}, { $set: { attendeeCount: 0 } });
+    for (let i = 0; i < counts.length; i += BATCH_SIZE) {
+      await Event.bulkWrite(
+        counts.slice(i, i + BATCH_SIZE).map(({ _id, count }) => ({
+          updateOne: { filter: { _id }, update: { $set: { attendeeCount: count } } },
+        })),
+        { ordered: false }
+      );
+    }
+    console.log(`🎉 Attendee counts set for ${counts.length} events`);
+    process.exit(0);
+  } catch (error) {
+    console.error("❌ Event backfill error:", error);
+    process.exit(1);
+  }
+}
+
+run();
@@ -0,0 +1,76 @@
+const mongoose = require("mongoose");
+const dotenv = require("dotenv");
+const User = require("./models/User");
+const MoodCheckin = require("./models/MoodCheckin");
+const MoodStats = require("./models/MoodStats");
+const { dayKey, summarizeCheckins } = require("./utils/moodStats");
+
+dotenv.config();
+
+// Copy User.moodHistory into MoodCheckin (one check-in per day, the first
+// one wins) and rebuild each user's MoodStats from their check-ins.
+// Safe to re-run. With --unset, moodHistory is removed once copied.
+// Usage: node backfillMoodCheckins.js [--unset]
+async function run() {
+  const unset = process.argv.includes("--unset");
+  try {
+    await mongoose.connect(process.env.MONGODB_URI, {
+      useNewUrlParser: true,
+      useUnifiedTopology: true,
+    });
+    console.log("✅ Connected to MongoDB");
+
+    await MoodCheckin.syncIndexes();
+    await MoodStats.syncIndexes();
+    console.log("✅ Mood check-in and stats indexes in sync");
+
+    const cursor = User.find({ "moodHistory.0": { $exists: true } })
+      .select("moodHistory")
+      .lean()
+      .cursor();
+    let users = 0;
+    let copied = 0;
+
+    for await (const user of cursor) {
+      const byDay = new Map();
+      user.moodHistory
+        .filter((entry) => entry.date)
+        .sort((a, b) => new Date(a.date) - new Date(b.date))
+        .forEach((entry) => {
+          const day = dayKey(new Date(entry.date));
+          if (byDay.has(day)) return;
+          byDay.set(day, {
+            userId: user._id,
+            day,
+            mood: entry.mood || "Neutral",
+            tip: entry.tip || "",
+            createdAt: entry.date,
+          });
+        });
+
+      try {
+        const inserted = await MoodCheckin.insertMany(Array.from(byDay.values()), { ordered: false });
+        copied += inserted.length;
+      } catch (error) {
+        // Days already in MoodCheckin (an earlier run, or live check-ins)
+        if (error.code !== 11000) throw error;
+        copied += error.insertedDocs ? error.insertedDocs.length : 0;
+      }
+
+      const checkins = await MoodCheckin.find({ userId: user._id }).select("day mood").sort({ day: 1 }).lean();
+      await MoodStats.replaceOne({ userId: user._id }, { userId: user._id, ...summarizeCheckins(checkins) }, { upsert: true });
+      if (unset) await User.updateOne({ _id: user._id }, { $unset: { moodHistory: 1 } }, { timestamps: false });
+
+      users++;
+      if (users % 1000 === 0) console.log(`⏳ ${users} users backfilled`);
+    }
+
+    console.log(`🎉 Copied ${copied} check-ins for ${users} users${unset ? " and removed moodHistory" : ""}`);
+    process.exit(0);
+  } catch (error) {
+    console.error("❌ Mood check-in backfill error:", error);
+    process.exit(1);
+  }
+}
+
+run();
@@ -0,0 +1,106 @@
+/**
+ * Benchmark: GET /api/events recommendation query, full scan + JS filter
+ * vs the single indexed query
+ *
+ * Seeds a scratch collection (bench_events, dropped afterwards) with the
+ * Event schema and indexes, then compares per request:
+ *   - time: legacy find().sort({date}) + tag filter in JS + slice, vs
+ *     find({ tagsNormalized: $in, startsAt: $gte }).sort().limit()
+ *   - documents examined, from explain('executionStats')
+ *
+ * Needs MONGODB_URI; usage: node benchmarks/eventQueries.js [events]
+ */
+const mongoose = require('mongoose');
+const dotenv = require('dotenv');
+const Event = require('../models/Event');
+
+dotenv.config();
+
+const EVENTS = parseInt(process.argv[2]) || 100000;
+const RUNS = 20;
+const LIMIT = 5;
+const TAGS = Array.from({ length: 200 }, (_, i) => `Tag${i}`);
+const INTERESTS = ['Tag3', 'tag42', 'TAG150'];
+
+const BenchEvent = mongoose.model('BenchEvent', Event.schema, 'bench_events');
+
+let seed = 11;
+function random() {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+}
+
+function makeEvent(i) {
+  // Two years either side of today, so about half are upcoming
+  const start = new Date(Date.now() + (random() - 0.5) * 4 * 365 * 86400000);
+  const date = `${start.getFullYear()}-${start.getMonth() + 1}-${start.getDate()}`;
+  const time = `${1 + Math.floor(random() * 12)}:00 ${random() < 0.5 ? 'AM' : 'PM'}`;
+  const tags = Array.from({ length: 1 + Math.floor(random() * 4) }, () => TAGS[Math.floor(random() * TAGS.length)]);
+  return {
+    title: `Event ${i}`,
+    date,
+    time,
+    location: 'Hall A',
+    tags,
+    tagsNormalized: Event.normalizeTags(tags),
+    startsAt: Event.parseStartsAt(date, time),
+    description: ''
+  };
+}
+
+function legacyFind() {
+  return BenchEvent.find().sort({ date: 1 }).lean();
+}
+
+async function legacyQuery() {
+  const allEvents = await legacyFind();
+  return allEvents
+    .filter(event => event.tags.some(tag =>
+      INTERESTS.some(interest => interest.toLowerCase() === tag.toLowerCase())
+    ))
+    .slice(0, LIMIT);
+}
+
+function indexedQuery() {
+  const today = new Date();
+  today.setHours(0, 0, 0, 0);
+  return BenchEvent.find({ tagsNormalized: { $in: Event.normalizeTags(INTERESTS) }, startsAt: { $gte: today } })
+    .select('-tagsNormalized')
+    .sort({ startsAt: 1, _id: 1 })
+    .limit(LIMIT)
+    .lean();
+}
+
+async function time(label, fn, find) {
+  await fn();
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < RUNS; i++) await fn();
+  const ms = Number(process.hrtime.bigint() - start) / 1e6 / RUNS;
+  const stats = (await find().explain('executionStats')).executionStats;
+  console.log(`  ${label.padEnd(28)} ${ms.toFixed(2).padStart(10)} ms  ${String(stats.totalDocsExamined).padStart(8)} docs examined`);
+}
+
+async function run() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI);
+    await BenchEvent.collection.drop().catch(() => {});
+    await BenchEvent.syncIndexes();
+
+    for (let i = 0; i < EVENTS; i += 5000) {
+      const batch = Array.from({ length: Math.min(5000, EVENTS - i) }, (_, j) => makeEvent(i + j));
+      await BenchEvent.collection.insertMany(batch, { ordered: false });
+    }
+    console.log(`${EVENTS.toLocaleString()} events, ${TAGS.length} tags, interests ${INTERESTS.join(', ')}\n`);
+
+    await time('before: full scan + JS', legacyQuery, legacyFind);
+    await time('after: indexed query', indexedQuery, indexedQuery);
+  } catch (error) {
+    console.error('Benchmark error:', error);
+    process.exitCode = 1;
+  } finally {
+    await BenchEvent.collection.drop().catch(() => {});
+    await mongoose.disconnect();
+  }
+}
+
+run();
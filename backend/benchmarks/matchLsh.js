@@ -0,0 +1,125 @@
+/**
+ * Benchmark: MinHash/LSH approximate matching vs the exact scorer
+ *
+ * For each (bands, rows) setting, builds the LSH index over synthetic
+ * clustered profiles and reports, averaged over sample queries:
+ *   - recall@k: share of the approximate top-k that the exact top-k would
+ *     also accept (score >= exact k-th score, so tied scores count as hits)
+ *   - shortlist: candidates rescored exactly, as % of all users
+ *   - ms/query for exact full scan vs LSH + rescoring
+ *
+ * Usage: node benchmarks/matchLsh.js [users] [k]
+ */
+const TopK = require('../utils/topK');
+const { Interner, toSparseVector, norm } = require('../utils/sparseVector');
+const { scorePair, compareRanked } = require('../utils/matchScoring');
+const { MinHashLSH, profileLshTokens } = require('../utils/minhashLsh');
+
+const USERS = parseInt(process.argv[2]) || 50000;
+const K = parseInt(process.argv[3]) || 10;
+const QUERIES = 200;
+const CLUSTERS = 40;
+const SETTINGS = [
+  { bands: 8, rows: 2 },
+  { bands: 16, rows: 2 },
+  { bands: 32, rows: 2 },
+  { bands: 16, rows: 3 },
+  { bands: 32, rows: 3 },
+  { bands: 64, rows: 3 }
+];
+
+let seed = 7;
+function random() {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+}
+
+// Each cluster (e.g. "web dev", "ML") favours its own slice of the vocabulary
+function pickItems(prefix, cluster, count) {
+  const items = new Set();
+  while (items.size < count) {
+    const local = random() < 0.6;
+    const id = local ? cluster * 10 + Math.floor(random() * 20) : Math.floor(random() * CLUSTERS * 10);
+    items.add(`${prefix}${id}`);
+  }
+  return Array.from(items);
+}
+
+const vocab = { skills: new Interner(), interests: new Interner(), availability: new Interner() };
+const SLOTS = ['Morning', 'Afternoon', 'Evening', 'Night', 'Weekends', 'Flexible'];
+const BRANCHES = ['CSE', 'CSH', 'CSD', 'CSA', 'ECE', 'ECI'];
+
+function makeProfile(seq) {
+  const cluster = Math.floor(random() * CLUSTERS);
+  const skillVec = toSparseVector(pickItems('skill', cluster, 2 + Math.floor(random() * 5)), vocab.skills, true);
+  const interestVec = toSparseVector(pickItems('interest', cluster, 1 + Math.floor(random() * 4)), vocab.interests, true);
+  const slots = SLOTS.filter(() => random() < 0.3);
+  const availabilityVec = toSparseVector(slots, vocab.availability, true);
+  return {
+    id: String(seq),
+    seq,
+    skillVec,
+    interestVec,
+    availabilityVec,
+    skillNorm: norm(skillVec),
+    interestNorm: norm(interestVec),
+    branch: BRANCHES[Math.floor(random() * BRANCHES.length)],
+    year: 1 + Math.floor(random() * 4)
+  };
+}
+
+function rank(query, candidates) {
+  const heap = new TopK(K, compareRanked);
+  for (const profile of candidates) {
+    if (profile.id !== query.id) heap.push({ profile, seq: profile.seq, score: scorePair(query, profile) });
+  }
+  return heap.toSortedArray();
+}
+
+function elapsedMs(start) {
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+const profiles = Array.from({ length: USERS }, (_, i) => makeProfile(i));
+const byId = new Map(profiles.map(p => [p.id, p]));
+const queries = Array.from({ length: QUERIES }, () => profiles[Math.floor(random() * USERS)]);
+
+let start = process.hrtime.bigint();
+const exact = queries.map(query => rank(query, profiles));
+const exactMs = elapsedMs(start) / QUERIES;
+
+console.log(`${USERS.toLocaleString()} users, k=${K}, ${QUERIES} queries`);
+console.log(`exact full scan: ${exactMs.toFixed(2)} ms/query\n`);
+console.log('bands rows  recall@k  shortlist   ms/query  build ms');
+
+for (const { bands, rows } of SETTINGS) {
+  const lsh = new MinHashLSH({ bands, rows });
+  start = process.hrtime.bigint();
+  profiles.forEach(profile => lsh.add(profile.id, profileLshTokens(profile)));
+  const buildMs = elapsedMs(start);
+
+  let recall = 0;
+  let shortlist = 0;
+  start = process.hrtime.bigint();
+  const approx = queries.map(query => {
+    const candidates = lsh.query(profileLshTokens(query));
+    shortlist += candidates.size;
+    return rank(query, Array.from(candidates, id => byId.get(id)));
+  });
+  const approxMs = elapsedMs(start) / QUERIES;
+
+  approx.forEach((results, q) => {
+    const expected = exact[q];
+    const threshold = expected[expected.length - 1].score;
+    const hits = results.filter(result => result.score >= threshold).length;
+    recall += Math.min(hits, expected.length) / expected.length;
+  });
+
+  console.log(
+    `${String(bands).padStart(5)} ${String(rows).padStart(4)}` +
+    `  ${(recall / QUERIES).toFixed(3).padStart(8)}` +
+    `  ${((shortlist / QUERIES / USERS) * 100).toFixed(2).padStart(8)}%` +
+    `  ${approxMs.toFixed(2).padStart(9)}` +
+    `  ${buildMs.toFixed(0).padStart(8)}`
+  );
+}
@@ -0,0 +1,146 @@
+/**
+ * Micro-benchmark: dense binary vectors vs sparse Int32Array vectors
+ *
+ * Scores one query profile against every synthetic profile, once with the
+ * dense vocabulary-sized arrays the match route used to build and once
+ * with interned sparse vectors. Both paths must produce identical scores.
+ *
+ * Usage: node benchmarks/matchVectors.js [profileCounts...]
+ *   e.g. node benchmarks/matchVectors.js 10000 100000
+ */
+const { Interner, toSparseVector, norm, intersect, cosine } = require('../utils/sparseVector');
+
+const SKILL_VOCAB = 400;
+const INTEREST_VOCAB = 200;
+const MAX_ITEMS = 8;
+const QUERIES = 5;
+
+// Deterministic PRNG so runs are comparable
+let seed = 42;
+function random() {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+}
+
+function pickItems(prefix, vocabSize) {
+  const count = 1 + Math.floor(random() * MAX_ITEMS);
+  const items = new Set();
+  while (items.size < count) {
+    // Skewed towards popular tokens, like real skill lists
+    items.add(`${prefix}${Math.floor(vocabSize * random() * random())}`);
+  }
+  return Array.from(items);
+}
+
+function makeProfiles(count) {
+  const profiles = [];
+  for (let i = 0; i < count; i++) {
+    profiles.push({
+      skills: pickItems('skill', SKILL_VOCAB),
+      interests: pickItems('interest', INTEREST_VOCAB)
+    });
+  }
+  return profiles;
+}
+
+// --- Dense implementation (previous routes/match.js) ---
+
+function toBinaryVector(items, allUniqueItems) {
+  return allUniqueItems.map(item => items.includes(item) ? 1 : 0);
+}
+
+function dotProduct(vecA, vecB) {
+  return vecA.reduce((sum, a, i) => sum + a * vecB[i], 0);
+}
+
+function magnitude(vector) {
+  return Math.sqrt(vector.reduce((sum, val) => sum + val * val, 0));
+}
+
+function cosineSimilarity(vecA, vecB) {
+  const magA = magnitude(vecA);
+  const magB = magnitude(vecB);
+  if (magA === 0 || magB === 0) return 0;
+  return dotProduct(vecA, vecB) / (magA * magB);
+}
+
+function denseScores(query, profiles) {
+  const allSkills = new Set(query.skills);
+  const allInterests = new Set(query.interests);
+  profiles.forEach(p => {
+    p.skills.forEach(s => allSkills.add(s));
+    p.interests.forEach(i => allInterests.add(i));
+  });
+  const skillsArray = Array.from(allSkills);
+  const interestsArray = Array.from(allInterests);
+
+  const querySkills = toBinaryVector(query.skills, skillsArray);
+  const queryInterests = toBinaryVector(query.interests, interestsArray);
+
+  return profiles.map(p => {
+    const skillsCos = cosineSimilarity(querySkills, toBinaryVector(p.skills, skillsArray));
+    const interestsCos = cosineSimilarity(queryInterests, toBinaryVector(p.interests, interestsArray));
+    const sharedSkills = query.skills.filter(s => p.skills.includes(s)).length;
+    const sharedInterests = query.interests.filter(i => p.interests.includes(i)).length;
+    return skillsCos + interestsCos + sharedSkills + sharedInterests;
+  });
+}
+
+// --- Sparse implementation (utils/sparseVector.js) ---
+
+function buildSparse(profiles, vocab) {
+  return profiles.map(p => {
+    const skillVec = toSparseVector(p.skills, vocab.skills, true);
+    const interestVec = toSparseVector(p.interests, vocab.interests, true);
+    return { skillVec, interestVec, skillNorm: norm(skillVec), interestNorm: norm(interestVec) };
+  });
+}
+
+function sparseScores(query, profiles) {
+  return profiles.map(p => {
+    const skills = intersect(query.skillVec, p.skillVec);
+    const interests = intersect(query.interestVec, p.interestVec);
+    return cosine(skills.distinct, query.skillNorm, p.skillNorm) +
+      cosine(interests.distinct, query.interestNorm, p.interestNorm) +
+      skills.total + interests.total;
+  });
+}
+
+function timeQueries(fn) {
+  const start = process.hrtime.bigint();
+  let result;
+  for (let q = 0; q < QUERIES; q++) result = fn(q);
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+  return { perQueryMs: elapsedMs / QUERIES, result };
+}
+
+function heapMB() {
+  return process.memoryUsage().heapUsed / 1024 / 1024;
+}
+
+function run(count) {
+  const profiles = makeProfiles(count);
+  const queries = makeProfiles(QUERIES);
+
+  const heapBefore = heapMB();
+  const buildStart = process.hrtime.bigint();
+  const vocab = { skills: new Interner(), interests: new Interner() };
+  const sparseProfiles = buildSparse(profiles, vocab);
+  const sparseQueries = buildSparse(queries, vocab);
+  const buildMs = Number(process.hrtime.bigint() - buildStart) / 1e6;
+  const sparseHeap = heapMB() - heapBefore;
+
+  const dense = timeQueries(q => denseScores(queries[q], profiles));
+  const sparse = timeQueries(q => sparseScores(sparseQueries[q], sparseProfiles));
+
+  const mismatches = dense.result.filter((score, i) => score !== sparse.result[i]).length;
+
+  console.log(`\n${count.toLocaleString()} profiles (vocab: ${vocab.skills.size} skills, ${vocab.interests.size} interests)`);
+  console.log(`  dense   ${dense.perQueryMs.toFixed(1)} ms/query`);
+  console.log(`  sparse  ${sparse.perQueryMs.toFixed(1)} ms/query  (${(dense.perQueryMs / sparse.perQueryMs).toFixed(1)}x)`);
+  console.log(`  sparse build ${buildMs.toFixed(1)} ms once, ~${sparseHeap.toFixed(1)} MB heap`);
+  console.log(`  score mismatches: ${mismatches}`);
+}
+
+const counts = process.argv.slice(2).map(Number).filter(Boolean);
+(counts.length ? counts : [10000, 100000]).forEach(run);
@@ -0,0 +1,115 @@
+/**
+ * Benchmark: paging a long conversation, skip/limit vs keyset cursors
+ *
+ * Seeds one conversation in a scratch collection (bench_messages, dropped
+ * afterwards) with the Message schema and indexes, then:
+ *   - times a single page at increasing depths for
+ *     sort({ createdAt: -1 }).skip(n).limit(50) and for the `before` cursor
+ *     query, with documents/keys examined from explain('executionStats')
+ *   - walks the whole history with `before` cursors, as the chat would
+ *
+ * Needs MONGODB_URI; usage: node benchmarks/messagePaging.js [messages]
+ */
+const mongoose = require('mongoose');
+const dotenv = require('dotenv');
+const Message = require('../models/Message');
+
+dotenv.config();
+
+const MESSAGES = parseInt(process.argv[2]) || 1000000;
+const PAGE = 50;
+const DEPTHS = [0, 1000, 10000, 100000, 500000, MESSAGES - PAGE].filter(depth => depth < MESSAGES);
+
+const BenchMessage = mongoose.model('BenchMessage', Message.schema, 'bench_messages');
+const conversationId = new mongoose.Types.ObjectId();
+const senders = [new mongoose.Types.ObjectId(), new mongoose.Types.ObjectId()];
+
+function skipQuery(depth) {
+  return BenchMessage.find({ conversationId })
+    .sort({ createdAt: -1 })
+    .skip(depth)
+    .limit(PAGE)
+    .lean();
+}
+
+function cursorQuery(before) {
+  const filter = { conversationId };
+  if (before) {
+    filter.$or = [
+      { createdAt: { $lt: before.createdAt } },
+      { createdAt: before.createdAt, _id: { $lt: before._id } }
+    ];
+  }
+  return BenchMessage.find(filter)
+    .select('conversationId sender text delivered createdAt')
+    .sort({ createdAt: -1, _id: -1 })
+    .limit(PAGE)
+    .lean();
+}
+
+async function timed(query) {
+  const start = process.hrtime.bigint();
+  await query();
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  const { executionStats } = await query().explain('executionStats');
+  return { ms, docs: executionStats.totalDocsExamined, keys: executionStats.totalKeysExamined };
+}
+
+async function run() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI);
+    await BenchMessage.collection.drop().catch(() => {});
+    await BenchMessage.syncIndexes();
+
+    // One message per second; every 10th shares its timestamp with the next
+    const base = Date.now() - MESSAGES * 1000;
+    for (let i = 0; i < MESSAGES; i += 10000) {
+      const batch = Array.from({ length: Math.min(10000, MESSAGES - i) }, (_, j) => ({
+        conversationId,
+        sender: senders[(i + j) % 2],
+        text: `message ${i + j}`,
+        delivered: true,
+        createdAt: new Date(base + (i + j - ((i + j) % 10 === 1 ? 1 : 0)) * 1000)
+      }));
+      await BenchMessage.collection.insertMany(batch, { ordered: false });
+    }
+    console.log(`${MESSAGES.toLocaleString()} messages in one conversation, pages of ${PAGE}\n`);
+    console.log('   depth     skip ms  docs examined   cursor ms  keys examined');
+
+    for (const depth of DEPTHS) {
+      // The cursor for this depth is the last message of the page before it
+      const [boundary] = depth > 0
+        ? await BenchMessage.find({ conversationId }).sort({ createdAt: -1, _id: -1 }).skip(depth - 1).limit(1).lean()
+        : [null];
+      const skip = await timed(() => skipQuery(depth));
+      const cursor = await timed(() => cursorQuery(boundary));
+      console.log(
+        `${String(depth).padStart(8)}  ${skip.ms.toFixed(2).padStart(10)}  ${String(skip.docs).padStart(13)}` +
+        `  ${cursor.ms.toFixed(2).padStart(10)}  ${String(cursor.keys).padStart(13)}`
+      );
+    }
+
+    let pages = 0;
+    let seen = 0;
+    let before = null;
+    const start = process.hrtime.bigint();
+    for (;;) {
+      const page = await cursorQuery(before);
+      if (page.length === 0) break;
+      pages++;
+      seen += page.length;
+      before = page[page.length - 1];
+    }
+    const totalMs = Number(process.hrtime.bigint() - start) / 1e6;
+    console.log(`\nfull walk with cursors: ${pages} pages, ${seen} messages, ${(totalMs / 1000).toFixed(1)} s (${(totalMs / pages).toFixed(2)} ms/page)`);
+    if (seen !== MESSAGES) console.log(`  ⚠️  expected ${MESSAGES} messages`);
+  } catch (error) {
+    console.error('Benchmark error:', error);
+    process.exitCode = 1;
+  } finally {
+    await BenchMessage.collection.drop().catch(() => {});
+    await mongoose.disconnect();
+  }
+}
+
+run();
@@ -0,0 +1,163 @@
+/**
+ * Benchmark: tip endpoints under load, one server process
+ *
+ * Forks a single server process (one core for JavaScript) that mounts the
+ * real routes/wellness.js and routes/tips.js. Authentication is replaced
+ * by a fixed user so only the tip path is measured; the tips route runs
+ * with TIPS_MODEL_MODE=off (local engine, no network) and the in-memory
+ * tips cache. The parent drives each endpoint over keep-alive connections
+ * for a fixed time and reports req/s and latency percentiles, after an
+ * in-process measurement of the engine alone.
+ *
+ * Each endpoint must sustain at least [minRps] req/s (default 1000, the
+ * "thousands of req/s on one core" target) with no errors; the run prints
+ * PASS or FAIL per endpoint and exits non-zero on any FAIL.
+ *
+ * Usage: node benchmarks/tipEndpoints.js [seconds] [connections] [minRps]
+ */
+const http = require('http');
+const path = require('path');
+const { fork } = require('child_process');
+
+const SECONDS = parseInt(process.argv[2]) || 5;
+const CONNECTIONS = parseInt(process.argv[3]) || 32;
+const MIN_RPS = parseInt(process.argv[4]) || 1000;
+
+const ENDPOINTS = [
+  { label: 'GET /api/wellness?mood=Stressed', method: 'GET', path: '/api/wellness?mood=Stressed' },
+  {
+    label: 'POST /api/tips (cache miss, local engine)',
+    method: 'POST',
+    path: '/api/tips',
+    body: { name: 'Bench', xp: 420, mood: 'happy', activity: 'studying' }
+  }
+];
+
+function serve() {
+  process.env.TIPS_MODEL_MODE = 'off';
+  delete process.env.REDIS_URL;
+  delete process.env.TIPS_CACHE_STORE;
+  const mongoose = require('mongoose');
+  const user = { _id: new mongoose.Types.ObjectId(), name: 'Bench', xp: 420, branch: 'CSE' };
+  user.id = user._id.toString();
+
+  const authPath = require.resolve('../middleware/authMiddleware');
+  require.cache[authPath] = {
+    id: authPath,
+    filename: authPath,
+    loaded: true,
+    exports: (req, res, next) => {
+      req.user = user;
+      next();
+    }
+  };
+
+  const express = require('express');
+  const app = express();
+  app.use(express.json());
+  app.use('/api/wellness', require('../routes/wellness'));
+  app.use('/api/tips', require('../routes/tips'));
+  const server = app.listen(0, () => process.send({ port: server.address().port }));
+}
+
+function request(agent, port, { method, path: urlPath, body }) {
+  const payload = body ? JSON.stringify(body) : null;
+  return new Promise((resolve, reject) => {
+    const req = http.request({
+      host: '127.0.0.1',
+      port,
+      method,
+      path: urlPath,
+      agent,
+      headers: payload ? { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(payload) } : {}
+    }, (res) => {
+      res.resume();
+      res.on('end', () => (res.statusCode === 200 ? resolve() : reject(new Error(`HTTP ${res.statusCode}`))));
+    });
+    req.on('error', reject);
+    req.end(payload);
+  });
+}
+
+async function load(port, endpoint, seconds) {
+  const agent = new http.Agent({ keepAlive: true, maxSockets: CONNECTIONS });
+  const latencies = [];
+  let errors = 0;
+  const deadline = Date.now() + seconds * 1000;
+
+  const worker = async () => {
+    while (Date.now() < deadline) {
+      const start = process.hrtime.bigint();
+      try {
+        await request(agent, port, endpoint);
+        latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+      } catch (error) {
+        errors++;
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: CONNECTIONS }, worker));
+  agent.destroy();
+
+  latencies.sort((a, b) => a - b);
+  const pct = p => (latencies.length ? latencies[Math.min(latencies.length - 1, Math.floor(latencies.length * p))] : 0);
+  return {
+    requests: latencies.length,
+    errors,
+    perSecond: Math.round(latencies.length / seconds),
+    p50: pct(0.5).toFixed(2),
+    p99: pct(0.99).toFixed(2)
+  };
+}
+
+function benchEngine() {
+  const tipEngine = require('../utils/tipEngine');
+  const moods = ['happy', 'neutral', 'stressed'];
+  const branches = ['CSE', 'ECE', 'CSD', ''];
+  const iterations = 200000;
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < iterations; i++) {
+    tipEngine.renderTips(
+      { name: `User${i}`, mood: moods[i % 3], xp: i % 2000, branch: branches[i % 4], activity: 'studying' },
+      { seed: `user${i}-2025-01-01` }
+    );
+  }
+  const us = Number(process.hrtime.bigint() - start) / 1e3 / iterations;
+  console.log(`Engine: ${us.toFixed(2)} µs per renderTips (3 tips), ${Math.round(1e6 / us)} renders/s`);
+}
+
+async function main() {
+  benchEngine();
+
+  const child = fork(__filename, ['--serve'], { cwd: path.join(__dirname, '..') });
+  // A server that fails to start (e.g. dependencies not installed) must
+  // end the run with FAIL, not leave it waiting
+  const { port } = await new Promise((resolve, reject) => {
+    child.once('message', resolve);
+    child.once('exit', (code) => reject(new Error(`Server process exited (code ${code}) before listening; run npm install first`)));
+  });
+  console.log(`Server on port ${port}; ${CONNECTIONS} connections, ${SECONDS}s per endpoint, target ${MIN_RPS} req/s\n`);
+
+  let failed = 0;
+  for (const endpoint of ENDPOINTS) {
+    await load(port, endpoint, 1); // warm-up
+    const result = await load(port, endpoint, SECONDS);
+    const pass = result.perSecond >= MIN_RPS && result.errors === 0;
+    if (!pass) failed++;
+    console.log(`${endpoint.label.padEnd(44)} ${String(result.perSecond).padStart(7)} req/s   p50 ${result.p50} ms   p99 ${result.p99} ms   errors ${result.errors}   ${pass ? 'PASS' : 'FAIL'}`);
+  }
+  child.kill();
+
+  console.log(failed ? `\nFAIL: ${failed} endpoint(s) below ${MIN_RPS} req/s or with errors` : `\nPASS: every endpoint sustained ${MIN_RPS}+ req/s on one server process`);
+  process.exitCode = failed ? 1 : 0;
+}
+
+if (process.argv[2] === '--serve') {
+  serve();
+} else {
+  main().catch((error) => {
+    console.error(error.message);
+    console.log('\nFAIL: not measured');
+    process.exit(1);
+  });
+}
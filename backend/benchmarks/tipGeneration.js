@@ -0,0 +1,74 @@
+/**
+ * Benchmark: tip generation against the local stub model
+ *
+ * Scenarios:
+ *   - burst: many concurrent requests for one user share one model call
+ *   - distinct: one request per user, over the pooled keep-alive agent
+ *   - slow model: fallback tips come back after the wait budget while the
+ *     model call completes in the background
+ *   - failing model: every request still gets tips
+ *
+ * Usage: node benchmarks/tipGeneration.js [requests]
+ */
+const { startStubModel } = require('./tipModelStub');
+
+const REQUESTS = parseInt(process.argv[2]) || 500;
+const params = i => ({ name: `User${i}`, xp: 100 + i, mood: 'Happy', activity: 'studying' });
+
+async function timed(label, fn) {
+  const start = process.hrtime.bigint();
+  const result = await fn();
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  console.log(`${label.padEnd(44)} ${ms.toFixed(1).padStart(8)} ms`);
+  return result;
+}
+
+async function main() {
+  const stub = await startStubModel({ latencyMs: 100 });
+  process.env.TIPS_MODEL_URL = stub.url;
+  process.env.TIPS_MODEL_WAIT_MS = '1000';
+  process.env.TIPS_MODEL_TIMEOUT_MS = '3000';
+  const tipService = require('../utils/tipService');
+
+  await timed(`burst: ${REQUESTS} requests, one user`, () =>
+    Promise.all(Array.from({ length: REQUESTS }, () => tipService.getTips('user-0', params(0)))));
+  console.log(`  model requests: ${stub.stats.requests}`);
+
+  stub.stats.requests = 0;
+  await timed(`distinct: ${REQUESTS} users (16 pooled sockets)`, () =>
+    Promise.all(Array.from({ length: REQUESTS }, (_, i) =>
+      tipService.getTips(`user-${i}`, params(i), { waitMs: 60000 }))));
+  console.log(`  model requests: ${stub.stats.requests}, max concurrent at model: ${stub.stats.maxConcurrent}`);
+  stub.server.close();
+
+  const slow = await startStubModel({ latencyMs: 2000 });
+  const slowService = freshService(slow.url, { TIPS_MODEL_WAIT_MS: '200' });
+  let filled = 0;
+  const result = await timed('slow model (2s), wait budget 200ms', () =>
+    slowService.getTips('slow', params(1), { onFresh: () => { filled++; } }));
+  console.log(`  served: ${result.source}, pending: ${result.pending}`);
+  await new Promise(resolve => setTimeout(resolve, 2200));
+  console.log(`  cache filled in background: ${filled === 1}`);
+  slow.server.close();
+
+  const failing = await startStubModel({ latencyMs: 20, failRate: 1 });
+  const failingService = freshService(failing.url, {});
+  const failed = await timed('failing model', () => failingService.getTips('fail', params(2)));
+  console.log(`  served: ${failed.source} (${failed.tips.length} tips)`);
+  failing.server.close();
+
+  console.log(tipService.getTipServiceStats());
+  process.exit(0);
+}
+
+// A separate module instance reads its own environment settings
+function freshService(url, env) {
+  Object.assign(process.env, { TIPS_MODEL_URL: url }, env);
+  delete require.cache[require.resolve('../utils/tipService')];
+  return require('../utils/tipService');
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
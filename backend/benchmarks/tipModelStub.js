@@ -0,0 +1,60 @@
+/**
+ * Local stand-in for the Hugging Face text model used by utils/tipService.js
+ *
+ * Answers POST requests with [{ generated_text }] after a fixed latency,
+ * failing a share of them, so tip generation can be exercised offline:
+ *
+ *   node benchmarks/tipModelStub.js [port] [latencyMs] [failRate]
+ *   TIPS_MODEL_URL=http://localhost:5055/ npm start
+ */
+const http = require('http');
+
+/**
+ * @param {Object} options
+ * @param {Number} options.port - 0 picks a free port
+ * @param {Number} options.latencyMs - Delay before each answer
+ * @param {Number} options.failRate - Share of requests answered with 503
+ * @returns {Promise<Object>} { url, server, stats }
+ */
+function startStubModel({ port = 0, latencyMs = 200, failRate = 0 } = {}) {
+  const stats = { requests: 0, failed: 0, maxConcurrent: 0, concurrent: 0 };
+  const server = http.createServer((req, res) => {
+    let body = '';
+    req.on('data', chunk => { body += chunk; });
+    req.on('end', () => {
+      stats.requests++;
+      stats.concurrent++;
+      stats.maxConcurrent = Math.max(stats.maxConcurrent, stats.concurrent);
+      setTimeout(() => {
+        stats.concurrent--;
+        if (Math.random() < failRate) {
+          stats.failed++;
+          res.writeHead(503, { 'Content-Type': 'application/json' });
+          return res.end(JSON.stringify({ error: 'Model is loading' }));
+        }
+        const { inputs = '' } = JSON.parse(body || '{}');
+        const feeling = (/feeling (\w+)/.exec(inputs) || [])[1] || 'okay';
+        res.writeHead(200, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify([{
+          generated_text: `1. Plan one small goal for today. 2. Feeling ${feeling}? Take a short walk. 3. Check in with a study buddy.`
+        }]));
+      }, latencyMs);
+    });
+  });
+  return new Promise(resolve => {
+    server.listen(port, () => {
+      resolve({ url: `http://127.0.0.1:${server.address().port}/`, server, stats });
+    });
+  });
+}
+
+if (require.main === module) {
+  const port = parseInt(process.argv[2]) || 5055;
+  const latencyMs = parseInt(process.argv[3]) || 200;
+  const failRate = parseFloat(process.argv[4]) || 0;
+  startStubModel({ port, latencyMs, failRate }).then(({ url }) => {
+    console.log(`Stub tips model on ${url} (latency ${latencyMs}ms, fail rate ${failRate})`);
+  });
+}
+
+module.exports = { startStubModel };
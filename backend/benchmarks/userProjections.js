@@ -0,0 +1,95 @@
+/**
+ * Benchmark: bytes read and heap per request, full User documents vs
+ * projected lean reads
+ *
+ * Builds a long-time user (large moodHistory/connections/joinedEvents)
+ * and compares, per simulated request:
+ *   - BSON bytes the server would read (full document vs projection)
+ *   - heap allocated and time spent hydrating a Mongoose document vs
+ *     keeping the projected plain object (.lean())
+ *
+ * No database connection is needed; run with --expose-gc for stable heap
+ * numbers: node --expose-gc benchmarks/userProjections.js [moodEntries]
+ */
+const mongoose = require('mongoose');
+const User = require('../models/User');
+const { AUTH_CONTEXT, MATCH_CANDIDATE, PUBLIC_PROFILE } = require('../utils/userProjections');
+
+const MOOD_ENTRIES = parseInt(process.argv[2]) || 1000;
+const ITERATIONS = 2000;
+const { calculateObjectSize } = mongoose.mongo.BSON;
+
+function heavyUser() {
+  const objectId = () => new mongoose.Types.ObjectId();
+  return {
+    _id: objectId(),
+    name: 'Long Time User',
+    email: 'longtime@iiitn.ac.in',
+    password: '$2a$10$abcdefghijklmnopqrstuvabcdefghijklmnopqrstuvwxyzABCDE',
+    skills: ['JavaScript', 'React', 'Node.js', 'Python', 'MongoDB'],
+    interests: ['AI', 'ML', 'Web Development'],
+    branch: 'CSE',
+    year: 3,
+    availability: ['Morning', 'Evening'],
+    about: 'Hi! '.repeat(50),
+    xp: 1250,
+    profileUpdatedAt: new Date(),
+    moodHistory: Array.from({ length: MOOD_ENTRIES }, (_, i) => ({
+      _id: objectId(),
+      mood: ['Happy', 'Neutral', 'Stressed'][i % 3],
+      date: new Date(Date.now() - i * 86400000),
+      tip: 'Take a 10-minute break, you got this.'
+    })),
+    loginAttempts: 0,
+    accountLocked: false,
+    connections: Array.from({ length: 200 }, objectId),
+    joinedEvents: Array.from({ length: 100 }, objectId),
+    registrationBonus: true,
+    createdAt: new Date(),
+    updatedAt: new Date()
+  };
+}
+
+function project(doc, fields) {
+  const projected = { _id: doc._id };
+  fields.split(' ').forEach(field => {
+    if (doc[field] !== undefined) projected[field] = doc[field];
+  });
+  return projected;
+}
+
+function measure(label, fn) {
+  if (global.gc) global.gc();
+  const heapBefore = process.memoryUsage().heapUsed;
+  const start = process.hrtime.bigint();
+  const kept = [];
+  for (let i = 0; i < ITERATIONS; i++) kept.push(fn());
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+  const heapPerRequest = (process.memoryUsage().heapUsed - heapBefore) / ITERATIONS;
+  console.log(`  ${label.padEnd(34)} ${(heapPerRequest / 1024).toFixed(1).padStart(8)} KB heap  ${(elapsedMs / ITERATIONS * 1000).toFixed(1).padStart(8)} us`);
+  // Referencing kept here keeps the results alive until heap is read
+  return kept.length ? heapPerRequest : 0;
+}
+
+const percentLess = (before, after) => `${(100 * (1 - after / before)).toFixed(1)}% less`;
+
+const raw = heavyUser();
+const { password, ...withoutPassword } = raw;
+
+console.log(`User with ${MOOD_ENTRIES} mood entries, 200 connections, 100 joined events\n`);
+console.log('BSON bytes read per request:');
+const bytesBefore = calculateObjectSize(withoutPassword);
+const bytesAfter = calculateObjectSize(project(raw, AUTH_CONTEXT));
+console.log(`  full document (select -password)   ${bytesBefore}`);
+console.log(`  auth-context projection            ${bytesAfter}`);
+console.log(`  match-candidate projection         ${calculateObjectSize(project(raw, MATCH_CANDIDATE))}`);
+console.log(`  public-profile projection          ${calculateObjectSize(project(raw, PUBLIC_PROFILE))}`);
+
+console.log(`\nHeap and time per request (${ITERATIONS} requests):`);
+const heapBefore = measure('before: hydrated full document', () => User.hydrate(JSON.parse(JSON.stringify(withoutPassword))));
+const heapAfter = measure('after: lean auth-context object', () => JSON.parse(JSON.stringify(project(raw, AUTH_CONTEXT))));
+
+// The figures to quote for the authMiddleware change
+console.log('\nauthMiddleware per request, before -> after:');
+console.log(`  bytes read  ${bytesBefore} -> ${bytesAfter} (${percentLess(bytesBefore, bytesAfter)})`);
+console.log(`  heap        ${(heapBefore / 1024).toFixed(1)} KB -> ${(heapAfter / 1024).toFixed(1)} KB (${percentLess(heapBefore, heapAfter)})`);
@@ -0,0 +1,148 @@
+/**
+ * Cluster entry point: one server.js worker per CPU core
+ *
+ * Usage: npm run start:cluster   (CLUSTER_WORKERS overrides the count)
+ *
+ * The primary owns the port and hands every TCP connection to a worker
+ * picked by hashing the client address, so a socket.io handshake and the
+ * polling requests that follow it stay on one worker. Behind a proxy
+ * every connection comes from the proxy's address; make the proxy sticky
+ * instead, or use websocket-only transports.
+ *
+ * State that has to agree across workers (socket presence and room
+ * broadcasts, tips cache, auth cache, rate-limit counters) goes through
+ * Redis when REDIS_URL is set, otherwise through a store the primary
+ * serves over IPC (utils/clusterStore.js).
+ *
+ * SIGINT/SIGTERM stop accepting connections and ask every worker to shut
+ * down gracefully (drain requests, flush pending writes) before exiting.
+ */
+require("dotenv").config();
+const cluster = require("cluster");
+const net = require("net");
+const os = require("os");
+const path = require("path");
+const { serveClusterStore } = require("./utils/clusterStore");
+const { getRedisClient } = require("./utils/redisConnection");
+const { createRedisPresence } = require("./utils/socketScaling");
+
+const PORT = process.env.PORT || 5000;
+const WORKER_COUNT =
+  parseInt(process.env.CLUSTER_WORKERS) ||
+  (os.availableParallelism ? os.availableParallelism() : os.cpus().length);
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS) || 10000;
+const RESTART_DELAY_MS = 1000;
+
+const primaryState = {
+  slots: new Array(WORKER_COUNT).fill(null), // slot -> { worker, ready }
+  waiting: [],                               // connections that arrived before any worker was ready
+  shuttingDown: false,
+  stateClient: null                          // shared-state client, for cleaning up after dead workers
+};
+
+cluster.setupPrimary({ exec: path.join(__dirname, "server.js") });
+
+function fork(slot) {
+  const worker = cluster.fork({ SMARTBUDDY_CLUSTER: "1", CLUSTER_WORKER_SLOT: String(slot) });
+  primaryState.slots[slot] = { worker, ready: false };
+
+  worker.on("message", (msg) => {
+    if (msg !== "smartbuddy:worker-ready") return;
+    primaryState.slots[slot].ready = true;
+    const waiting = primaryState.waiting.splice(0);
+    waiting.forEach(route);
+  });
+
+  worker.on("exit", (code, signal) => {
+    if (primaryState.slots[slot] && primaryState.slots[slot].worker === worker) {
+      primaryState.slots[slot] = null;
+    }
+    clearWorkerPresence(worker).catch((err) => console.error("Presence cleanup error:", err.message));
+    if (primaryState.shuttingDown) return;
+    console.error(`❌ Worker ${worker.process.pid} exited (${signal || code}), restarting`);
+    setTimeout(() => !primaryState.shuttingDown && fork(slot), RESTART_DELAY_MS);
+  });
+}
+
+// A dead worker can't clear its own presence entries; do it on its behalf
+async function clearWorkerPresence(worker) {
+  if (!primaryState.stateClient) return;
+  const nodeId = `${os.hostname()}:${worker.process.pid}`;
+  await createRedisPresence(primaryState.stateClient, { nodeId }).clearNode();
+}
+
+// FNV-1a over the client address
+function hashAddress(address) {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < address.length; i++) {
+    hash ^= address.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+function route(connection) {
+  const { slots } = primaryState;
+  const start = hashAddress(connection.remoteAddress || "") % slots.length;
+  // Same address -> same worker; skip slots whose worker is (re)starting
+  for (let i = 0; i < slots.length; i++) {
+    const entry = slots[(start + i) % slots.length];
+    if (entry && entry.ready && entry.worker.isConnected()) {
+      entry.worker.send("smartbuddy:sticky-connection", connection);
+      return;
+    }
+  }
+  primaryState.waiting.push(connection);
+}
+
+const balancer = net.createServer({ pauseOnConnect: true }, (connection) => {
+  if (primaryState.shuttingDown) return connection.destroy();
+  route(connection);
+});
+
+function shutdown(signal) {
+  if (primaryState.shuttingDown) return;
+  primaryState.shuttingDown = true;
+  console.log(`🛑 Cluster shutting down (${signal})...`);
+  balancer.close();
+  primaryState.waiting.splice(0).forEach((connection) => connection.destroy());
+
+  const workers = Object.values(cluster.workers);
+  workers.forEach((worker) => worker.isConnected() && worker.send("smartbuddy:shutdown"));
+  // Workers force their own exit after SHUTDOWN_TIMEOUT_MS; allow a little more
+  setTimeout(() => {
+    console.error("❌ Workers did not exit in time, killing them");
+    Object.values(cluster.workers).forEach((worker) => worker.process.kill("SIGKILL"));
+    process.exit(1);
+  }, SHUTDOWN_TIMEOUT_MS + 2000).unref();
+
+  Promise.all(workers.map((worker) => new Promise((resolve) => {
+    if (worker.isDead()) return resolve();
+    worker.once("exit", resolve);
+  }))).then(() => {
+    console.log("✅ Cluster stopped");
+    process.exit(0);
+  });
+}
+
+async function start() {
+  if (process.env.REDIS_URL) {
+    primaryState.stateClient = await getRedisClient();
+  } else {
+    primaryState.stateClient = serveClusterStore().client;
+    await primaryState.stateClient.connect();
+  }
+
+  for (let slot = 0; slot < WORKER_COUNT; slot++) fork(slot);
+
+  balancer.listen(PORT, () => {
+    console.log(`🚀 Cluster primary ${process.pid} on port ${PORT} with ${WORKER_COUNT} workers`);
+  });
+
+  ["SIGINT", "SIGTERM"].forEach((signal) => process.once(signal, () => shutdown(signal)));
+}
+
+start().catch((err) => {
+  console.error("❌ Cluster start error:", err);
+  process.exit(1);
+});
@@ -1,5 +1,7 @@
 const jwt = require('jsonwebtoken');
 const User = require('../models/User');
+const { AUTH_CONTEXT } = require('../utils/userProjections');
+const authCache = require('../utils/authCache');
 
 const authMiddleware = async (req, res, next) => {
   try {
@@ -12,28 +14,39 @@ const authMiddleware = async (req, res, next) => {
       });
     }
 
-    // Verify token
-    let decoded;
-    try {
-      decoded = jwt.verify(token, process.env.JWT_SECRET);
-    } catch (error) {
-      if (error.name === 'TokenExpiredError') {
-        return res.status(401).json({ 
-          message: 'Token has expired',
-          error: 'TOKEN_EXPIRED'
-        });
+    // Verify token (skipped for tokens this process already verified)
+    let userId = authCache.getVerifiedToken(token)?.userId;
+    if (!userId) {
+      let decoded;
+      try {
+        decoded = jwt.verify(token, process.env.JWT_SECRET);
+      } catch (error) {
+        if (error.name === 'TokenExpiredError') {
+          return res.status(401).json({ 
+            message: 'Token has expired',
+            error: 'TOKEN_EXPIRED'
+          });
+        }
+        if (error.name === 'JsonWebTokenError') {
+          return res.status(401).json({ 
+            message: 'Invalid token',
+            error: 'INVALID_TOKEN'
+          });
+        }
+        throw error;
       }
-      if (error.name === 'JsonWebTokenError') {
-        return res.status(401).json({ 
-          message: 'Invalid token',
-          error: 'INVALID_TOKEN'
-        });
-      }
-      throw error;
+      authCache.rememberVerifiedToken(token, decoded);
+      userId = decoded.userId;
     }
 
-    // Find user and check if account is locked
-    const user = await User.findById(decoded.userId).select('-password');
+    // Load only the auth context as a plain object - routes that mutate the
+    // user load what they need themselves. Cached briefly; lock and profile
+    // changes invalidate it.
+    let user = userId ? await authCache.getPrincipal(userId) : null;
+    if (!user && userId) {
+      user = await User.findById(userId).select(AUTH_CONTEXT).lean();
+      if (user) await authCache.setPrincipal(user);
+    }
 
     if (!user) {
       return res.status(401).json({ 
@@ -53,7 +66,8 @@ const authMiddleware = async (req, res, next) => {
       });
     }
 
-    // Attach user to request
+    // Attach user to request (id mirrors the Mongoose virtual)
+    user.id = user._id.toString();
     req.user = user;
     next();
   } catch (error) {
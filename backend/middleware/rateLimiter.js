@@ -1,4 +1,18 @@
 const rateLimit = require('express-rate-limit');
+const SharedRateLimitStore = require('../utils/rateLimitStore');
+const { isSharedStateEnabled } = require('../utils/redisConnection');
+
+// Count attempts across all workers/nodes when state is shared; otherwise
+// express-rate-limit's default per-process memory store is used. The
+// shared store counts in memory while its client is down; should it still
+// throw, the request is let through rather than failed.
+function counterStore(name) {
+  if (!isSharedStateEnabled()) return {};
+  return {
+    store: new SharedRateLimitStore({ prefix: `smartbuddy:ratelimit:${name}:` }),
+    passOnStoreError: true
+  };
+}
 
 // Rate limiter for authentication routes
 const authLimiter = rateLimit({
@@ -10,7 +24,8 @@ const authLimiter = rateLimit({
   standardHeaders: true, // Return rate limit info in the `RateLimit-*` headers
   legacyHeaders: false, // Disable the `X-RateLimit-*` headers
   skipSuccessfulRequests: false, // Count all requests, including successful ones
-  skipFailedRequests: false // Count failed requests too
+  skipFailedRequests: false, // Count failed requests too
+  ...counterStore('auth')
 });
 
 // Stricter rate limiter for login attempts
@@ -23,7 +38,8 @@ const loginLimiter = rateLimit({
   standardHeaders: true,
   legacyHeaders: false,
   skipSuccessfulRequests: true, // Don't count successful logins
-  skipFailedRequests: false
+  skipFailedRequests: false,
+  ...counterStore('login')
 });
 
 // Rate limiter for registration
@@ -34,7 +50,8 @@ const registerLimiter = rateLimit({
     message: 'Too many registration attempts, please try again after 1 hour'
   },
   standardHeaders: true,
-  legacyHeaders: false
+  legacyHeaders: false,
+  ...counterStore('register')
 });
 
 module.exports = {
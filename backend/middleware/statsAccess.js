@@ -0,0 +1,20 @@
+// Internal cache/engine statistics are for operators only. Accounts whose
+// email is listed in STATS_ADMIN_EMAILS (comma-separated) may read them;
+// with the variable unset the stats endpoints are closed to everyone.
+// Use after authMiddleware.
+const statsAccess = (req, res, next) => {
+  const admins = (process.env.STATS_ADMIN_EMAILS || '')
+    .split(',')
+    .map(email => email.trim().toLowerCase())
+    .filter(Boolean);
+
+  if (!req.user || !admins.includes(String(req.user.email || '').toLowerCase())) {
+    return res.status(403).json({
+      message: 'Not authorized to view server statistics',
+      error: 'STATS_FORBIDDEN'
+    });
+  }
+  next();
+};
+
+module.exports = statsAccess;
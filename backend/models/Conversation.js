@@ -4,6 +4,11 @@ const { Schema } = mongoose;
 const conversationSchema = new Schema({
   participants: [{ type: Schema.Types.ObjectId, ref: 'User', required: true }], // must be 2
   lastMessage: String,
+  // participantId -> messages from the other participant they haven't read
+  unread: { type: Map, of: Number, default: {} },
 }, { timestamps: true });
 
+// Inbox: a user's conversations, most recently active first
+conversationSchema.index({ participants: 1, updatedAt: -1 });
+
 module.exports = mongoose.model('Conversation', conversationSchema);
@@ -23,13 +23,79 @@ const eventSchema = new mongoose.Schema({
     type: String,
     trim: true
   }],
+  // Lowercased copy of tags, matched against interests/skills by the index below
+  tagsNormalized: {
+    type: [String],
+    default: []
+  },
+  // date + time as a real Date (date/time stay as entered, for display)
+  startsAt: {
+    type: Date,
+    index: true
+  },
   description: {
     type: String,
     default: ''
+  },
+  // Number of EventAttendance rows, kept with $inc on join
+  attendeeCount: {
+    type: Number,
+    default: 0
   }
 }, {
   timestamps: true
 });
 
+// Upcoming events sharing a tag with a user, in start order (candidate
+// generation in utils/eventRanking.js)
+eventSchema.index({ tagsNormalized: 1, startsAt: 1, _id: 1 });
+
+/**
+ * Lowercase, trimmed, de-duplicated tags
+ * @param {Array<String>} tags - Tags as entered
+ * @returns {Array<String>} Normalized tags
+ */
+function normalizeTags(tags) {
+  return Array.from(new Set((tags || []).map(tag => String(tag).trim().toLowerCase()).filter(Boolean)));
+}
+
+/**
+ * Parse the entered date ('2025-11-5') and time ('2:00 PM' or '14:00')
+ * @returns {Date|undefined} Start time in server local time, or undefined if unparseable
+ */
+function parseStartsAt(date, time) {
+  const dateMatch = /^(\d{4})-(\d{1,2})-(\d{1,2})/.exec(String(date || '').trim());
+  if (!dateMatch) {
+    const fallback = new Date(date);
+    return isNaN(fallback) ? undefined : fallback;
+  }
+  let hours = 0;
+  let minutes = 0;
+  const timeMatch = /^(\d{1,2})(?::(\d{2}))?\s*(AM|PM)?$/i.exec(String(time || '').trim());
+  if (timeMatch) {
+    hours = parseInt(timeMatch[1]) % 24;
+    minutes = parseInt(timeMatch[2] || '0');
+    const meridiem = (timeMatch[3] || '').toUpperCase();
+    if (meridiem === 'PM' && hours < 12) hours += 12;
+    if (meridiem === 'AM' && hours === 12) hours = 0;
+  }
+  const [, year, month, day] = dateMatch.map(Number);
+  return new Date(year, month - 1, day, hours, minutes);
+}
+
+// Keep the derived fields in sync on save and insertMany
+eventSchema.pre('validate', function(next) {
+  if (this.isModified('tags') || this.isNew) {
+    this.tagsNormalized = normalizeTags(this.tags);
+  }
+  if (this.isModified('date') || this.isModified('time') || this.isNew) {
+    this.startsAt = parseStartsAt(this.date, this.time);
+  }
+  next();
+});
+
+eventSchema.statics.normalizeTags = normalizeTags;
+eventSchema.statics.parseStartsAt = parseStartsAt;
+
 module.exports = mongoose.model('Event', eventSchema);
 
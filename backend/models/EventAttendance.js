@@ -0,0 +1,19 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// One row per (event, user) join; Event.attendeeCount mirrors the row count
+const eventAttendanceSchema = new Schema({
+  eventId: { type: Schema.Types.ObjectId, ref: 'Event', required: true },
+  userId: { type: Schema.Types.ObjectId, ref: 'User', required: true },
+  joinedAt: { type: Date, default: Date.now },
+  // Follow-up work not yet done for this join ('count', 'xp'); a repeat
+  // join finishes it (utils/pendingSteps.js). Empty once complete.
+  pending: { type: [String], default: undefined },
+});
+
+// A user joins an event at most once (makes the join upsert idempotent)
+eventAttendanceSchema.index({ eventId: 1, userId: 1 }, { unique: true });
+// Attendee lists, paged in join order
+eventAttendanceSchema.index({ eventId: 1, _id: 1 });
+
+module.exports = mongoose.model('EventAttendance', eventAttendanceSchema);
@@ -0,0 +1,30 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// Precomputed top-N study buddies for one user (written by utils/matchBatchJob.js)
+const matchEntrySchema = new Schema({
+  id: { type: Schema.Types.ObjectId, ref: 'User', required: true },
+  name: String,
+  email: String,
+  branch: String,
+  year: Number,
+  availability: [String],
+  skills: [String],
+  interests: [String],
+  sharedSkills: [String],
+  sharedInterests: [String],
+  score: Number
+}, { _id: false });
+
+const matchSchema = new Schema({
+  user: { type: Schema.Types.ObjectId, ref: 'User', required: true, unique: true },
+  matches: [matchEntrySchema],
+  worstScore: { type: Number, default: 0 }, // score of the last entry
+  full: { type: Boolean, default: false },   // false when fewer than top-N users existed
+  computedAt: { type: Date, required: true }
+}, { timestamps: true });
+
+// Find every list a user appears in (incremental runs)
+matchSchema.index({ 'matches.id': 1 });
+
+module.exports = mongoose.model('Match', matchSchema);
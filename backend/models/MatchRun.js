@@ -0,0 +1,18 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// One record per batch match recompute run
+const matchRunSchema = new Schema({
+  mode: { type: String, enum: ['full', 'incremental'], required: true },
+  status: { type: String, enum: ['running', 'completed', 'failed'], default: 'running' },
+  since: Date,
+  startedAt: { type: Date, required: true },
+  finishedAt: Date,
+  processed: { type: Number, default: 0 },
+  usersPerSecond: Number,
+  error: String
+}, { timestamps: true });
+
+matchRunSchema.index({ status: 1, startedAt: -1 });
+
+module.exports = mongoose.model('MatchRun', matchRunSchema);
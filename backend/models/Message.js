@@ -8,4 +8,7 @@ const messageSchema = new Schema({
   delivered: { type: Boolean, default: false },
 }, { timestamps: { createdAt: true, updatedAt: false }});
 
+// History pages, newest first; _id breaks ties between equal timestamps
+messageSchema.index({ conversationId: 1, createdAt: -1, _id: -1 });
+
 module.exports = mongoose.model('Message', messageSchema);
@@ -0,0 +1,20 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// One wellness check-in per user per day (see utils/moodStats.js). The
+// unique (userId, day) index makes the insert itself the "already checked
+// in today" test.
+const moodCheckinSchema = new Schema({
+  userId: { type: Schema.Types.ObjectId, ref: 'User', required: true },
+  day: { type: String, required: true }, // YYYY-MM-DD, server local time
+  mood: { type: String, required: true },
+  tip: { type: String, default: '' },
+  // Follow-up work not yet done for this check-in ('xp', 'stats'); a
+  // repeat check-in on the same day finishes it. Empty once complete.
+  pending: { type: [String], default: undefined }
+}, { timestamps: { createdAt: true, updatedAt: false }, versionKey: false });
+
+// Also serves a user's check-ins newest first
+moodCheckinSchema.index({ userId: 1, day: -1 }, { unique: true });
+
+module.exports = mongoose.model('MoodCheckin', moodCheckinSchema);
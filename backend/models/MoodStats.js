@@ -0,0 +1,20 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// Running mood aggregates per user, updated with every check-in by
+// utils/moodStats.js so stats never read raw check-ins.
+//   weekly  - { 'YYYY-Www' (ISO week): { happy, neutral, stressed, total } }
+//   monthly - { 'YYYY-MM': { happy, neutral, stressed, total } }
+const moodStatsSchema = new Schema({
+  userId: { type: Schema.Types.ObjectId, ref: 'User', required: true, unique: true },
+  totalCheckins: { type: Number, default: 0 },
+  currentStreak: { type: Number, default: 0 }, // consecutive days ending on lastDay
+  longestStreak: { type: Number, default: 0 },
+  lastDay: { type: String }, // YYYY-MM-DD
+  lastMood: { type: String },
+  weekly: { type: Schema.Types.Mixed, default: {} },
+  monthly: { type: Schema.Types.Mixed, default: {} },
+  updatedAt: { type: Date }
+}, { versionKey: false, minimize: false });
+
+module.exports = mongoose.model('MoodStats', moodStatsSchema);
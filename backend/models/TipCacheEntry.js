@@ -0,0 +1,18 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// Persistent copy of a user's generated tips for one day (see
+// utils/tipsCache.js, TIPS_CACHE_STORE=mongo). _id is the cache key.
+const tipCacheEntrySchema = new Schema({
+  _id: { type: String },
+  userId: { type: String, required: true },
+  date: { type: String, required: true }, // YYYY-MM-DD
+  tips: [String],
+  timestamp: Number,
+  expiresAt: { type: Date, required: true }
+}, { versionKey: false });
+
+// Mongo's TTL monitor removes entries once expiresAt has passed
+tipCacheEntrySchema.index({ expiresAt: 1 }, { expireAfterSeconds: 0 });
+
+module.exports = mongoose.model('TipCacheEntry', tipCacheEntrySchema);
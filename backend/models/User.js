@@ -46,8 +46,16 @@ const userSchema = new mongoose.Schema({
   },
   xp: {
     type: Number,
-    default: 0
+    default: 0,
+    index: true
+  },
+  // Last change to a field used for matching (drives incremental match recomputes)
+  profileUpdatedAt: {
+    type: Date,
+    default: Date.now,
+    index: true
   },
+  // Legacy check-ins; new ones go to MoodCheckin (see backfillMoodCheckins.js)
   moodHistory: [{
     mood: String,
     date: { type: Date, default: Date.now },
@@ -65,7 +73,8 @@ const userSchema = new mongoose.Schema({
     type: Date
   },
   lastLogin: {
-    type: Date
+    type: Date,
+    index: true
   },
   emailVerified: {
     type: Boolean,
@@ -81,6 +90,8 @@ const userSchema = new mongoose.Schema({
     type: mongoose.Schema.Types.ObjectId,
     ref: 'User'
   }],
+  // Deprecated: joins live in EventAttendance. No longer written; kept
+  // only so backfillEvents.js can copy old joins across.
   joinedEvents: [{
     type: mongoose.Schema.Types.ObjectId,
     ref: 'Event'
@@ -0,0 +1,14 @@
+const mongoose = require('mongoose');
+const { Schema } = mongoose;
+
+// Append-only record of every XP award (written in batches by utils/updateXP.js)
+const xpLedgerSchema = new Schema({
+  userId: { type: Schema.Types.ObjectId, ref: 'User', required: true },
+  delta: { type: Number, required: true },
+  reason: { type: String, default: '' },
+}, { timestamps: { createdAt: true, updatedAt: false }});
+
+// A user's XP history, newest first
+xpLedgerSchema.index({ userId: 1, createdAt: -1 });
+
+module.exports = mongoose.model('XpLedger', xpLedgerSchema);
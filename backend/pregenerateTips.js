@@ -0,0 +1,38 @@
+const mongoose = require("mongoose");
+const dotenv = require("dotenv");
+
+dotenv.config();
+
+const { pregenerateTips } = require("./utils/tipPregeneration");
+
+// Usage: node pregenerateTips.js [activeDays] [concurrency]
+// Fills the tips cache for today. Run it with REDIS_URL or TIPS_CACHE_STORE
+// set, so the server sees what this process generated.
+async function run() {
+  const activeDays = parseInt(process.argv[2]) || undefined;
+  const concurrency = parseInt(process.argv[3]) || undefined;
+
+  try {
+    await mongoose.connect(process.env.MONGODB_URI, {
+      useNewUrlParser: true,
+      useUnifiedTopology: true,
+    });
+    console.log("✅ Connected to MongoDB");
+
+    const result = await pregenerateTips({
+      activeDays,
+      concurrency,
+      onProgress: ({ users, groups, cached }) => {
+        console.log(`⏳ ${users} users, ${groups} distinct prompts, ${cached} cached`);
+      },
+    });
+
+    console.log(`🎉 Tips for ${result.date}: ${result.cached}/${result.users} users from ${result.groups} prompts (${result.skipped} skipped) in ${result.ms} ms`);
+    process.exit(0);
+  } catch (error) {
+    console.error("❌ Tip pre-generation error:", error);
+    process.exit(1);
+  }
+}
+
+run();
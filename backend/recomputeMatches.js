@@ -0,0 +1,37 @@
+const mongoose = require("mongoose");
+const dotenv = require("dotenv");
+const { recomputeMatches } = require("./utils/matchBatchJob");
+
+dotenv.config();
+
+// Usage: node recomputeMatches.js [full|incremental] [chunkSize]
+async function run() {
+  const mode = process.argv[2] === "incremental" ? "incremental" : "full";
+  const chunkSize = parseInt(process.argv[3]) || undefined;
+
+  try {
+    await mongoose.connect(process.env.MONGODB_URI, {
+      useNewUrlParser: true,
+      useUnifiedTopology: true,
+    });
+    console.log("✅ Connected to MongoDB");
+
+    const result = await recomputeMatches({
+      mode,
+      chunkSize,
+      onProgress: ({ processed, total, usersPerSecond }) => {
+        const percent = total ? Math.round((processed / total) * 100) : 100;
+        const heapMB = Math.round(process.memoryUsage().heapUsed / 1024 / 1024);
+        console.log(`⏳ ${processed}/${total} users (${percent}%) - ${usersPerSecond} users/s - heap ${heapMB} MB`);
+      },
+    });
+
+    console.log(`🎉 Match recompute (${result.mode}) completed: ${result.processed} users at ${result.usersPerSecond} users/s`);
+    process.exit(0);
+  } catch (error) {
+    console.error("❌ Match recompute error:", error);
+    process.exit(1);
+  }
+}
+
+run();
@@ -2,6 +2,11 @@ const express = require('express');
 const jwt = require('jsonwebtoken');
 const User = require('../models/User');
 const updateXP = require('../utils/updateXP');
+const matchEngine = require('../utils/matchEngine');
+const leaderboard = require('../utils/leaderboard');
+const { MATCH_CANDIDATE } = require('../utils/userProjections');
+const { invalidatePrincipal } = require('../utils/authCache');
+const { invalidateName } = require('../utils/userNameCache');
 const { registerValidation, loginValidation, handleValidationErrors } = require('../middleware/validation');
 const { loginLimiter, registerLimiter } = require('../middleware/rateLimiter');
 
@@ -27,7 +32,7 @@ router.post('/register',
       const { name, email, password, skills, interests, branch, year, availability } = req.body;
 
       // Check if user exists by email
-      const existingUser = await User.findOne({ email });
+      const existingUser = await User.exists({ email });
       if (existingUser) {
         return res.status(400).json({ 
           message: 'User with this email already exists',
@@ -57,6 +62,9 @@ router.post('/register',
       user.registrationBonus = true;
       await user.save();
 
+      // Make the new user matchable right away
+      matchEngine.upsertUser(user);
+
       // Generate JWT
       const token = generateToken(user._id);
 
@@ -116,8 +124,9 @@ router.post('/login',
     try {
       const { email, password } = req.body;
 
-      // Find user by email (case-insensitive)
-      const user = await User.findOne({ email: email.toLowerCase().trim() });
+      // Find user by email (case-insensitive); login never needs the large arrays
+      const user = await User.findOne({ email: email.toLowerCase().trim() })
+        .select('-moodHistory -connections -joinedEvents');
       
       if (!user) {
         // Don't reveal if user exists or not (security best practice)
@@ -142,11 +151,12 @@ router.post('/login',
       const isMatch = await user.comparePassword(password);
       
       if (!isMatch) {
-        // Increment login attempts
+        // Increment login attempts (the cached auth context carries the lock state)
         await user.incLoginAttempts();
+        await invalidatePrincipal(user._id);
         
         // Refresh user to get updated login attempts
-        const updatedUser = await User.findById(user._id);
+        const updatedUser = await User.findById(user._id).select('loginAttempts').lean();
         const remainingAttempts = Math.max(0, 4 - updatedUser.loginAttempts);
         
         return res.status(401).json({ 
@@ -158,6 +168,7 @@ router.post('/login',
 
       // Successful login - reset login attempts and update last login
       await user.resetLoginAttempts();
+      await invalidatePrincipal(user._id);
 
       // Generate JWT
       const token = generateToken(user._id);
@@ -204,7 +215,9 @@ router.get('/verify', async (req, res) => {
     }
 
     const decoded = jwt.verify(token, process.env.JWT_SECRET);
-    const user = await User.findById(decoded.userId).select('-password');
+    const user = await User.findById(decoded.userId)
+      .select('name email about xp accountLocked lockUntil')
+      .lean();
 
     if (!user) {
       return res.status(401).json({ 
@@ -214,7 +227,8 @@ router.get('/verify', async (req, res) => {
     }
 
     // Check if account is locked
-    if (user.isLocked) {
+    const isLocked = !!(user.accountLocked && user.lockUntil && user.lockUntil > Date.now());
+    if (isLocked) {
       return res.status(423).json({ 
         message: 'Account is locked',
         valid: false,
@@ -266,8 +280,17 @@ router.put('/profile', auth, async (req, res) => {
     if (Object.keys(update).length === 0) {
       return res.status(400).json({ message: 'No valid fields provided' });
     }
-    const user = await User.findByIdAndUpdate(req.user._id, { $set: update }, { new: true }).select('-password');
+    if (Object.keys(update).some(key => key !== 'about')) {
+      update.profileUpdatedAt = new Date();
+    }
+    const user = await User.findByIdAndUpdate(req.user._id, { $set: update }, { new: true })
+      .select(`${MATCH_CANDIDATE} xp`)
+      .lean();
     if (!user) return res.status(404).json({ message: 'User not found' });
+    await invalidatePrincipal(user._id);
+    matchEngine.upsertUser(user);
+    leaderboard.upsertUser(user);
+    if (update.name !== undefined) invalidateName(user._id);
     res.json({
       message: 'Profile updated',
       user: {
@@ -3,23 +3,12 @@ const router = express.Router();
 const ConnectionRequest = require('../models/ConnectionRequest');
 const Conversation = require('../models/Conversation');
 const User = require('../models/User');
-const { getIO, getUserSocketMap } = require('../socket');
+const { emitToUser } = require('../socket');
 const auth = require('../middleware/authMiddleware');
-const updateXP = require('../utils/updateXP');
+const { awardXPBatch } = require('../utils/updateXP');
+const { invalidateConversation } = require('../utils/conversationMembers');
 const mongoose = require('mongoose');
 
-// Helper to emit to a user if they're online
-function emitToUser(userId, event, data) {
-  const io = getIO();
-  const userSocketMap = getUserSocketMap();
-  const socketId = userSocketMap.get(userId.toString());
-  if (io && socketId) {
-    io.to(socketId).emit(event, data);
-    return true;
-  }
-  return false;
-}
-
 // POST /api/connections/request
 router.post('/request', auth, async (req, res) => {
   try {
@@ -29,7 +18,7 @@ router.post('/request', auth, async (req, res) => {
     if (!mongoose.Types.ObjectId.isValid(toUserId)) return res.status(400).json({ message: "Invalid user id." });
     if (message && message.length > 256) return res.status(400).json({ message: "Message too long." });
 
-    const to = await User.findById(toUserId);
+    const to = await User.exists({ _id: toUserId });
     if (!to) return res.status(404).json({ message: "Recipient not found." });
 
     // Prevent >5 outgoing pending requests
@@ -41,7 +30,7 @@ router.post('/request', auth, async (req, res) => {
 
     const request = new ConnectionRequest({ from, to: toUserId, message });
     await request.save();
-    let notified = emitToUser(toUserId, 'notification', {
+    let notified = await emitToUser(toUserId, 'notification', {
       type:'request',
       requestId: request._id,
       from,
@@ -71,7 +60,8 @@ router.get('/requests', auth, async (req, res) => {
     const requests = await ConnectionRequest.find(filter)
       .populate('from', 'name _id')
       .populate('to', 'name _id')
-      .sort({ createdAt: -1 });
+      .sort({ createdAt: -1 })
+      .lean();
     res.json({ requests });
   } catch (err) {
     console.error('[ConnectionRequest][Fetch][ERROR]', err);
@@ -102,13 +92,18 @@ router.post('/respond', auth, async (req, res) => {
       if (!conversation) {
         conversation = new Conversation({ participants: [request.from, request.to], lastMessage: '', });
         await conversation.save();
+        invalidateConversation(conversation._id);
         convoCreated = true;
       }
-      // XP awards if utility exists
-      try { await updateXP(request.from, 15, 'Connection Request Accepted'); } catch(e) { }
-      try { if (convoCreated) { await updateXP(request.from, 10, 'Conversation Created'); await updateXP(request.to, 10, 'Conversation Created'); } } catch(e) { }
+      // XP awards in one bulk write
+      const awards = [{ userId: request.from, xp: 15, reason: 'Connection Request Accepted' }];
+      if (convoCreated) {
+        awards.push({ userId: request.from, xp: 10, reason: 'Conversation Created' });
+        awards.push({ userId: request.to, xp: 10, reason: 'Conversation Created' });
+      }
+      try { await awardXPBatch(awards); } catch(e) { }
       // Notify both users (update, conversation_created)
-      notified = emitToUser(request.from, 'request_update', { request });
+      notified = await emitToUser(request.from, 'request_update', { request });
       emitToUser(request.from, 'conversation_created', { conversationId: conversation._id });
       emitToUser(request.to, 'request_update', { request });
       emitToUser(request.to, 'conversation_created', { conversationId: conversation._id });
@@ -116,7 +111,7 @@ router.post('/respond', auth, async (req, res) => {
     } else {
       request.status = 'rejected';
       await request.save();
-      notified = emitToUser(request.from, 'request_update', { request });
+      notified = await emitToUser(request.from, 'request_update', { request });
       console.log(`[ConnectionRequest] ${request._id} rejected. Notified sender: ${notified}`);
     }
     res.json({ request, conversation, notified });
@@ -2,47 +2,34 @@ const express = require('express');
 const router = express.Router();
 const mongoose = require('mongoose');
 const auth = require('../middleware/authMiddleware');
+const statsAccess = require('../middleware/statsAccess');
 const Conversation = require('../models/Conversation');
 const Message = require('../models/Message');
-const { getIO, getUserSocketMap } = require('../socket');
-
-function emitToUser(userId, event, data) {
-  const io = getIO();
-  const userSocketMap = getUserSocketMap();
-  const socketId = userSocketMap.get(userId.toString());
-  if (io && socketId) {
-    io.to(socketId).emit(event, data);
-    return true;
-  }
-  return false;
-}
+const { emitToUser } = require('../socket');
+const { getNames, getNameCacheStats } = require('../utils/userNameCache');
+const conversationMembers = require('../utils/conversationMembers');
+const { getCoalescerStats } = require('../utils/eventCoalescer');
+const { getReadReceiptStats } = require('../utils/readReceipts');
 
 // GET /api/conversations - list user's conversations
 router.get('/', auth, async (req, res) => {
   try {
     const userId = req.user.id;
+    // One indexed query ({ participants, updatedAt }); unread counts are
+    // kept on the conversation as messages are sent and read
     const conversations = await Conversation.find({ participants: userId })
+      .select('participants lastMessage unread createdAt updatedAt')
       .sort({ updatedAt: -1 })
-      .populate('participants', 'name _id');
-
-    const convoIds = conversations.map(c => c._id);
-    // Incoming unread for current user (messages from other user not yet delivered to current user)
-    const incomingAgg = await Message.aggregate([
-      { $match: { conversationId: { $in: convoIds }, delivered: false, sender: { $ne: new mongoose.Types.ObjectId(userId) } } },
-      { $group: { _id: '$conversationId', count: { $sum: 1 } } }
-    ]);
-    const outgoingAgg = await Message.aggregate([
-      { $match: { conversationId: { $in: convoIds }, delivered: false, sender: new mongoose.Types.ObjectId(userId) } },
-      { $group: { _id: '$conversationId', count: { $sum: 1 } } }
-    ]);
-    const incomingMap = new Map(incomingAgg.map(r => [r._id.toString(), r.count]));
-    const outgoingMap = new Map(outgoingAgg.map(r => [r._id.toString(), r.count]));
-
-    const payload = conversations.map(c => {
-      const obj = c.toObject();
-      obj.unreadIncoming = incomingMap.get(c._id.toString()) || 0; // messages I need to read
-      obj.unreadOutgoing = outgoingMap.get(c._id.toString()) || 0; // messages the other user hasn't read
-      return obj;
+      .lean();
+
+    const names = await getNames(conversations.flatMap(c => c.participants));
+
+    const payload = conversations.map(({ unread = {}, ...c }) => {
+      const other = c.participants.map(p => p.toString()).find(p => p !== userId);
+      c.participants = c.participants.map(p => ({ _id: p, name: names.get(p.toString()) }));
+      c.unreadIncoming = unread[userId] || 0; // messages I need to read
+      c.unreadOutgoing = (other && unread[other]) || 0; // messages the other user hasn't read
+      return c;
     });
     res.json({ conversations: payload });
   } catch (err) {
@@ -51,28 +38,63 @@ router.get('/', auth, async (req, res) => {
   }
 });
 
-// GET /api/conversations/:id/messages?limit=50&skip=0 - paginated messages
+// Only the fields the chat renders
+const MESSAGE_FIELDS = 'conversationId sender text delivered createdAt';
+
+// Page cursors are "<createdAt ms>_<message id>"
+function encodeCursor(message) {
+  return `${new Date(message.createdAt).getTime()}_${message._id}`;
+}
+
+function decodeCursor(cursor) {
+  const match = /^(\d+)_([a-f0-9]{24})$/.exec(cursor || '');
+  if (!match) return null;
+  return { createdAt: new Date(parseInt(match[1])), _id: new mongoose.Types.ObjectId(match[2]) };
+}
+
+// GET /api/conversations/:id/messages?limit=50&before=<cursor>|after=<cursor>
+// Newest page by default; `before` pages back through history, `after`
+// fetches what arrived since. Messages are returned oldest first.
 router.get('/:id/messages', auth, async (req, res) => {
   try {
     const { id } = req.params;
-    const { limit = 50, skip = 0 } = req.query;
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || 50, 1), 200);
     if (!mongoose.Types.ObjectId.isValid(id)) return res.status(400).json({ message: 'Invalid conversation id.' });
-    const convo = await Conversation.findById(id);
-    if (!convo) return res.status(404).json({ message: 'Conversation not found.' });
-    if (!convo.participants.map(p => p.toString()).includes(req.user.id)) {
+    const before = req.query.before ? decodeCursor(req.query.before) : null;
+    const after = req.query.after ? decodeCursor(req.query.after) : null;
+    if ((req.query.before && !before) || (req.query.after && !after)) {
+      return res.status(400).json({ message: 'Invalid cursor.' });
+    }
+    const participants = await conversationMembers.getParticipants(id);
+    if (!participants) return res.status(404).json({ message: 'Conversation not found.' });
+    if (!participants.has(req.user.id)) {
       return res.status(403).json({ message: 'Not a participant of this conversation.' });
     }
-    const docs = await Message.find({ conversationId: id })
-      .sort({ createdAt: -1 })
-      .skip(parseInt(skip))
-      .limit(parseInt(limit));
-    const currentId = req.user.id.toString();
-    const messages = docs.reverse().map((m) => {
-      const obj = m.toObject();
-      obj.isSelf = (m.sender?.toString?.() || `${m.sender}`) === currentId;
-      return obj;
+
+    // Keyset seeks on { conversationId, createdAt, _id } - no skip
+    const filter = { conversationId: new mongoose.Types.ObjectId(id) };
+    const direction = after ? 1 : -1;
+    const cursor = after || before;
+    if (cursor) {
+      const op = after ? '$gt' : '$lt';
+      filter.$or = [
+        { createdAt: { [op]: cursor.createdAt } },
+        { createdAt: cursor.createdAt, _id: { [op]: cursor._id } }
+      ];
+    }
+    const docs = await Message.find(filter)
+      .select(MESSAGE_FIELDS)
+      .sort({ createdAt: direction, _id: direction })
+      .limit(limit)
+      .lean();
+    const messages = after ? docs : docs.reverse();
+
+    res.json({
+      messages,
+      hasMore: docs.length === limit,
+      before: messages.length ? encodeCursor(messages[0]) : null,
+      after: messages.length ? encodeCursor(messages[messages.length - 1]) : null
     });
-    res.json({ messages });
   } catch (err) {
     console.error('[Conversations][GetMessages][ERROR]', err);
     res.status(500).json({ message: 'Failed to fetch messages.' });
@@ -90,19 +112,20 @@ router.post('/:id/messages', auth, async (req, res) => {
     if (text.length === 0) return res.status(400).json({ message: 'Message cannot be empty.' });
     if (text.length > 2000) return res.status(400).json({ message: 'Message too long (max 2000).' });
 
-    const convo = await Conversation.findById(id);
-    if (!convo) return res.status(404).json({ message: 'Conversation not found.' });
-    const participants = convo.participants.map(p => p.toString());
-    if (!participants.includes(req.user.id)) return res.status(403).json({ message: 'Not a participant of this conversation.' });
+    const participants = await conversationMembers.getParticipants(id);
+    if (!participants) return res.status(404).json({ message: 'Conversation not found.' });
+    if (!participants.has(req.user.id)) return res.status(403).json({ message: 'Not a participant of this conversation.' });
 
     const message = new Message({ conversationId: id, sender: req.user.id, text });
     await message.save();
 
-    convo.lastMessage = text;
-    await convo.save();
+    const otherParticipant = Array.from(participants).find(p => p !== req.user.id);
+    await Conversation.updateOne(
+      { _id: id },
+      { $set: { lastMessage: text }, $inc: { [`unread.${otherParticipant}`]: 1 } }
+    );
 
-    const otherParticipant = participants.find(p => p !== req.user.id);
-  const notified = emitToUser(otherParticipant, 'chat_message', { message });
+  const notified = await emitToUser(otherParticipant, 'chat_message', { message });
     console.log(`[Message] ${message._id} sent in convo ${id} from ${req.user.id} -> ${otherParticipant} Notified: ${notified}`);
 
   // Include isSelf flag for the sender in REST response
@@ -115,4 +138,20 @@ router.post('/:id/messages', auth, async (req, res) => {
   }
 });
 
+// GET /api/conversations/cache-stats - membership and name cache statistics (admins)
+router.get('/cache-stats', auth, statsAccess, (req, res) => {
+  res.json({
+    membership: conversationMembers.getMembershipStats(),
+    names: getNameCacheStats()
+  });
+});
+
+// GET /api/conversations/event-stats - socket events received vs emitted (admins)
+router.get('/event-stats', auth, statsAccess, (req, res) => {
+  res.json({
+    typing: getCoalescerStats(),
+    readReceipts: getReadReceiptStats()
+  });
+});
+
 module.exports = router;
@@ -2,29 +2,111 @@ const express = require('express');
 const mongoose = require('mongoose');
 const authMiddleware = require('../middleware/authMiddleware');
 const Event = require('../models/Event');
+const EventAttendance = require('../models/EventAttendance');
 const User = require('../models/User');
 const updateXP = require('../utils/updateXP');
+const eventRanking = require('../utils/eventRanking');
+const { runStep } = require('../utils/pendingSteps');
 
 const router = express.Router();
 
-// Get recommended events
+const JOIN_XP = 20;
+
+// Set attendeeCount from the attendance rows (idempotent, so safe when it
+// isn't known whether an earlier $inc landed)
+async function recountAttendees(eventId) {
+  const attendeeCount = await EventAttendance.countDocuments({ eventId });
+  await Event.updateOne({ _id: eventId }, { $set: { attendeeCount } });
+  return attendeeCount;
+}
+
+/**
+ * Count the join and award its XP, each at most once
+ * (utils/pendingSteps.js). A step that fails is left for a repeat join to
+ * finish.
+ * @param {Object} user - Authenticated user
+ * @param {Object} event - Event with _id, title, tagsNormalized, startsAt
+ * @param {Array<String>} pending - Steps the attendance row still holds
+ * @param {Boolean} isNew - Row inserted by this request (the count can be
+ *   incremented instead of recounted)
+ * @returns {Promise<Object>} { done, xp, attendeeCount } - done is false
+ *   when this request claimed no step
+ */
+async function finishJoin(user, event, pending, isNew) {
+  const filter = { eventId: event._id, userId: user._id };
+  const steps = [];
+
+  if (pending.includes('count')) {
+    steps.push(runStep(EventAttendance, filter, 'count', async () => {
+      let attendeeCount;
+      if (isNew) {
+        try {
+          ({ attendeeCount } = await Event.findByIdAndUpdate(
+            event._id,
+            { $inc: { attendeeCount: 1 } },
+            { new: true, projection: { attendeeCount: 1 } }
+          ).lean());
+        } catch (error) {
+          // Whether the increment landed is unknown; recount instead
+          console.error('Join count error:', error);
+        }
+      }
+      if (attendeeCount === undefined) attendeeCount = await recountAttendees(event._id);
+      eventRanking.recordJoin(event, attendeeCount);
+      return attendeeCount;
+    }).then(({ claimed, value }) => ({ claimed, attendeeCount: value })));
+  }
+
+  if (pending.includes('xp')) {
+    steps.push(runStep(EventAttendance, filter, 'xp', () => updateXP(user._id, JOIN_XP, `Joining event: ${event.title}`))
+      .then(({ claimed, value }) => ({ claimed, xp: value })));
+  }
+
+  const results = await Promise.all(steps);
+  const pick = field => (results.find(result => result[field] !== undefined) || {})[field];
+  return { done: results.some(result => result.claimed), xp: pick('xp'), attendeeCount: pick('attendeeCount') };
+}
+
+// Page cursors are "<score>_<startsAt ms>_<event id>", the last result of
+// the previous page
+function encodeRankCursor({ score, startsAt, id }) {
+  return `${score}_${startsAt}_${id}`;
+}
+
+function decodeRankCursor(cursor) {
+  const match = /^(\d+(?:\.\d+)?)_(\d+)_([a-f0-9]{24})$/.exec(cursor || '');
+  if (!match) return null;
+  return { score: parseFloat(match[1]), startsAt: parseInt(match[2]), id: match[3] };
+}
+
+// Get recommended events: upcoming events ranked by tag overlap with the
+// user's interests and skills, how soon they start and how many joined.
+// Paged by ?limit= and ?cursor= (the next cursor is returned in the
+// X-Next-Cursor header). Only the soonest EVENT_RANK_MAX_CANDIDATES
+// matching events (default 2000) are ranked; when more matched, every
+// page carries X-Ranking-Truncated: true and paging ends at that cap.
 router.get('/', authMiddleware, async (req, res) => {
   try {
-    const currentUser = req.user;
-    const allEvents = await Event.find().sort({ date: 1 });
-    
-    // Filter events based on user interests
-    const recommendedEvents = allEvents
-      .filter(event => {
-        return event.tags.some(tag => 
-          currentUser.interests.some(interest => 
-            interest.toLowerCase() === tag.toLowerCase()
-          )
-        );
-      })
-      .slice(0, 5);
-
-    res.json(recommendedEvents);
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || 5, 1), 50);
+
+    let after = null;
+    if (req.query.cursor) {
+      after = decodeRankCursor(req.query.cursor);
+      if (!after) {
+        return res.status(400).json({ message: 'Invalid cursor' });
+      }
+    }
+
+    const { events, next, truncated } = await eventRanking.getRankedEvents(req.user, after, limit);
+
+    if (next) {
+      res.set('X-Next-Cursor', encodeRankCursor(next));
+    }
+    if (truncated) {
+      res.set('X-Ranking-Truncated', 'true');
+    }
+
+    res.json(events);
   } catch (error) {
     console.error('Events error:', error);
     res.status(500).json({ message: 'Server error getting events' });
@@ -46,6 +128,7 @@ router.post('/', authMiddleware, async (req, res) => {
     });
 
     await event.save();
+    eventRanking.addEvent(event);
     res.status(201).json(event);
   } catch (error) {
     console.error('Create event error:', error);
@@ -62,20 +145,44 @@ router.post('/join', authMiddleware, async (req, res) => {
     if (!eventId) {
       return res.status(400).json({ message: 'Event ID is required' });
     }
+    if (!mongoose.Types.ObjectId.isValid(eventId)) {
+      return res.status(400).json({ message: 'Invalid event ID' });
+    }
 
     // Verify event exists
-    const event = await Event.findById(eventId);
+    const event = await Event.findById(eventId).select('title tagsNormalized startsAt attendeeCount').lean();
     if (!event) {
       return res.status(404).json({ message: 'Event not found' });
     }
 
-    // Check if already joined
-    const eventMongoId = new mongoose.Types.ObjectId(eventId);
-    const alreadyJoined = currentUser.joinedEvents && currentUser.joinedEvents.some(
-      joinedEvent => joinedEvent.toString() === eventId.toString()
-    );
+    // One idempotent upsert: only the first join inserts a row, along
+    // with the follow-up steps it still owes
+    const filter = { eventId: event._id, userId: currentUser._id };
+    let isNew;
+    try {
+      const { upsertedCount } = await EventAttendance.updateOne(
+        filter,
+        { $setOnInsert: { joinedAt: new Date(), pending: ['count', 'xp'] } },
+        { upsert: true }
+      );
+      isNew = upsertedCount === 1;
+    } catch (error) {
+      // A concurrent join of the same event won the insert
+      if (error.code !== 11000) throw error;
+      isNew = false;
+    }
 
-    if (alreadyJoined) {
+    // Already joined: finish the count/XP if an earlier attempt failed
+    let pending = ['count', 'xp'];
+    if (!isNew) {
+      const attendance = await EventAttendance.findOne(filter).select('pending').lean();
+      pending = (attendance && attendance.pending) || [];
+    }
+    const { done, xp, attendeeCount } = pending.length
+      ? await finishJoin(currentUser, event, pending, isNew)
+      : { done: false };
+
+    if (!done) {
       return res.status(400).json({ 
         message: 'You have already joined this event!',
         alreadyJoined: true,
@@ -83,19 +190,10 @@ router.post('/join', authMiddleware, async (req, res) => {
       });
     }
 
-    // Add event to joinedEvents
-    if (!currentUser.joinedEvents) {
-      currentUser.joinedEvents = [];
-    }
-    currentUser.joinedEvents.push(eventMongoId);
-    await currentUser.save();
-
-    // Add XP using utility function (only once per event)
-    const updatedXP = await updateXP(currentUser._id, 20, `Joining event: ${event.title}`);
-
     res.json({
       message: 'Event joined successfully!',
-      xp: updatedXP
+      xp: xp !== undefined ? xp : currentUser.xp,
+      attendeeCount: attendeeCount !== undefined ? attendeeCount : event.attendeeCount || 0
     });
   } catch (error) {
     console.error('Join event error:', error);
@@ -103,5 +201,58 @@ router.post('/join', authMiddleware, async (req, res) => {
   }
 });
 
+// List who joined an event, in join order. Paged by ?limit= and ?cursor=
+// (the id of the last attendance row seen).
+router.get('/:eventId/attendees', authMiddleware, async (req, res) => {
+  try {
+    const { eventId } = req.params;
+    const { cursor } = req.query;
+    if (!mongoose.Types.ObjectId.isValid(eventId)) {
+      return res.status(400).json({ message: 'Invalid event ID' });
+    }
+    if (cursor && !mongoose.Types.ObjectId.isValid(cursor)) {
+      return res.status(400).json({ message: 'Invalid cursor' });
+    }
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || 20, 1), 100);
+
+    const event = await Event.findById(eventId).select('attendeeCount').lean();
+    if (!event) {
+      return res.status(404).json({ message: 'Event not found' });
+    }
+
+    // Index { eventId, _id }: seeks straight to the cursor
+    const filter = { eventId: event._id };
+    if (cursor) filter._id = { $gt: new mongoose.Types.ObjectId(cursor) };
+    const rows = await EventAttendance.find(filter)
+      .select('userId joinedAt')
+      .sort({ _id: 1 })
+      .limit(limit)
+      .lean();
+
+    const users = await User.find({ _id: { $in: rows.map(row => row.userId) } })
+      .select('name branch year')
+      .lean();
+    const usersById = new Map(users.map(user => [user._id.toString(), user]));
+
+    res.json({
+      attendeeCount: event.attendeeCount || 0,
+      attendees: rows.map(row => {
+        const user = usersById.get(row.userId.toString()) || {};
+        return {
+          id: row.userId,
+          name: user.name || '',
+          branch: user.branch || '',
+          year: user.year || null,
+          joinedAt: row.joinedAt
+        };
+      }),
+      nextCursor: rows.length === limit ? rows[rows.length - 1]._id : null
+    });
+  } catch (error) {
+    console.error('Event attendees error:', error);
+    res.status(500).json({ message: 'Server error getting attendees' });
+  }
+});
+
 module.exports = router;
 
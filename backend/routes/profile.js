@@ -4,6 +4,7 @@ const auth = require('../middleware/authMiddleware');
 const ConnectionRequest = require('../models/ConnectionRequest');
 const User = require('../models/User');
 const mongoose = require('mongoose');
+const { PUBLIC_PROFILE } = require('../utils/userProjections');
 
 // GET /api/profile/preview/:userId
 router.get('/preview/:userId', auth, async (req, res) => {
@@ -14,7 +15,7 @@ router.get('/preview/:userId', auth, async (req, res) => {
     }
 
     // Validate there is a pending request FROM userId TO current user
-    const pending = await ConnectionRequest.findOne({
+    const pending = await ConnectionRequest.exists({
       from: userId,
       to: req.user._id,
       status: 'pending'
@@ -26,7 +27,7 @@ router.get('/preview/:userId', auth, async (req, res) => {
     }
 
     // Fetch limited public fields
-    const user = await User.findById(userId).select('name about branch year xp skills interests avatar');
+    const user = await User.findById(userId).select(PUBLIC_PROFILE).lean();
     if (!user) return res.status(404).json({ message: 'User not found' });
 
     const profile = {
@@ -54,12 +55,12 @@ router.get('/preview', auth, async (req, res) => {
     if (!userId || !mongoose.Types.ObjectId.isValid(userId)) {
       return res.status(400).json({ message: 'Invalid user id' });
     }
-    const pending = await ConnectionRequest.findOne({ from: userId, to: req.user._id, status: 'pending' });
+    const pending = await ConnectionRequest.exists({ from: userId, to: req.user._id, status: 'pending' });
     if (!pending) {
       console.warn(`[ProfilePreview][Q] Unauthorized attempt by ${req.user._id} to preview ${userId}`);
       return res.status(403).json({ message: 'Not authorized to preview this profile.' });
     }
-    const user = await User.findById(userId).select('name about branch year xp skills interests avatar');
+    const user = await User.findById(userId).select(PUBLIC_PROFILE).lean();
     if (!user) return res.status(404).json({ message: 'User not found' });
     const profile = {
       id: user._id,
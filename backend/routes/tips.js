@@ -1,22 +1,20 @@
 const express = require('express');
 const authMiddleware = require('../middleware/authMiddleware');
+const statsAccess = require('../middleware/statsAccess');
 const updateXP = require('../utils/updateXP');
-const axios = require('axios');
+const tipService = require('../utils/tipService');
+const tipsCache = require('../utils/tipsCache');
+const tipEngine = require('../utils/tipEngine');
 
 const router = express.Router();
 
-// In-memory cache for tips (Map: userId-date => tips data)
-const tipsCache = new Map();
-
-/**
- * Generate cache key for user and date
- * @param {String} userId - User ID
- * @param {String} date - Date in YYYY-MM-DD format
- * @returns {String} Cache key
- */
-function getCacheKey(userId, date) {
-  return `${userId}-${date}`;
-}
+// How the remote model is used behind the local tip engine:
+//   off        - local templates only, no network
+//   background - serve local tips now; model tips fill the cache for later
+//   wait       - wait up to TIPS_MODEL_WAIT_MS for the model, else local tips
+// Defaults to background when a model is configured, off otherwise.
+const MODEL_MODE = process.env.TIPS_MODEL_MODE ||
+  (process.env.HF_API_KEY || process.env.TIPS_MODEL_URL ? 'background' : 'off');
 
 /**
  * Get today's date in YYYY-MM-DD format
@@ -27,73 +25,6 @@ function getTodayDate() {
   return today.toISOString().split('T')[0]; // Returns YYYY-MM-DD
 }
 
-/**
- * Call Hugging Face API to generate personalized tips
- * @param {String} name - User's name
- * @param {Number} xp - User's XP level
- * @param {String} mood - User's mood
- * @param {String} activity - User's recent activity
- * @returns {Promise<Array<String>>} Array of generated tips
- */
-async function generateAITips(name, xp, mood, activity) {
-  try {
-    const prompt = `You are SmartBuddy, an AI companion for students.
-Generate 3 short motivational or wellness tips (<25 words each)
-personalized for ${name}, XP level ${xp}, feeling ${mood},
-with recent activity ${activity}.
-Keep tone friendly, positive, and helpful.`;
-
-    const response = await axios.post(
-      'https://api-inference.huggingface.co/models/google/flan-t5-small',
-      { inputs: prompt },
-      {
-        headers: {
-          'Authorization': `Bearer ${process.env.HF_API_KEY}`,
-          'Content-Type': 'application/json',
-        },
-      }
-    );
-
-    // Parse the response - flan-t5-small returns a generated text
-    const generatedText = response.data[0]?.generated_text || '';
-    
-    // Split the response into individual tips
-    // Try to split by common delimiters or lines
-    let tips = [];
-    if (generatedText) {
-      // Remove any prefix/suffix text if present
-      const cleanedText = generatedText.replace(/^(You are SmartBuddy[^:]*:)?\s*/i, '').trim();
-      
-      // Try to split by numbers or bullets
-      tips = cleanedText
-        .split(/\d+\.|[-•]\s*/)
-        .map(tip => tip.trim())
-        .filter(tip => tip.length > 0 && tip.length < 150) // Filter out invalid tips
-        .slice(0, 3); // Limit to 3 tips
-    }
-
-    // If we couldn't parse properly, create fallback tips
-    if (tips.length === 0) {
-      tips = [
-        `Hey ${name}! At your level, remember that small steps lead to big achievements. Keep pushing forward!`,
-        `Feeling ${mood}? Take a moment to breathe and reflect. You're doing great at level ${xp}!`,
-        `Your ${activity} shows dedication, ${name}! Every effort counts towards your growth.`
-      ];
-    }
-
-    return tips;
-  } catch (error) {
-    console.error('Error calling Hugging Face API:', error.message);
-    
-    // Return fallback tips if API fails
-    return [
-      `Hey ${name}! Keep going strong at level ${xp}! Your perseverance is admirable.`,
-      `Feeling ${mood}? Remember that every challenge is an opportunity to grow. You've got this!`,
-      `Your recent ${activity} is building your success, ${name}. Stay positive and keep moving forward!`
-    ];
-  }
-}
-
 /**
  * POST /api/tips
  * Generate or retrieve personalized tips for the authenticated user
@@ -113,11 +44,10 @@ router.post('/', authMiddleware, async (req, res) => {
     }
 
     const today = getTodayDate();
-    const cacheKey = getCacheKey(userId, today);
 
-    // Check cache first
-    if (tipsCache.has(cacheKey)) {
-      const cachedData = tipsCache.get(cacheKey);
+    // Check cache first (bounded LRU, then shared/persistent stores)
+    const cachedData = await tipsCache.getTips(userId, today);
+    if (cachedData) {
       console.log(`Returning cached tips for ${name} (${today})`);
       
       return res.json({
@@ -128,28 +58,27 @@ router.post('/', authMiddleware, async (req, res) => {
       });
     }
 
-    // Generate new tips via AI
-    console.log(`Generating new AI tips for ${name} (${today})`);
-    const tips = await generateAITips(name, xp, mood, activity);
-
-    // Cache the tips
-    tipsCache.set(cacheKey, {
-      tips,
-      date: today,
-      timestamp: Date.now()
-    });
-
-    // Schedule cache cleanup after 24 hours
-    setTimeout(() => {
-      tipsCache.delete(cacheKey);
-      console.log(`Cleaned up cache for ${cacheKey}`);
-    }, 24 * 60 * 60 * 1000); // 24 hours
+    // Local engine first: personalized templates in microseconds, stable
+    // for the user all day
+    const params = { name, xp, mood, activity };
+    const localTips = tipEngine.renderTips({ ...params, branch: req.user.branch }, { seed: `${userId}-${today}` });
+    const onFresh = tips => tipsCache.setTips(userId, today, tips);
+
+    let result = { tips: localTips, source: 'local' };
+    if (MODEL_MODE === 'background') {
+      // Concurrent requests share one model call (see utils/tipService.js)
+      tipService.generateTips(`${userId}-${today}`, params, { onFresh });
+    } else if (MODEL_MODE === 'wait') {
+      result = await tipService.getTips(`${userId}-${today}`, params, { onFresh, fallback: localTips });
+      if (result.source === 'fallback') result.source = 'local';
+    }
 
     res.json({
-      tips,
+      tips: result.tips,
       cached: false,
+      source: result.source,
       date: today,
-      message: 'AI Tips (fresh)'
+      message: result.source === 'model' ? 'AI Tips (fresh)' : 'Tips (local)'
     });
   } catch (error) {
     console.error('Error in tips route:', error);
@@ -160,5 +89,18 @@ router.post('/', authMiddleware, async (req, res) => {
   }
 });
 
+/**
+ * GET /api/tips/stats
+ * Local engine, model generation and tips cache statistics (STATS_ADMIN_EMAILS only)
+ */
+router.get('/stats', authMiddleware, statsAccess, (req, res) => {
+  res.json({
+    modelMode: MODEL_MODE,
+    engine: tipEngine.getTipEngineStats(),
+    generation: tipService.getTipServiceStats(),
+    cache: tipsCache.getTipsCacheStats()
+  });
+});
+
 module.exports = router;
 
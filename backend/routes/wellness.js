@@ -1,38 +1,64 @@
 const express = require('express');
 const authMiddleware = require('../middleware/authMiddleware');
-const User = require('../models/User');
+const MoodCheckin = require('../models/MoodCheckin');
 const updateXP = require('../utils/updateXP');
+const tipEngine = require('../utils/tipEngine');
+const moodStats = require('../utils/moodStats');
+const { runStep } = require('../utils/pendingSteps');
 
 const router = express.Router();
 
-// Get wellness tip
+const CHECKIN_XP = 10;
+
+/**
+ * Award the check-in XP and fold it into the mood stats, each at most once
+ * (utils/pendingSteps.js). A step that fails is left for a repeat
+ * check-in to finish.
+ * @param {Object} user - Authenticated user
+ * @param {Object} checkin - MoodCheckin with _id, day, pending
+ * @param {Boolean} isNew - Created by this request (stats can be bumped
+ *   incrementally instead of rebuilt)
+ * @returns {Promise<Object>} { done, xp } - done is false when this request
+ *   claimed no step (another request already took them)
+ */
+async function finishCheckin(user, checkin, isNew) {
+  const pending = checkin.pending || [];
+  const filter = { _id: checkin._id };
+  const steps = [];
+
+  if (pending.includes('xp')) {
+    steps.push(runStep(MoodCheckin, filter, 'xp', () => updateXP(user._id, CHECKIN_XP, 'Wellness check-in'))
+      .then(({ claimed, value }) => ({ claimed, xp: value })));
+  }
+
+  if (pending.includes('stats')) {
+    steps.push(runStep(MoodCheckin, filter, 'stats', async () => {
+      if (isNew) {
+        try {
+          await moodStats.recordCheckin(user._id, checkin.day, moodStats.normalizeMood(checkin.mood));
+          return;
+        } catch (error) {
+          // Whether the increment landed is unknown; rebuild instead
+          console.error('Check-in stats error:', error);
+        }
+      }
+      await moodStats.rebuildStats(user._id);
+    }));
+  }
+
+  const results = await Promise.all(steps);
+  const xpStep = results.find(result => result.xp !== undefined);
+  return { done: results.some(result => result.claimed), xp: xpStep ? xpStep.xp : undefined };
+}
+
+// Get wellness tip (local tip engine, personalized for the user)
 router.get('/', authMiddleware, async (req, res) => {
   try {
     const { mood } = req.query;
-    
-    // Define tips based on mood
-    const tips = {
-      Happy: [
-        "Keep it up! Try joining today's AI Workshop 🎯",
-        "Your positive energy is contagious! Keep spreading the smiles.",
-        "A great day! Consider helping a friend with their studies."
-      ],
-      Neutral: [
-        "Take a 10-minute break, you got this.",
-        "Every moment is a fresh beginning. Keep going!",
-        "Small progress is still progress. Stay steady."
-      ],
-      Stressed: [
-        "Breathe deeply — focus on one small task at a time.",
-        "It's okay to take a step back. You're doing your best.",
-        "Remember: this moment will pass. You've overcome challenges before."
-      ]
-    };
-
-    const selectedTips = tips[mood] || tips.Neutral;
-    const randomTip = selectedTips[Math.floor(Math.random() * selectedTips.length)];
-
-    res.json({ tip: randomTip });
+    const { name, xp, branch } = req.user;
+    const tip = tipEngine.renderTip({ name, mood, xp, branch, activity: 'wellness' });
+
+    res.json({ tip });
   } catch (error) {
     console.error('Wellness tip error:', error);
     res.status(500).json({ message: 'Server error getting wellness tip' });
@@ -42,45 +68,44 @@ router.get('/', authMiddleware, async (req, res) => {
 // Check-in and add XP
 router.post('/checkin', authMiddleware, async (req, res) => {
   try {
-    const { mood, tip } = req.body;
-    const user = req.user;
-
-    // Check if user has already checked in today
-    const today = new Date();
-    today.setHours(0, 0, 0, 0);
-    
-    // Ensure moodHistory is an array
-    const userMoodHistory = user.moodHistory || [];
-    
-    const hasCheckedInToday = userMoodHistory.some(entry => {
-      const entryDate = new Date(entry.date);
-      entryDate.setHours(0, 0, 0, 0);
-      return entryDate.getTime() === today.getTime();
+    const mood = moodStats.normalizeMood(req.body.mood);
+    if (!mood) {
+      return res.status(400).json({ message: `Mood must be one of: ${moodStats.MOODS.join(', ')}` });
+    }
+    // Clients normally send the tip they showed; otherwise pick one for the mood
+    const tip = req.body.tip || tipEngine.renderTip({
+      name: req.user.name, xp: req.user.xp, branch: req.user.branch, mood, activity: 'wellness'
     });
+    const day = moodStats.dayKey();
+
+    // The unique (userId, day) index rejects a second check-in for today
+    let checkin;
+    let isNew = true;
+    try {
+      checkin = await MoodCheckin.create({ userId: req.user._id, day, mood: req.body.mood, tip, pending: ['xp', 'stats'] });
+    } catch (error) {
+      if (error.code !== 11000) throw error;
+      // Today's check-in exists; finish its XP/stats if an earlier attempt failed
+      checkin = await MoodCheckin.findOne({ userId: req.user._id, day }).select('day mood tip pending').lean();
+      isNew = false;
+    }
 
-    if (hasCheckedInToday) {
+    // Add XP and update stats (only for the first check-in today)
+    const { done, xp } = checkin && checkin.pending && checkin.pending.length
+      ? await finishCheckin(req.user, checkin, isNew)
+      : { done: false };
+    if (!done) {
       return res.status(400).json({ 
         message: 'You have already checked in today! Come back tomorrow for more XP.',
         alreadyCheckedIn: true,
-        xp: user.xp
+        xp: req.user.xp
       });
     }
 
-    // Add XP using utility function (only if not checked in today)
-    const updatedXP = await updateXP(user._id, 10, 'Wellness check-in');
-    
-    // Add to mood history
-    user.moodHistory.push({
-      mood,
-      date: new Date(),
-      tip
-    });
-
-    await user.save();
-
     res.json({
       message: 'Check-in successful',
-      xp: updatedXP,
+      xp: xp !== undefined ? xp : req.user.xp,
+      tip: checkin.tip,
       alreadyCheckedIn: false
     });
   } catch (error) {
@@ -89,5 +114,49 @@ router.post('/checkin', authMiddleware, async (req, res) => {
   }
 });
 
+// GET /api/wellness/stats?weeks=8&months=6
+// Weekly/monthly mood counts and streaks, precomputed at check-in time
+router.get('/stats', authMiddleware, async (req, res) => {
+  try {
+    const weeks = Math.min(Math.max(parseInt(req.query.weeks) || 8, 1), 53);
+    const months = Math.min(Math.max(parseInt(req.query.months) || 6, 1), 24);
+    const summary = await moodStats.getMoodSummary(req.user._id, { weeks, months });
+
+    res.json(summary);
+  } catch (error) {
+    console.error('Wellness stats error:', error);
+    res.status(500).json({ message: 'Server error getting wellness stats' });
+  }
+});
+
+// GET /api/wellness/history?limit=30&before=YYYY-MM-DD
+// Check-ins newest first; `before` pages back from a day
+router.get('/history', authMiddleware, async (req, res) => {
+  try {
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || 30, 1), 100);
+    const { before } = req.query;
+    if (before && !/^\d{4}-\d{2}-\d{2}$/.test(before)) {
+      return res.status(400).json({ message: 'Invalid before day' });
+    }
+
+    const filter = { userId: req.user._id };
+    if (before) filter.day = { $lt: before };
+    const checkins = await MoodCheckin.find(filter)
+      .select('day mood tip createdAt -_id')
+      .sort({ day: -1 })
+      .limit(limit)
+      .lean();
+
+    res.json({
+      checkins,
+      hasMore: checkins.length === limit,
+      before: checkins.length ? checkins[checkins.length - 1].day : null
+    });
+  } catch (error) {
+    console.error('Wellness history error:', error);
+    res.status(500).json({ message: 'Server error getting wellness history' });
+  }
+});
+
 module.exports = router;
 
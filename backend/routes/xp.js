@@ -2,6 +2,7 @@ const express = require('express');
 const authMiddleware = require('../middleware/authMiddleware');
 const User = require('../models/User');
 const updateXP = require('../utils/updateXP');
+const leaderboard = require('../utils/leaderboard');
 
 const router = express.Router();
 
@@ -11,7 +12,7 @@ router.get('/', authMiddleware, async (req, res) => {
     const user = req.user;
     
     // Refresh user data from database to get latest XP
-    const updatedUser = await User.findById(user._id);
+    const updatedUser = await User.findById(user._id).select('xp').lean();
     
     if (!updatedUser) {
       return res.status(404).json({ message: 'User not found' });
@@ -53,5 +54,65 @@ router.post('/add', authMiddleware, async (req, res) => {
   }
 });
 
+// Board selected by optional ?branch=&year= filters
+function boardFromQuery(query) {
+  const year = parseInt(query.year);
+  return leaderboard.boardKey({
+    branch: typeof query.branch === 'string' ? query.branch.trim() : undefined,
+    year: year >= 1 && year <= 4 ? year : undefined
+  });
+}
+
+// Get a page of the XP leaderboard plus the current user's rank
+router.get('/leaderboard', authMiddleware, async (req, res) => {
+  try {
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || 20, 1), 100);
+    const offset = Math.max(parseInt(req.query.offset) || 0, 0);
+    const board = boardFromQuery(req.query);
+
+    await leaderboard.ensureLoaded();
+    const page = leaderboard.getPage(board, offset, limit);
+
+    // Names for this page only - an _id lookup, never a sort over users
+    const users = await User.find({ _id: { $in: page.entries.map(entry => entry.userId) } })
+      .select('name')
+      .lean();
+    const usersById = new Map(users.map(user => [user._id.toString(), user]));
+
+    res.json({
+      board,
+      total: page.total,
+      offset,
+      limit,
+      entries: page.entries.map(entry => ({
+        ...entry,
+        name: usersById.get(entry.userId)?.name || ''
+      })),
+      me: leaderboard.getRank(board, req.user._id)
+    });
+  } catch (error) {
+    console.error('Error fetching leaderboard:', error);
+    res.status(500).json({ message: 'Server error fetching leaderboard', error: error.message });
+  }
+});
+
+// Get the current user's rank
+router.get('/rank', authMiddleware, async (req, res) => {
+  try {
+    const board = boardFromQuery(req.query);
+    await leaderboard.ensureLoaded();
+    const rank = leaderboard.getRank(board, req.user._id);
+
+    if (!rank) {
+      return res.status(404).json({ message: 'User is not on this leaderboard' });
+    }
+
+    res.json({ board, ...rank });
+  } catch (error) {
+    console.error('Error fetching rank:', error);
+    res.status(500).json({ message: 'Server error fetching rank', error: error.message });
+  }
+});
+
 module.exports = router;
 
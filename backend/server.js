@@ -8,8 +8,15 @@ const http = require("http");
 const { Server } = require("socket.io");
 const jwt = require("jsonwebtoken");
 const User = require("./models/User");
-const Conversation = require("./models/Conversation");
-const Message = require("./models/Message");
+const matchEngine = require("./utils/matchEngine");
+const leaderboard = require("./utils/leaderboard");
+const { scheduleMatchJobs } = require("./utils/matchBatchJob");
+const { scheduleTipPregeneration } = require("./utils/tipPregeneration");
+const { drainXPLedger } = require("./utils/updateXP");
+const messagePipeline = require("./utils/messagePipeline");
+const conversationMembers = require("./utils/conversationMembers");
+const eventCoalescer = require("./utils/eventCoalescer");
+const { queueReadReceipt, flushReadReceipts } = require("./utils/readReceipts");
 
 // Debug: Log environment variables (without sensitive data)
 console.log('🔍 Environment Check:');
@@ -38,7 +45,10 @@ if (missingVars.length > 0) {
 
 const JWT_SECRET = process.env.JWT_SECRET;
 const MONGODB_URI = process.env.MONGODB_URI;
-const { setIO, getUserSocketMap } = require("./socket");
+const { setIO, usePresence, getPresence, userRoom } = require("./socket");
+const socketScaling = require("./utils/socketScaling");
+const { getSharedStateClient, isClusterWorker, isSharedStateEnabled } = require("./utils/redisConnection");
+const stateSync = require("./utils/stateSync");
 
 const app = express();
 
@@ -64,6 +74,7 @@ app.use(
     credentials: true,
     methods: ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allowedHeaders: ["Content-Type", "Authorization"],
+    exposedHeaders: ["X-Next-Cursor", "X-Ranking-Truncated"],
   })
 );
 
@@ -96,7 +107,27 @@ mongoose
     useNewUrlParser: true,
     useUnifiedTopology: true,
   })
-  .then(() => console.log("✅ MongoDB Connected"))
+  .then(() => {
+    console.log("✅ MongoDB Connected");
+    // Warm the match index so the first /api/match call doesn't pay for it
+    matchEngine.ensureLoaded().catch((err) => console.error("Match index load error:", err));
+    leaderboard.ensureLoaded().catch((err) => console.error("Leaderboard load error:", err));
+    // Under cluster.js only the first worker runs the match jobs
+    if (process.env.MATCH_SOURCE === "table" && (!isClusterWorker() || process.env.CLUSTER_WORKER_SLOT === "0")) {
+      scheduleMatchJobs({
+        nightlyHour: parseInt(process.env.MATCH_JOB_NIGHTLY_HOUR || "3"),
+        incrementalMinutes: parseInt(process.env.MATCH_JOB_INCREMENTAL_MINUTES || "15"),
+      });
+    }
+    // Under cluster.js only the first worker runs the daily job
+    if (process.env.TIPS_PREGEN_ENABLED === "true" && (!isClusterWorker() || process.env.CLUSTER_WORKER_SLOT === "0")) {
+      scheduleTipPregeneration({
+        delayMinutes: parseInt(process.env.TIPS_PREGEN_DELAY_MINUTES || "5"),
+        activeDays: parseInt(process.env.TIPS_PREGEN_ACTIVE_DAYS || "7"),
+        concurrency: parseInt(process.env.TIPS_PREGEN_CONCURRENCY || "4"),
+      });
+    }
+  })
   .catch((err) => {
     console.error("❌ MongoDB Connection Error:", err);
     console.error("Please check your MONGODB_URI in Render environment variables");
@@ -113,8 +144,30 @@ const io = new Server(httpServer, {
 });
 setIO(io);
 
-// In-memory map for userId <-> socketId (from socket module)
-const userSocketMap = getUserSocketMap();
+// SOCKET_ADAPTER=redis relays room broadcasts and shares presence through
+// REDIS_URL, so several processes can serve sockets. Cluster workers
+// (cluster.js) always do, through Redis or the primary's shared store.
+// Default is in-memory.
+async function setupSocketScaling() {
+  if (process.env.SOCKET_ADAPTER !== "redis" && !isClusterWorker()) return;
+  const client = await getSharedStateClient();
+  io.adapter(socketScaling.createBusAdapter(socketScaling.createRedisBus(client)));
+  const presence = socketScaling.createRedisPresence(client);
+  // Drop entries a previous run of this node left behind; nodes that died
+  // under another id are swept by the heartbeat
+  await presence.clearNode();
+  await presence.startHeartbeat();
+  usePresence(presence);
+  console.log(`🔗 Socket.IO scaled out via ${process.env.REDIS_URL ? "Redis" : "cluster store"} (node ${socketScaling.NODE_ID})`);
+}
+
+// With shared state, changes to the per-process match index, leaderboard
+// and caches are relayed to the other processes (utils/stateSync.js)
+async function setupStateSync() {
+  if (!isSharedStateEnabled()) return;
+  await stateSync.startSync(await getSharedStateClient());
+  console.log(`🔁 In-memory indexes kept in sync across processes (node ${socketScaling.NODE_ID})`);
+}
 
 // Socket.IO connection logic
 io.on("connection", (socket) => {
@@ -124,15 +177,18 @@ io.on("connection", (socket) => {
     try {
       if (!JWT_SECRET) throw new Error("JWT_SECRET missing");
       const decoded = jwt.verify(token, JWT_SECRET);
-      const userId = decoded.id;
-      const user = await User.findById(userId);
+      // Tokens are signed with { userId } (see routes/auth.js)
+      const userId = decoded.userId || decoded.id;
+      const user = await User.exists({ _id: userId });
       if (!user) {
         socket.emit("unauthorized", { message: "Invalid user." });
         socket.disconnect();
         return;
       }
-      userSocketMap.set(userId.toString(), socket.id);
       socket.userId = userId.toString();
+      // Per-user room: emitToUser reaches every tab on every process
+      socket.join(userRoom(socket.userId));
+      await getPresence().add(socket.userId, socket.id);
       console.log("Socket authenticated for user:", userId);
       socket.emit("authenticated", { userId });
     } catch (err) {
@@ -146,12 +202,7 @@ io.on("connection", (socket) => {
   socket.on("join_conversation", async (conversationId) => {
     try {
       if (!socket.userId) return;
-      const convo = await Conversation.findById(conversationId);
-      if (!convo) return;
-      const isParticipant = convo.participants
-        .map((p) => p.toString())
-        .includes(socket.userId);
-      if (!isParticipant) return;
+      if (!(await conversationMembers.isParticipant(conversationId, socket.userId))) return;
       socket.join(conversationId.toString());
       console.log(`User ${socket.userId} joined convo ${conversationId}`);
     } catch (e) {
@@ -159,65 +210,51 @@ io.on("connection", (socket) => {
     }
   });
 
-  // Send message via socket; persist then broadcast to room
-  socket.on("send_message", async ({ conversationId, text }) => {
-    try {
-      if (!socket.userId) return;
-      const convo = await Conversation.findById(conversationId);
-      if (!convo) return;
-      const isParticipant = convo.participants
-        .map((p) => p.toString())
-        .includes(socket.userId);
-      if (!isParticipant) return;
-      const trimmed = (text || "").trim();
-      if (!trimmed) return;
-      const msg = await Message.create({
-        conversationId,
-        sender: socket.userId,
-        text: trimmed,
-      });
-      convo.lastMessage = trimmed;
-      await convo.save();
-      io.to(conversationId.toString()).emit("receive_message", {
-        message: msg,
-      });
-    } catch (e) {
-      console.error("[Socket][send_message][ERROR]", e);
-    }
+  // Send message via socket; queue for batched persistence and broadcast
+  // to the room right away (after the write when the pipeline is durable).
+  // Sends to one conversation are handled in order.
+  socket.on("send_message", (payload, ack) => {
+    const { conversationId, text } = payload || {};
+    const reply = typeof ack === "function" ? ack : () => {};
+    if (!socket.userId || !mongoose.isValidObjectId(conversationId)) return reply({ ok: false });
+    const trimmed = (text || "").trim();
+    if (!trimmed) return reply({ ok: false });
+
+    messagePipeline.sequence(conversationId, async () => {
+      try {
+        const participants = await conversationMembers.getParticipants(conversationId);
+        if (!participants || !participants.has(socket.userId)) return reply({ ok: false });
+
+        const { message, persisted } = await messagePipeline.enqueueMessage({
+          conversationId,
+          senderId: socket.userId,
+          recipientId: Array.from(participants).find((p) => p !== socket.userId),
+          text: trimmed,
+        });
+        if (messagePipeline.DURABLE) await persisted;
+
+        io.to(conversationId.toString()).emit("receive_message", { message });
+        reply({ ok: true, message });
+      } catch (e) {
+        console.error("[Socket][send_message][ERROR]", e);
+        reply({ ok: false });
+      }
+    });
   });
 
-  // Typing indicators
+  // Typing indicators, throttled per (user, conversation)
   socket.on("typing", ({ conversationId }) => {
     try {
       if (!socket.userId) return;
-      io.to(conversationId.toString()).emit("user_typing", {
-        conversationId,
-        userId: socket.userId,
-      });
+      eventCoalescer.typing(conversationId, socket.userId);
     } catch {}
   });
-  // Mark messages as read by current user
+  // Mark messages as read by current user; written and announced in batches
   socket.on("mark_read", async ({ conversationId }) => {
     try {
       if (!socket.userId) return;
-      const convo = await Conversation.findById(conversationId);
-      if (!convo) return;
-      const isParticipant = convo.participants
-        .map((p) => p.toString())
-        .includes(socket.userId);
-      if (!isParticipant) return;
-      await Message.updateMany(
-        { conversationId, sender: { $ne: socket.userId }, delivered: false },
-        { $set: { delivered: true } }
-      );
-      // Optionally notify other user so their outgoing pending count drops
-      const other = convo.participants
-        .map((p) => p.toString())
-        .find((p) => p !== socket.userId);
-      io.to(conversationId.toString()).emit("read_receipt", {
-        conversationId,
-        readerId: socket.userId,
-      });
+      if (!(await conversationMembers.isParticipant(conversationId, socket.userId))) return;
+      await queueReadReceipt(conversationId, socket.userId);
     } catch (e) {
       console.error("[Socket][mark_read][ERROR]", e);
     }
@@ -225,16 +262,15 @@ io.on("connection", (socket) => {
   socket.on("stop_typing", ({ conversationId }) => {
     try {
       if (!socket.userId) return;
-      io.to(conversationId.toString()).emit("user_stop_typing", {
-        conversationId,
-        userId: socket.userId,
-      });
+      eventCoalescer.stopTyping(conversationId, socket.userId);
     } catch {}
   });
 
   socket.on("disconnect", () => {
     if (socket.userId) {
-      userSocketMap.delete(socket.userId);
+      getPresence()
+        .remove(socket.userId, socket.id)
+        .catch((err) => console.error("[Socket][presence] Remove error:", err));
       console.log("Socket disconnected for user:", socket.userId);
     } else {
       console.log("Socket disconnected:", socket.id);
@@ -243,6 +279,100 @@ io.on("connection", (socket) => {
 });
 
 const PORT = process.env.PORT || 5000;
-httpServer.listen(PORT, () => {
-  console.log(`🚀 Server running (w/Socket.IO) on port ${PORT}`);
+const SHUTDOWN_TIMEOUT_MS = parseInt(process.env.SHUTDOWN_TIMEOUT_MS) || 10000;
+const shutdownState = { started: false };
+
+// Open connections and their requests in flight, so shutdown can close
+// idle keep-alive connections and wait for busy ones (the http server
+// doesn't track connections handed over by the cluster primary itself)
+const openConnections = new Map(); // socket -> requests in flight
+
+httpServer.on("connection", (socket) => {
+  openConnections.set(socket, 0);
+  socket.on("close", () => openConnections.delete(socket));
+});
+
+httpServer.on("request", (req, res) => {
+  const socket = req.socket;
+  if (!openConnections.has(socket)) return;
+  openConnections.set(socket, openConnections.get(socket) + 1);
+  if (shutdownState.started) res.setHeader("Connection", "close");
+  res.on("close", () => {
+    if (!openConnections.has(socket)) return;
+    const inFlight = openConnections.get(socket) - 1;
+    openConnections.set(socket, inFlight);
+    if (shutdownState.started && inFlight === 0) socket.end();
+  });
+});
+
+function drainConnections() {
+  for (const [socket, inFlight] of openConnections) {
+    if (inFlight === 0) socket.end();
+  }
+  return new Promise((resolve) => {
+    const check = () => (openConnections.size === 0 ? resolve() : setTimeout(check, 50));
+    check();
+  });
+}
+
+// Under cluster.js the primary owns the port and hands each connection to
+// a worker picked by client address, so a socket.io handshake and its
+// polling requests always land on the same worker
+function acceptStickyConnections() {
+  process.on("message", (msg, connection) => {
+    if (msg !== "smartbuddy:sticky-connection" || !connection) return;
+    if (shutdownState.started) return connection.destroy();
+    httpServer.emit("connection", connection);
+    connection.resume();
+  });
+  process.send("smartbuddy:worker-ready");
+  console.log(`🚀 Worker ${process.pid} ready (w/Socket.IO) behind cluster primary on port ${PORT}`);
+}
+
+Promise.all([setupSocketScaling(), setupStateSync()])
+  .then(() => {
+    if (isClusterWorker()) return acceptStickyConnections();
+    httpServer.listen(PORT, () => {
+      console.log(`🚀 Server running (w/Socket.IO) on port ${PORT}`);
+    });
+  })
+  .catch((err) => {
+    console.error("❌ Socket.IO scaling / state sync setup error:", err);
+    process.exit(1);
+  });
+
+// Graceful shutdown: stop taking connections, close sockets (clients
+// reconnect elsewhere), let in-flight requests finish, write buffered chat
+// messages, read receipts and XP ledger entries, drop this node's presence
+// entries, then exit. Forced exit after SHUTDOWN_TIMEOUT_MS.
+async function shutdown(reason) {
+  if (shutdownState.started) return;
+  shutdownState.started = true;
+  console.log(`🛑 Shutting down (${reason})...`);
+  setTimeout(() => {
+    console.error("❌ Shutdown timed out, exiting");
+    process.exit(1);
+  }, SHUTDOWN_TIMEOUT_MS).unref();
+
+  if (httpServer.listening) httpServer.close();
+  io.disconnectSockets(true);
+  await drainConnections();
+
+  await Promise.all([
+    messagePipeline.flushMessages(),
+    flushReadReceipts(),
+    drainXPLedger(),
+    getPresence().clearNode().catch(() => {}),
+  ]);
+  await mongoose.disconnect().catch(() => {});
+  console.log("✅ Shutdown complete");
+  process.exit(0);
+}
+
+["SIGINT", "SIGTERM"].forEach((signal) => {
+  process.once(signal, () => shutdown(signal));
+});
+// cluster.js asks its workers to stop this way
+process.on("message", (msg) => {
+  if (msg === "smartbuddy:shutdown") shutdown("cluster primary");
 });
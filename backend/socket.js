@@ -1,6 +1,9 @@
+const { createLocalPresence } = require('./utils/socketScaling');
+
 const socketState = {
   io: null,
-  userSocketMap: new Map(),
+  // userId -> open sockets; swapped for a shared registry when scaled out
+  presence: createLocalPresence(),
 };
 
 function setIO(ioInstance) {
@@ -11,12 +14,43 @@ function getIO() {
   return socketState.io;
 }
 
-function getUserSocketMap() {
-  return socketState.userSocketMap;
+function usePresence(presence) {
+  socketState.presence = presence;
+}
+
+function getPresence() {
+  return socketState.presence;
+}
+
+// Every socket of a user joins this room, on whichever process it lives
+function userRoom(userId) {
+  return `user:${userId}`;
+}
+
+/**
+ * Emit to all of a user's sockets (all tabs, all processes)
+ * @param {String} userId - User ID
+ * @param {String} event - Event name
+ * @param {*} data - Payload
+ * @returns {Promise<Boolean>} true if the user had an open socket
+ */
+async function emitToUser(userId, event, data) {
+  const io = socketState.io;
+  if (!io) return false;
+  io.to(userRoom(userId.toString())).emit(event, data);
+  try {
+    return await socketState.presence.isOnline(userId.toString());
+  } catch (error) {
+    console.error('[Socket][presence] Lookup error:', error.message);
+    return false;
+  }
 }
 
 module.exports = {
   setIO,
   getIO,
-  getUserSocketMap,
+  usePresence,
+  getPresence,
+  userRoom,
+  emitToUser,
 };
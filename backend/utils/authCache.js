@@ -0,0 +1,117 @@
+const mongoose = require('mongoose');
+const LRUCache = require('./lruCache');
+const { createSharedStore } = require('./cacheStores');
+
+const TTL_MS = parseInt(process.env.AUTH_CACHE_TTL_MS) || 30 * 1000;
+const MAX_ENTRIES = parseInt(process.env.AUTH_CACHE_MAX_ENTRIES) || 10000;
+
+// token -> { userId, expMs }. A signature check never changes, so this
+// stays per process; only expiry has to be re-checked.
+const verifiedTokens = new LRUCache({ maxEntries: MAX_ENTRIES, ttlMs: TTL_MS });
+
+const authCacheState = {
+  // userId -> auth context; shared when workers/nodes share state, so an
+  // invalidation on one process is seen by all of them
+  store: createSharedStore({ prefix: 'smartbuddy:auth:', maxEntries: MAX_ENTRIES, ttlMs: TTL_MS })
+};
+
+/**
+ * Replace the principal store (see utils/cacheStores.js)
+ * @param {Object} store - Store with async get/set/delete
+ */
+function usePrincipalStore(store) {
+  authCacheState.store = store;
+}
+
+/**
+ * Look up a token that already passed jwt.verify
+ * @param {String} token - Raw JWT
+ * @returns {Object|null} { userId, expMs }, or null if unknown or expired
+ */
+function getVerifiedToken(token) {
+  const entry = verifiedTokens.get(token);
+  if (!entry) return null;
+  if (entry.expMs && entry.expMs <= Date.now()) {
+    // Fall through to jwt.verify so the caller gets the usual expiry error
+    verifiedTokens.delete(token);
+    return null;
+  }
+  return entry;
+}
+
+/**
+ * Remember a successfully verified token
+ * @param {String} token - Raw JWT
+ * @param {Object} decoded - jwt.verify payload
+ */
+function rememberVerifiedToken(token, decoded) {
+  if (!decoded.userId) return;
+  verifiedTokens.set(token, {
+    userId: decoded.userId,
+    expMs: decoded.exp ? decoded.exp * 1000 : 0
+  });
+}
+
+// Stores may JSON-encode values, so keep ids and dates in plain form
+function toStored(user) {
+  return {
+    ...user,
+    _id: user._id.toString(),
+    lockUntil: user.lockUntil ? new Date(user.lockUntil).getTime() : null,
+    profileUpdatedAt: user.profileUpdatedAt ? new Date(user.profileUpdatedAt).getTime() : null
+  };
+}
+
+function fromStored(stored) {
+  return {
+    ...stored,
+    _id: new mongoose.Types.ObjectId(stored._id),
+    lockUntil: stored.lockUntil ? new Date(stored.lockUntil) : undefined,
+    profileUpdatedAt: stored.profileUpdatedAt ? new Date(stored.profileUpdatedAt) : undefined
+  };
+}
+
+/**
+ * Cached auth context for a user
+ * @param {String} userId - User ID
+ * @returns {Promise<Object|null>} Auth context (lean user), or null on miss
+ */
+async function getPrincipal(userId) {
+  const stored = await authCacheState.store.get(userId.toString());
+  return stored ? fromStored(stored) : null;
+}
+
+/**
+ * Cache a freshly loaded auth context
+ * @param {Object} user - Lean user with the AUTH_CONTEXT projection
+ */
+async function setPrincipal(user) {
+  await authCacheState.store.set(user._id.toString(), toStored(user), TTL_MS);
+}
+
+/**
+ * Drop a user's cached auth context (lock state, profile or XP changed)
+ * @param {String} userId - User ID
+ */
+async function invalidatePrincipal(userId) {
+  await authCacheState.store.delete(userId.toString());
+}
+
+function getAuthCacheStats() {
+  return {
+    ttlMs: TTL_MS,
+    store: authCacheState.store.kind,
+    tokens: verifiedTokens.stats(),
+    principals: authCacheState.store.stats()
+  };
+}
+
+module.exports = {
+  usePrincipalStore,
+  getVerifiedToken,
+  rememberVerifiedToken,
+  getPrincipal,
+  setPrincipal,
+  invalidatePrincipal,
+  getAuthCacheStats
+};
@@ -0,0 +1,152 @@
+/**
+ * Pluggable key/value stores for caches that may be shared across processes
+ *
+ * Every store has the same async interface:
+ *   get(key) -> value | undefined
+ *   set(key, value, ttlMs?)
+ *   delete(key)
+ *   stats() -> counters
+ *
+ * The memory store keeps values in this process only. The Redis store
+ * works with any client that exposes node-redis v4 style
+ * get/set(key, value, { PX })/del, and JSON-encodes values. The shared
+ * store picks one of the two on first use, depending on whether this
+ * process shares state with others (REDIS_URL or cluster worker); while
+ * the shared client cannot connect it serves from memory and retries.
+ */
+const LRUCache = require('./lruCache');
+const { getSharedStateClient } = require('./redisConnection');
+
+// How long a shared store serves from memory before reconnecting
+const SHARED_RETRY_MS = parseInt(process.env.CACHE_SHARED_RETRY_MS) || 30 * 1000;
+
+/**
+ * In-process store backed by LRUCache
+ * @param {Object} options
+ * @param {Number} options.maxEntries - Maximum entries kept
+ * @param {Number} options.ttlMs - Default time-to-live
+ */
+function createMemoryStore({ maxEntries = 10000, ttlMs = 0 } = {}) {
+  const cache = new LRUCache({ maxEntries, ttlMs });
+  return {
+    kind: 'memory',
+    async get(key) {
+      return cache.get(key);
+    },
+    async set(key, value, ttl = ttlMs) {
+      cache.set(key, value, ttl);
+    },
+    async delete(key) {
+      cache.delete(key);
+    },
+    stats() {
+      return cache.stats();
+    }
+  };
+}
+
+/**
+ * Store shared through Redis (or anything speaking the same client API)
+ * @param {Object} client - Connected Redis client
+ * @param {Object} options
+ * @param {String} options.prefix - Key namespace
+ * @param {Number} options.ttlMs - Default time-to-live
+ */
+function createRedisStore(client, { prefix = 'smartbuddy:', ttlMs = 0 } = {}) {
+  const counters = { hits: 0, misses: 0, errors: 0 };
+  return {
+    kind: 'redis',
+    async get(key) {
+      try {
+        const raw = await client.get(prefix + key);
+        if (raw === null || raw === undefined) {
+          counters.misses++;
+          return undefined;
+        }
+        counters.hits++;
+        return JSON.parse(raw);
+      } catch (error) {
+        // A cache outage should degrade to a miss, not fail the request
+        counters.errors++;
+        console.error('Cache store get error:', error.message);
+        return undefined;
+      }
+    },
+    async set(key, value, ttl = ttlMs) {
+      try {
+        const options = ttl > 0 ? { PX: ttl } : undefined;
+        await client.set(prefix + key, JSON.stringify(value), options);
+      } catch (error) {
+        counters.errors++;
+        console.error('Cache store set error:', error.message);
+      }
+    },
+    async delete(key) {
+      try {
+        await client.del(prefix + key);
+      } catch (error) {
+        counters.errors++;
+        console.error('Cache store delete error:', error.message);
+      }
+    },
+    stats() {
+      return { ...counters };
+    }
+  };
+}
+
+/**
+ * Redis-style store when shared state is enabled, memory store otherwise.
+ * A failed connect degrades to a memory store (a cache outage must not
+ * fail requests) and is retried after CACHE_SHARED_RETRY_MS.
+ * @param {Object} options - prefix, ttlMs and maxEntries (memory only)
+ */
+function createSharedStore({ prefix = 'smartbuddy:', ttlMs = 0, maxEntries = 10000 } = {}) {
+  const state = { store: null, resolving: null, fallback: null, retryAt: 0 };
+
+  function resolve() {
+    if (state.store) return Promise.resolve(state.store);
+    if (state.fallback && Date.now() < state.retryAt) return Promise.resolve(state.fallback);
+    if (!state.resolving) {
+      state.resolving = getSharedStateClient()
+        .then(client => client
+          ? createRedisStore(client, { prefix, ttlMs })
+          : createMemoryStore({ maxEntries, ttlMs }))
+        .then(store => {
+          state.fallback = null;
+          return (state.store = store);
+        })
+        .catch(error => {
+          console.error('Cache store connect error:', error.message);
+          state.fallback = state.fallback || createMemoryStore({ maxEntries, ttlMs });
+          state.retryAt = Date.now() + SHARED_RETRY_MS;
+          return state.fallback;
+        })
+        .finally(() => { state.resolving = null; });
+    }
+    return state.resolving;
+  }
+
+  return {
+    kind: 'shared',
+    async get(key) {
+      return (await resolve()).get(key);
+    },
+    async set(key, value, ttl = ttlMs) {
+      return (await resolve()).set(key, value, ttl);
+    },
+    async delete(key) {
+      return (await resolve()).delete(key);
+    },
+    stats() {
+      const store = state.store || state.fallback;
+      return store ? { kind: store.kind, degraded: !state.store, ...store.stats() } : {};
+    }
+  };
+}
+
+module.exports = {
+  createMemoryStore,
+  createRedisStore,
+  createSharedStore
+};
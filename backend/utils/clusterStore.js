@@ -0,0 +1,166 @@
+/**
+ * Shared state for cluster workers without Redis
+ *
+ * The primary process owns one utils/redisStandIn.js "server" and
+ * executes commands on it for its workers. Each worker gets clients from
+ * createClusterClient() that speak the same node-redis v4 subset, sending
+ * every command to the primary over the cluster IPC channel. Everything
+ * built on that API (bus adapter, presence, cache stores, rate-limit
+ * counters) is therefore shared by all workers on the machine.
+ *
+ * Across machines use REDIS_URL instead; this only spans one primary.
+ */
+const cluster = require('cluster');
+const { createRedisStandIn } = require('./redisStandIn');
+
+const COMMAND = 'smartbuddy:store:command';
+const REPLY = 'smartbuddy:store:reply';
+const PUBLISH = 'smartbuddy:store:message';
+
+const COMMANDS = new Set([
+  'get', 'set', 'del', 'incr', 'decr', 'pExpire', 'pTTL',
+  'sAdd', 'sRem', 'sMembers', 'sCard', 'publish', 'subscribe', 'unsubscribe'
+]);
+
+const COMMAND_TIMEOUT_MS = parseInt(process.env.CLUSTER_STORE_TIMEOUT_MS) || 5000;
+
+/**
+ * Run the store in the primary and answer worker commands
+ * @returns {Object} { client } - a direct client for the primary's own use
+ */
+function serveClusterStore() {
+  const server = createRedisStandIn();
+  const clients = new Map(); // `${workerId}:${clientId}` -> stand-in client
+
+  function clientFor(worker, clientId) {
+    const key = `${worker.id}:${clientId}`;
+    if (!clients.has(key)) clients.set(key, server.createClient());
+    return clients.get(key);
+  }
+
+  cluster.on('message', async (worker, msg) => {
+    if (!msg || msg.type !== COMMAND) return;
+    const { id, clientId, method, args } = msg;
+    const reply = (body) => {
+      if (worker.isConnected()) worker.send({ type: REPLY, id, ...body });
+    };
+    if (!COMMANDS.has(method)) return reply({ error: `Unknown command ${method}` });
+    try {
+      const client = clientFor(worker, clientId);
+      let result;
+      if (method === 'subscribe') {
+        // Listeners live in the worker; forward channel messages to it
+        result = await client.subscribe(args[0], (message, channel) => {
+          if (worker.isConnected()) worker.send({ type: PUBLISH, clientId, channel, message });
+        });
+      } else {
+        result = await client[method](...args);
+      }
+      reply({ result: result instanceof Set ? Array.from(result) : result });
+    } catch (error) {
+      reply({ error: error.message });
+    }
+  });
+
+  cluster.on('exit', async (worker) => {
+    for (const [key, client] of clients) {
+      if (!key.startsWith(`${worker.id}:`)) continue;
+      clients.delete(key);
+      await client.quit();
+    }
+  });
+
+  return { client: server.createClient() };
+}
+
+// Worker side: pending commands and subscription listeners per client
+const workerState = {
+  nextId: 1,
+  nextClientId: 1,
+  pending: new Map(),   // command id -> { resolve, reject, timer }
+  listeners: new Map(), // `${clientId}|${channel}` -> listener
+  listening: false
+};
+
+function listen() {
+  if (workerState.listening) return;
+  workerState.listening = true;
+  process.on('message', (msg) => {
+    if (!msg) return;
+    if (msg.type === REPLY) {
+      const pending = workerState.pending.get(msg.id);
+      if (!pending) return;
+      workerState.pending.delete(msg.id);
+      clearTimeout(pending.timer);
+      if (msg.error) pending.reject(new Error(msg.error));
+      else pending.resolve(msg.result);
+    } else if (msg.type === PUBLISH) {
+      const listener = workerState.listeners.get(`${msg.clientId}|${msg.channel}`);
+      if (listener) listener(msg.message, msg.channel);
+    }
+  });
+}
+
+/**
+ * node-redis style client whose commands run in the primary
+ * @returns {Object} Client (call connect() before use, like node-redis)
+ */
+function createClusterClient() {
+  if (!cluster.isWorker) throw new Error('createClusterClient() must be called in a cluster worker');
+  listen();
+  const clientId = workerState.nextClientId++;
+
+  function send(method, args) {
+    return new Promise((resolve, reject) => {
+      const id = workerState.nextId++;
+      const timer = setTimeout(() => {
+        workerState.pending.delete(id);
+        reject(new Error(`Cluster store ${method} timed out`));
+      }, COMMAND_TIMEOUT_MS);
+      timer.unref();
+      workerState.pending.set(id, { resolve, reject, timer });
+      try {
+        process.send({ type: COMMAND, id, clientId, method, args });
+      } catch (error) {
+        workerState.pending.delete(id);
+        clearTimeout(timer);
+        reject(error);
+      }
+    });
+  }
+
+  const client = {
+    isOpen: false,
+    async connect() {
+      client.isOpen = true;
+      return client;
+    },
+    async quit() {
+      for (const key of Array.from(workerState.listeners.keys())) {
+        const [owner, channel] = key.split('|');
+        if (owner === String(clientId)) await client.unsubscribe(channel);
+      }
+      client.isOpen = false;
+    },
+    duplicate() {
+      return createClusterClient();
+    },
+    async subscribe(channel, listener) {
+      workerState.listeners.set(`${clientId}|${channel}`, listener);
+      await send('subscribe', [channel]);
+    },
+    async unsubscribe(channel) {
+      workerState.listeners.delete(`${clientId}|${channel}`);
+      if (process.connected) await send('unsubscribe', [channel]);
+    }
+  };
+  for (const method of COMMANDS) {
+    if (!client[method]) client[method] = (...args) => send(method, args);
+  }
+  return client;
+}
+
+module.exports = {
+  serveClusterStore,
+  createClusterClient
+};
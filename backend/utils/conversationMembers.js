@@ -0,0 +1,99 @@
+const mongoose = require('mongoose');
+const Conversation = require('../models/Conversation');
+const LRUCache = require('./lruCache');
+const stateSync = require('./stateSync');
+
+// Participants never change after creation, so entries only need a TTL
+// as a safety net. Unknown ids are remembered briefly (and dropped when a
+// conversation with that id is created).
+const cache = new LRUCache({
+  maxEntries: parseInt(process.env.CONVERSATION_MEMBERS_CACHE_MAX_ENTRIES) || 50000,
+  ttlMs: parseInt(process.env.CONVERSATION_MEMBERS_CACHE_TTL_MS) || 30 * 60 * 1000
+});
+const MISSING_TTL_MS = 30 * 1000;
+
+// Mongo lookups avoided per second over the last minute (one slot per second)
+const WINDOW_SECONDS = 60;
+const avoidedWindow = {
+  slots: new Array(WINDOW_SECONDS).fill(0),
+  seconds: new Array(WINDOW_SECONDS).fill(0)
+};
+
+function recordAvoided() {
+  const second = Math.floor(Date.now() / 1000);
+  const slot = second % WINDOW_SECONDS;
+  if (avoidedWindow.seconds[slot] !== second) {
+    avoidedWindow.seconds[slot] = second;
+    avoidedWindow.slots[slot] = 0;
+  }
+  avoidedWindow.slots[slot]++;
+}
+
+/**
+ * Participant ids of a conversation, from cache or one lean lookup
+ * @param {String} conversationId - Conversation ID
+ * @returns {Promise<Set<String>|null>} Participant ids, or null if the
+ *   conversation doesn't exist
+ */
+async function getParticipants(conversationId) {
+  if (!mongoose.isValidObjectId(conversationId)) return null;
+  const key = conversationId.toString();
+  const cached = cache.get(key);
+  if (cached !== undefined) {
+    recordAvoided();
+    return cached;
+  }
+
+  const convo = await Conversation.findById(key).select('participants').lean();
+  if (!convo) {
+    cache.set(key, null, MISSING_TTL_MS);
+    return null;
+  }
+  const participants = new Set(convo.participants.map(p => p.toString()));
+  cache.set(key, participants);
+  return participants;
+}
+
+/**
+ * Is the user a participant of the conversation?
+ * @param {String} conversationId - Conversation ID
+ * @param {String} userId - User ID
+ * @returns {Promise<Boolean>} false also when the conversation doesn't exist
+ */
+async function isParticipant(conversationId, userId) {
+  const participants = await getParticipants(conversationId);
+  return !!participants && participants.has(userId.toString());
+}
+
+/**
+ * Drop a cached entry (call when a conversation is created), in every
+ * process
+ * @param {String} conversationId - Conversation ID
+ */
+function invalidateConversation(conversationId) {
+  cache.delete(conversationId.toString());
+  stateSync.publish('conversations:invalidate', conversationId.toString());
+}
+
+stateSync.onSync('conversations:invalidate', conversationId => cache.delete(conversationId));
+
+function getMembershipStats() {
+  const now = Math.floor(Date.now() / 1000);
+  let avoided = 0;
+  for (let i = 0; i < WINDOW_SECONDS; i++) {
+    if (now - avoidedWindow.seconds[i] < WINDOW_SECONDS) avoided += avoidedWindow.slots[i];
+  }
+  const stats = cache.stats();
+  return {
+    ...stats,
+    mongoCallsAvoided: stats.hits,
+    mongoCallsAvoidedPerSecond: Math.round((avoided / WINDOW_SECONDS) * 100) / 100
+  };
+}
+
+module.exports = {
+  getParticipants,
+  isParticipant,
+  invalidateConversation,
+  getMembershipStats
+};
@@ -0,0 +1,123 @@
+/**
+ * Throttles high-frequency socket state events (typing indicators)
+ *
+ * Clients send `typing` on every keystroke. Events are keyed by
+ * (event group, user, conversation); the first one in a quiet period is
+ * broadcast at once, later ones inside the window only replace a pending
+ * event, and at the end of the window the latest one is broadcast - so a
+ * burst becomes at most one emit per window, and the last state wins.
+ * A pending event that repeats a non-repeatable state (a second
+ * `stop_typing`) is dropped.
+ *
+ * Counters of events received and emitted per event name are kept for
+ * getCoalescerStats().
+ */
+const { getIO } = require('../socket');
+
+const WINDOW_MS = parseInt(process.env.SOCKET_COALESCE_WINDOW_MS) || 1000;
+
+const coalescerState = {
+  keys: new Map(), // key -> { last, pending, timer }
+  received: {},
+  emitted: {}
+};
+
+function count(bucket, event) {
+  bucket[event] = (bucket[event] || 0) + 1;
+}
+
+function broadcast(entry, item) {
+  const io = getIO();
+  if (io) io.to(item.room).emit(item.event, item.payload);
+  count(coalescerState.emitted, item.event);
+  entry.last = item;
+}
+
+function armWindow(key, entry) {
+  entry.timer = setTimeout(() => {
+    const { pending, last } = entry;
+    entry.pending = null;
+    const redundant = pending && pending.event === last.event && !pending.repeatable;
+    if (!pending || redundant) {
+      coalescerState.keys.delete(key);
+      return;
+    }
+    broadcast(entry, pending);
+    armWindow(key, entry);
+  }, WINDOW_MS);
+  entry.timer.unref();
+}
+
+/**
+ * Broadcast to a room, at most once per window for the key
+ * @param {Object} item
+ * @param {String} item.key - Coalescing key, e.g. `typing|<user>|<conversation>`
+ * @param {String} item.room - Room to emit to
+ * @param {String} item.event - Event name
+ * @param {*} item.payload - Event payload
+ * @param {Boolean} item.repeatable - Re-emit when the state repeats (keeps
+ *   an indicator alive); false for terminal states like stop_typing
+ */
+function coalesceEmit({ key, room, event, payload, repeatable = true }) {
+  count(coalescerState.received, event);
+  const item = { room, event, payload, repeatable };
+  const entry = coalescerState.keys.get(key);
+  if (entry) {
+    entry.pending = item;
+    return;
+  }
+  const created = { last: null, pending: null, timer: null };
+  coalescerState.keys.set(key, created);
+  broadcast(created, item);
+  armWindow(key, created);
+}
+
+/**
+ * @param {String} conversationId - Conversation ID
+ * @param {String} userId - Typing user
+ */
+function typing(conversationId, userId) {
+  coalesceEmit({
+    key: `typing|${userId}|${conversationId}`,
+    room: conversationId.toString(),
+    event: 'user_typing',
+    payload: { conversationId, userId },
+    repeatable: true
+  });
+}
+
+/**
+ * @param {String} conversationId - Conversation ID
+ * @param {String} userId - User who stopped typing
+ */
+function stopTyping(conversationId, userId) {
+  coalesceEmit({
+    key: `typing|${userId}|${conversationId}`,
+    room: conversationId.toString(),
+    event: 'user_stop_typing',
+    payload: { conversationId, userId },
+    repeatable: false
+  });
+}
+
+function getCoalescerStats() {
+  const events = {};
+  for (const event of Object.keys(coalescerState.received)) {
+    const received = coalescerState.received[event];
+    const emitted = coalescerState.emitted[event] || 0;
+    events[event] = {
+      received,
+      emitted,
+      suppressed: received - emitted,
+      savedRatio: Math.round((1 - emitted / received) * 1000) / 1000
+    };
+  }
+  return { windowMs: WINDOW_MS, activeKeys: coalescerState.keys.size, events };
+}
+
+module.exports = {
+  coalesceEmit,
+  typing,
+  stopTyping,
+  getCoalescerStats
+};
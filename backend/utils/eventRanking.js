@@ -0,0 +1,280 @@
+const Event = require('../models/Event');
+const LRUCache = require('./lruCache');
+const TopK = require('./topK');
+const stateSync = require('./stateSync');
+const { Interner, toSparseVector, intersect, cosine } = require('./sparseVector');
+
+// Score weights (sum to 1; scores are reported out of 100)
+const EVENT_WEIGHTS = {
+  interests: 0.45,   // cosine of event tags vs user interests
+  skills: 0.25,      // cosine of event tags vs user skills
+  soon: 0.2,         // decays with time until the event
+  popularity: 0.1    // saturates with the event's attendeeCount
+};
+
+// Days until an event's "soon" score halves
+const HALF_LIFE_DAYS = parseFloat(process.env.EVENT_RANK_HALF_LIFE_DAYS) || 14;
+// Joins at which popularity reaches half its weight
+const POPULARITY_SCALE = parseInt(process.env.EVENT_RANK_POPULARITY_SCALE) || 20;
+// Ranked results kept per user; deeper pages are ranked on demand
+const CACHE_DEPTH = 50;
+// Most candidates read per ranking: the soonest matching events. Matching
+// events starting later are not ranked at all; results say so
+// (`truncated`). Never below CACHE_DEPTH, so a cached list is never cut
+// shorter than a page walk over the same candidates.
+const MAX_CANDIDATES = Math.max(parseInt(process.env.EVENT_RANK_MAX_CANDIDATES) || 2000, CACHE_DEPTH);
+
+// Only what scoring needs; pages are loaded by _id afterwards
+const CANDIDATE_FIELDS = 'tagsNormalized startsAt attendeeCount';
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+const rankingState = {
+  // Tag ids are only used to compare tag lists, so the interner just
+  // grows with the tag vocabulary
+  tags: new Interner(),
+  stats: { rankings: 0, candidatesScored: 0, truncatedRankings: 0 }
+};
+
+// userId -> { profileKey, interestVec, skillVec, interestNorm, skillNorm, ranked, truncated, memberIds, full, worstScore }
+const cache = new LRUCache({
+  maxEntries: parseInt(process.env.EVENT_RANK_CACHE_MAX_ENTRIES) || 10000,
+  // Bounds how stale the time decay (and past events) can get
+  ttlMs: parseInt(process.env.EVENT_RANK_CACHE_TTL_MS) || 5 * 60 * 1000
+});
+
+function startOfToday() {
+  const today = new Date();
+  today.setHours(0, 0, 0, 0);
+  return today.getTime();
+}
+
+/**
+ * Scoring entry for an event document
+ * @param {Object} doc - Event with _id, tags or tagsNormalized, startsAt, attendeeCount
+ * @param {Number} joinCount - Join count (defaults to attendeeCount)
+ * @returns {Object} { id, startsAt, tagVec, tagNorm, joinCount }
+ */
+function toRankedEvent(doc, joinCount = doc.attendeeCount || 0) {
+  const tagVec = toSparseVector(doc.tagsNormalized || Event.normalizeTags(doc.tags), rankingState.tags);
+  return {
+    id: doc._id.toString(),
+    startsAt: doc.startsAt ? new Date(doc.startsAt).getTime() : 0,
+    tagVec,
+    tagNorm: Math.sqrt(tagVec.length),
+    joinCount
+  };
+}
+
+function buildOwner(user) {
+  const interests = Event.normalizeTags(user.interests);
+  const skills = Event.normalizeTags(user.skills);
+  return {
+    profileKey: `${interests.join(',')}|${skills.join(',')}`,
+    tags: Array.from(new Set([...interests, ...skills])),
+    interestVec: toSparseVector(interests, rankingState.tags),
+    interestNorm: Math.sqrt(interests.length),
+    skillVec: toSparseVector(skills, rankingState.tags),
+    skillNorm: Math.sqrt(skills.length)
+  };
+}
+
+/**
+ * Score one event for a user (0-100)
+ * @param {Object} owner - Output of buildOwner
+ * @param {Object} event - Output of toRankedEvent
+ * @param {Number} now - Current time in ms
+ * @returns {Number} Score rounded to 2 decimals
+ */
+function scoreEvent(owner, event, now) {
+  const interestSim = cosine(intersect(owner.interestVec, event.tagVec).distinct, owner.interestNorm, event.tagNorm);
+  const skillSim = cosine(intersect(owner.skillVec, event.tagVec).distinct, owner.skillNorm, event.tagNorm);
+  const daysUntil = Math.max(0, event.startsAt - now) / DAY_MS;
+  const soon = Math.pow(0.5, daysUntil / HALF_LIFE_DAYS);
+  const popularity = event.joinCount / (event.joinCount + POPULARITY_SCALE);
+
+  const score = interestSim * EVENT_WEIGHTS.interests +
+    skillSim * EVENT_WEIGHTS.skills +
+    soon * EVENT_WEIGHTS.soon +
+    popularity * EVENT_WEIGHTS.popularity;
+  return Math.round(score * 10000) / 100;
+}
+
+// Best score first, then the sooner event, then id for a stable order
+function compareRanked(a, b) {
+  if (a.score !== b.score) return a.score - b.score;
+  if (a.startsAt !== b.startsAt) return b.startsAt - a.startsAt;
+  return a.id < b.id ? 1 : a.id > b.id ? -1 : 0;
+}
+
+/**
+ * Rank upcoming events sharing a tag with the user's interests or skills.
+ * Candidates come from one query on the { tagsNormalized, startsAt, _id }
+ * index (a bounded scan per tag, merged in start order); only they are
+ * scored.
+ * @param {Object} owner - Output of buildOwner
+ * @param {Number} k - Number of results
+ * @param {Object} after - Only rank events after this { score, startsAt, id }
+ *   key (a page cursor); null for the top of the list
+ * @returns {Promise<Object>} { ranked, truncated } - ranked is
+ *   { id, score, startsAt }, best first; truncated is true when more than
+ *   MAX_CANDIDATES events matched, so later ones were left out
+ */
+async function rank(owner, k, after = null) {
+  if (owner.tags.length === 0) return { ranked: [], truncated: false };
+  const candidates = await Event.find({
+    tagsNormalized: { $in: owner.tags },
+    startsAt: { $gte: new Date(startOfToday()) }
+  })
+    .select(CANDIDATE_FIELDS)
+    .sort({ startsAt: 1 })
+    .limit(MAX_CANDIDATES)
+    .lean();
+
+  const now = Date.now();
+  const heap = new TopK(k, compareRanked);
+  candidates.forEach(doc => {
+    const event = toRankedEvent(doc);
+    const result = { id: event.id, score: scoreEvent(owner, event, now), startsAt: event.startsAt };
+    if (!after || compareRanked(result, after) < 0) heap.push(result);
+  });
+  rankingState.stats.rankings++;
+  rankingState.stats.candidatesScored += candidates.length;
+  const truncated = candidates.length === MAX_CANDIDATES;
+  if (truncated) rankingState.stats.truncatedRankings++;
+  return { ranked: heap.toSortedArray(), truncated };
+}
+
+/**
+ * Does a new or re-scored event make this cached list stale?
+ * @param {Object} entry - Cached entry
+ * @param {Object} event - Changed event (toRankedEvent)
+ */
+function isAffected(entry, event) {
+  if (entry.memberIds.has(event.id)) return true;
+  if (intersect(entry.interestVec, event.tagVec).distinct === 0 &&
+      intersect(entry.skillVec, event.tagVec).distinct === 0) return false;
+  if (!entry.full) return true;
+  return scoreEvent(entry, event, Date.now()) >= entry.worstScore;
+}
+
+function invalidateFor(event) {
+  for (const [ownerId, entry] of cache) {
+    if (isAffected(entry, event)) cache.delete(ownerId);
+  }
+}
+
+// What the other processes need to re-check their cached lists
+function syncPayload(event, joinCount) {
+  return {
+    _id: event._id.toString(),
+    tagsNormalized: event.tagsNormalized || Event.normalizeTags(event.tags),
+    startsAt: event.startsAt,
+    joinCount
+  };
+}
+
+/**
+ * Drop the cached lists a newly created event could enter (in every process)
+ * @param {Object} doc - Saved event document or lean object
+ */
+function addEvent(doc) {
+  if (!doc) return;
+  const plain = typeof doc.toObject === 'function' ? doc.toObject() : doc;
+  invalidateFor(toRankedEvent(plain, 0));
+  stateSync.publish('events:changed', syncPayload(plain, 0));
+}
+
+/**
+ * Record that a user joined an event (in every process)
+ * @param {Object} event - Event with _id and tags or tagsNormalized, startsAt
+ * @param {Number} joinCount - New join count
+ */
+function recordJoin(event, joinCount) {
+  if (!event) return;
+  invalidateFor(toRankedEvent(event, joinCount));
+  stateSync.publish('events:changed', syncPayload(event, joinCount));
+}
+
+stateSync.onSync('events:changed', event => invalidateFor(toRankedEvent(event, event.joinCount)));
+
+// The user's top CACHE_DEPTH list, from cache or freshly ranked
+async function cachedRanking(ownerId, owner) {
+  const cached = cache.get(ownerId);
+  if (cached && cached.profileKey === owner.profileKey) return cached;
+  const { ranked, truncated } = await rank(owner, CACHE_DEPTH);
+  const entry = {
+    ...owner,
+    ranked,
+    truncated,
+    memberIds: new Set(ranked.map(result => result.id)),
+    full: ranked.length === CACHE_DEPTH,
+    worstScore: ranked.length ? ranked[ranked.length - 1].score : 0
+  };
+  cache.set(ownerId, entry);
+  return entry;
+}
+
+/**
+ * Ranked upcoming events for a user, served from cache when possible.
+ * Pages are keyed by the last result of the previous page (score, startsAt,
+ * id), so a deep page costs one candidate scan rather than ranking every
+ * result before it, and changes between requests don't repeat or skip
+ * entries that kept their score.
+ * @param {Object} currentUser - Authenticated user (interests, skills)
+ * @param {Object} after - Last { score, startsAt, id } of the previous page,
+ *   or null for the first page
+ * @param {Number} limit - Page size
+ * @returns {Promise<Object>} { events, next, truncated } - events with a
+ *   score, best first; next is the key to pass as `after` for the following
+ *   page, or null on the last page; truncated is true when only the
+ *   soonest MAX_CANDIDATES matching events were ranked
+ */
+async function getRankedEvents(currentUser, after, limit) {
+  const ownerId = currentUser._id.toString();
+  const owner = buildOwner(currentUser);
+
+  const cached = await cachedRanking(ownerId, owner);
+  const start = after ? cached.ranked.findIndex(result => compareRanked(result, after) < 0) : 0;
+  let page;
+  let { truncated } = cached;
+  if (start !== -1 && (start + limit <= cached.ranked.length || !cached.full)) {
+    page = cached.ranked.slice(start, start + limit);
+  } else if (start === -1 && !cached.full) {
+    // The cached list holds every candidate and the cursor is past its end
+    page = [];
+  } else {
+    ({ ranked: page, truncated } = await rank(owner, limit, after));
+  }
+
+  const next = page.length === limit ? page[page.length - 1] : null;
+  if (page.length === 0) return { events: [], next, truncated };
+  const docs = await Event.find({ _id: { $in: page.map(result => result.id) } })
+    .select('-tagsNormalized')
+    .lean();
+  const docsById = new Map(docs.map(doc => [doc._id.toString(), doc]));
+
+  // Events deleted since the list was cached are skipped
+  const events = page
+    .filter(result => docsById.has(result.id))
+    .map(result => ({ ...docsById.get(result.id), score: result.score }));
+  return { events, next, truncated };
+}
+
+function getRankingStats() {
+  return {
+    tags: rankingState.tags.size,
+    maxCandidates: MAX_CANDIDATES,
+    ...rankingState.stats,
+    cache: cache.stats()
+  };
+}
+
+module.exports = {
+  EVENT_WEIGHTS,
+  addEvent,
+  recordJoin,
+  scoreEvent,
+  getRankedEvents,
+  getRankingStats
+};
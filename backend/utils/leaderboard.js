@@ -0,0 +1,209 @@
+const User = require('../models/User');
+const RankedSkipList = require('./rankedSkipList');
+const stateSync = require('./stateSync');
+
+// Only what ranking needs; names are looked up per page by _id
+const LEADERBOARD_FIELDS = 'xp branch year';
+
+const boardState = {
+  entries: new Map(),   // userId -> { id, xp, branch, year }
+  boards: new Map(),    // board key -> RankedSkipList of entries
+  loaded: false,
+  loading: null,
+  pending: new Map()    // userId -> user, updates seen while loading
+};
+
+// Highest XP first; ties broken by id so every entry has a stable position
+function compareEntries(a, b) {
+  if (a.xp !== b.xp) return b.xp - a.xp;
+  if (a.id === b.id) return 0;
+  return a.id < b.id ? -1 : 1;
+}
+
+/**
+ * Key of the board for an optional branch/year filter
+ * @param {Object} filter
+ * @param {String} filter.branch - Branch, e.g. 'CSE'
+ * @param {Number} filter.year - Year of study
+ * @returns {String} 'all', 'branch:CSE', 'year:3' or 'branch:CSE:year:3'
+ */
+function boardKey({ branch, year } = {}) {
+  if (branch && year) return `branch:${branch}:year:${year}`;
+  if (branch) return `branch:${branch}`;
+  if (year) return `year:${year}`;
+  return 'all';
+}
+
+function boardKeysFor(entry) {
+  const keys = ['all'];
+  if (entry.branch) keys.push(boardKey({ branch: entry.branch }));
+  if (entry.year) keys.push(boardKey({ year: entry.year }));
+  if (entry.branch && entry.year) keys.push(boardKey(entry));
+  return keys;
+}
+
+function detach(entry) {
+  boardKeysFor(entry).forEach(key => {
+    const board = boardState.boards.get(key);
+    if (!board) return;
+    board.remove(entry);
+    if (board.size === 0) boardState.boards.delete(key);
+  });
+}
+
+function attach(entry) {
+  boardKeysFor(entry).forEach(key => {
+    let board = boardState.boards.get(key);
+    if (!board) {
+      board = new RankedSkipList(compareEntries);
+      boardState.boards.set(key, board);
+    }
+    board.insert(entry);
+  });
+}
+
+function applyUpsert(user) {
+  const id = user._id.toString();
+  const previous = boardState.entries.get(id);
+  // XP only ever grows, so a total read before a concurrent award that
+  // lands here late must not move the user back down
+  const xp = Math.max(user.xp || 0, previous ? previous.xp : 0);
+  const branch = user.branch !== undefined ? user.branch || '' : previous?.branch || '';
+  const year = user.year !== undefined ? user.year || null : previous?.year || null;
+
+  if (previous && previous.xp === xp && previous.branch === branch && previous.year === year) return;
+  if (previous) detach(previous);
+  const entry = { id, xp, branch, year };
+  boardState.entries.set(id, entry);
+  attach(entry);
+}
+
+/**
+ * Build the boards from the users collection (once per process)
+ * @returns {Promise<void>}
+ */
+async function ensureLoaded() {
+  if (boardState.loaded) return;
+  if (!boardState.loading) {
+    boardState.loading = (async () => {
+      try {
+        const users = await User.find({}).select(LEADERBOARD_FIELDS).lean();
+        users.forEach(applyUpsert);
+        boardState.pending.forEach(applyUpsert);
+        boardState.pending.clear();
+        boardState.loaded = true;
+        console.log(`Leaderboard loaded: ${boardState.entries.size} users, ${boardState.boards.size} boards`);
+      } finally {
+        boardState.loading = null;
+      }
+    })();
+  }
+  return boardState.loading;
+}
+
+function upsertLocal(user) {
+  if (!user || !user._id) return;
+  if (!boardState.loaded) {
+    // The initial load will pick this user up; replay once it finishes
+    const id = user._id.toString();
+    const pending = boardState.pending.get(id);
+    boardState.pending.set(id, pending ? { ...pending, ...user, xp: Math.max(pending.xp || 0, user.xp || 0) } : user);
+    return;
+  }
+  applyUpsert(user);
+}
+
+function removeLocal(userId) {
+  const id = userId.toString();
+  boardState.pending.delete(id);
+  const entry = boardState.entries.get(id);
+  if (!entry) return;
+  detach(entry);
+  boardState.entries.delete(id);
+}
+
+/**
+ * Record a user's current XP (and branch/year, when present), in this
+ * process and, when state is shared, in the others
+ * @param {Object} user - Lean user with _id and xp
+ */
+function upsertUser(user) {
+  if (!user || !user._id) return;
+  upsertLocal(user);
+  const fields = { _id: user._id.toString(), xp: user.xp };
+  if (user.branch !== undefined) fields.branch = user.branch;
+  if (user.year !== undefined) fields.year = user.year;
+  stateSync.publish('leaderboard:upsert', fields);
+}
+
+/**
+ * Drop a user from every board (here and in the other processes)
+ * @param {String} userId - User ID
+ */
+function removeUser(userId) {
+  removeLocal(userId);
+  stateSync.publish('leaderboard:remove', userId.toString());
+}
+
+// Entries are keyed by id string, so payload ids can stay strings
+stateSync.onSync('leaderboard:upsert', upsertLocal);
+stateSync.onSync('leaderboard:remove', removeLocal);
+
+// Standard competition ranking: users on equal XP share a rank
+function rankForXP(board, xp) {
+  return board.countBefore({ xp, id: '' }) + 1;
+}
+
+/**
+ * One page of a board
+ * @param {String} key - Board key (see boardKey)
+ * @param {Number} offset - Entries to skip
+ * @param {Number} limit - Page size
+ * @returns {Object} { total, entries: [{ rank, userId, xp, branch, year }] }
+ */
+function getPage(key, offset, limit) {
+  const board = boardState.boards.get(key);
+  if (!board) return { total: 0, entries: [] };
+
+  let rank = 0;
+  let lastXP = null;
+  const entries = board.slice(offset, limit).map((entry, index) => {
+    if (entry.xp !== lastXP) {
+      rank = index === 0 ? rankForXP(board, entry.xp) : offset + index + 1;
+      lastXP = entry.xp;
+    }
+    return { rank, userId: entry.id, xp: entry.xp, branch: entry.branch, year: entry.year };
+  });
+  return { total: board.size, entries };
+}
+
+/**
+ * A user's rank on a board
+ * @param {String} key - Board key (see boardKey)
+ * @param {String} userId - User ID
+ * @returns {Object|null} { rank, xp, total }, or null if not on this board
+ */
+function getRank(key, userId) {
+  const entry = boardState.entries.get(userId.toString());
+  const board = boardState.boards.get(key);
+  if (!entry || !board || !boardKeysFor(entry).includes(key)) return null;
+  return { rank: rankForXP(board, entry.xp), xp: entry.xp, total: board.size };
+}
+
+function getLeaderboardStats() {
+  return {
+    loaded: boardState.loaded,
+    users: boardState.entries.size,
+    boards: boardState.boards.size
+  };
+}
+
+module.exports = {
+  boardKey,
+  ensureLoaded,
+  upsertUser,
+  removeUser,
+  getPage,
+  getRank,
+  getLeaderboardStats
+};
@@ -0,0 +1,144 @@
+/**
+ * Size-bounded LRU cache with per-entry TTL and hit/miss counters
+ *
+ * Backed by a Map, whose insertion order doubles as recency order: a hit
+ * re-inserts the key at the end and eviction takes the first key. Expired
+ * entries are dropped lazily when read, so no timers are scheduled.
+ */
+class LRUCache {
+  /**
+   * @param {Object} options
+   * @param {Number} options.maxEntries - Maximum number of entries kept
+   * @param {Number} options.ttlMs - Default time-to-live (0 = no expiry)
+   * @param {Function} options.onEvict - Called with (key, value) when an entry
+   *   is evicted for space or expires
+   */
+  constructor({ maxEntries = 1000, ttlMs = 0, onEvict = null } = {}) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.onEvict = onEvict;
+    this.entries = new Map();
+    this.counters = { hits: 0, misses: 0, evictions: 0, expirations: 0, invalidations: 0 };
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+
+  isExpired(entry, now = Date.now()) {
+    return entry.expiresAt !== 0 && entry.expiresAt <= now;
+  }
+
+  /**
+   * Get a value, refreshing its recency
+   * @returns {*} Cached value or undefined
+   */
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.counters.misses++;
+      return undefined;
+    }
+    if (this.isExpired(entry)) {
+      this.expire(key, entry);
+      this.counters.misses++;
+      return undefined;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.counters.hits++;
+    return entry.value;
+  }
+
+  /**
+   * Read a value without touching recency or counters
+   */
+  peek(key) {
+    const entry = this.entries.get(key);
+    if (!entry || this.isExpired(entry)) return undefined;
+    return entry.value;
+  }
+
+  has(key) {
+    return this.peek(key) !== undefined;
+  }
+
+  /**
+   * Store a value
+   * @param {*} key - Cache key
+   * @param {*} value - Value to store
+   * @param {Number} ttlMs - Override the default TTL for this entry
+   */
+  set(key, value, ttlMs = this.ttlMs) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: ttlMs > 0 ? Date.now() + ttlMs : 0 });
+
+    while (this.entries.size > this.maxEntries) {
+      const [oldestKey, oldest] = this.entries.entries().next().value;
+      this.entries.delete(oldestKey);
+      this.counters.evictions++;
+      if (this.onEvict) this.onEvict(oldestKey, oldest.value);
+    }
+    return this;
+  }
+
+  /**
+   * Remove an entry because its data changed
+   * @returns {Boolean} true if an entry was removed
+   */
+  delete(key) {
+    const removed = this.entries.delete(key);
+    if (removed) this.counters.invalidations++;
+    return removed;
+  }
+
+  expire(key, entry) {
+    this.entries.delete(key);
+    this.counters.expirations++;
+    if (this.onEvict) this.onEvict(key, entry.value);
+  }
+
+  /**
+   * Drop every expired entry
+   * @returns {Number} Number of entries removed
+   */
+  prune() {
+    const now = Date.now();
+    let removed = 0;
+    for (const [key, entry] of this.entries) {
+      if (this.isExpired(entry, now)) {
+        this.expire(key, entry);
+        removed++;
+      }
+    }
+    return removed;
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  /**
+   * Iterate live entries as [key, value], oldest first
+   */
+  *[Symbol.iterator]() {
+    const now = Date.now();
+    for (const [key, entry] of this.entries) {
+      if (!this.isExpired(entry, now)) yield [key, entry.value];
+    }
+  }
+
+  stats() {
+    const { hits, misses } = this.counters;
+    const lookups = hits + misses;
+    return {
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      ...this.counters,
+      hitRate: lookups === 0 ? 0 : Math.round((hits / lookups) * 10000) / 10000
+    };
+  }
+}
+
+module.exports = LRUCache;
@@ -0,0 +1,242 @@
+const User = require('../models/User');
+const Match = require('../models/Match');
+const MatchRun = require('../models/MatchRun');
+const matchEngine = require('./matchEngine');
+
+const DEFAULT_TOP_N = 10;
+const DEFAULT_CHUNK_SIZE = 500;
+// How long a stored-matches freshness check is reused
+const FRESHNESS_CHECK_MS = parseInt(process.env.MATCH_FRESHNESS_CHECK_MS) || 30 * 1000;
+
+const freshnessState = { current: false, checkedAt: 0, checking: null };
+
+/**
+ * Does a set of changed profiles make a stored list stale?
+ * @param {Object} stored - Lean Match doc ({ user, matches.id, worstScore, full })
+ * @param {Set<String>} changedIds - IDs of changed users
+ * @param {Array<Object>} changedProfiles - Match profiles of changed users
+ */
+function isStale(stored, changedIds, changedProfiles) {
+  const ownerId = stored.user.toString();
+  if (changedIds.has(ownerId)) return true;
+  if (stored.matches.some(match => changedIds.has(match.id.toString()))) return true;
+  if (!stored.full) return true;
+
+  const owner = matchEngine.getProfile(ownerId);
+  if (!owner) return true;
+  return changedProfiles.some(profile =>
+    profile.id !== ownerId && matchEngine.scorePair(owner, profile) >= stored.worstScore
+  );
+}
+
+/**
+ * IDs of users whose stored lists may have changed since `since`
+ * @param {Date} since - Start of the previous run
+ * @returns {Promise<Array<String>>} User IDs
+ */
+async function findAffectedUserIds(since) {
+  const changed = await User.find({ profileUpdatedAt: { $gt: since } }).select('_id').lean();
+  const changedIds = new Set(changed.map(user => user._id.toString()));
+  if (changedIds.size === 0) return [];
+
+  const changedProfiles = Array.from(changedIds)
+    .map(id => matchEngine.getProfile(id))
+    .filter(Boolean);
+  const affected = new Set(changedIds);
+
+  const cursor = Match.find({}).select('user matches.id worstScore full').lean().cursor();
+  for await (const stored of cursor) {
+    if (isStale(stored, changedIds, changedProfiles)) affected.add(stored.user.toString());
+  }
+  return Array.from(affected);
+}
+
+async function writeChunk(users, topN, computedAt) {
+  const operations = [];
+  for (const user of users) {
+    const matches = await matchEngine.findMatches(user, topN);
+    operations.push({
+      updateOne: {
+        filter: { user: user._id },
+        update: {
+          $set: {
+            matches: matches.map(({ matchScore, ...match }) => match),
+            worstScore: matches.length ? matches[matches.length - 1].score : 0,
+            full: matches.length === topN,
+            computedAt
+          }
+        },
+        upsert: true
+      }
+    });
+  }
+  if (operations.length) await Match.bulkWrite(operations, { ordered: false });
+}
+
+/**
+ * Recompute and persist every user's top-N study buddies
+ *
+ * Users are streamed from a cursor and scored chunk by chunk, so only one
+ * chunk of users and their results is held at a time. Scoring uses the
+ * in-memory match index (matchEngine.ensureLoaded), which holds a profile
+ * for every user: total memory still grows with the user count.
+ *
+ * @param {Object} options
+ * @param {String} options.mode - 'full' (every user) or 'incremental'
+ *   (users affected by profile changes since the last completed run)
+ * @param {Number} options.topN - Matches stored per user
+ * @param {Number} options.chunkSize - Users per read/write batch
+ * @param {Function} options.onProgress - Called with { processed, total, usersPerSecond }
+ * @returns {Promise<Object>} Completed MatchRun record
+ */
+async function recomputeMatches({
+  mode = 'full',
+  topN = DEFAULT_TOP_N,
+  chunkSize = DEFAULT_CHUNK_SIZE,
+  onProgress = null
+} = {}) {
+  await matchEngine.ensureLoaded();
+
+  let since = null;
+  if (mode === 'incremental') {
+    const lastRun = await MatchRun.findOne({ status: 'completed' }).sort({ startedAt: -1 }).lean();
+    // Without a previous run there is nothing to be incremental against
+    if (!lastRun) mode = 'full';
+    else since = lastRun.startedAt;
+  }
+
+  const startedAt = new Date();
+  const run = await MatchRun.create({ mode, since, startedAt });
+
+  try {
+    let total;
+    let cursor;
+    if (mode === 'incremental') {
+      const affectedIds = await findAffectedUserIds(since);
+      total = affectedIds.length;
+      cursor = User.find({ _id: { $in: affectedIds } })
+        .select(matchEngine.MATCH_FIELDS).lean().cursor({ batchSize: chunkSize });
+    } else {
+      total = await User.estimatedDocumentCount();
+      cursor = User.find({})
+        .select(matchEngine.MATCH_FIELDS).lean().cursor({ batchSize: chunkSize });
+    }
+
+    let processed = 0;
+    let chunk = [];
+    const report = () => {
+      const seconds = (Date.now() - startedAt.getTime()) / 1000;
+      const usersPerSecond = seconds > 0 ? Math.round(processed / seconds) : processed;
+      if (onProgress) onProgress({ processed, total, usersPerSecond });
+      return usersPerSecond;
+    };
+    const flush = async () => {
+      await writeChunk(chunk, topN, startedAt);
+      processed += chunk.length;
+      chunk = [];
+      report();
+    };
+
+    for await (const user of cursor) {
+      chunk.push(user);
+      if (chunk.length >= chunkSize) await flush();
+    }
+    if (chunk.length) await flush();
+
+    run.status = 'completed';
+    run.processed = processed;
+    run.usersPerSecond = report();
+    run.finishedAt = new Date();
+    await run.save();
+    return run;
+  } catch (error) {
+    run.status = 'failed';
+    run.error = error.message;
+    run.finishedAt = new Date();
+    await run.save();
+    throw error;
+  }
+}
+
+async function checkFreshness() {
+  const lastRun = await MatchRun.findOne({ status: 'completed' })
+    .sort({ startedAt: -1 }).select('startedAt').lean();
+  if (!lastRun) return false;
+  // Both kinds of run leave every stored list current as of their start:
+  // a full run rewrites them all, an incremental one rewrites those the
+  // changes could affect
+  const changedSince = await User.exists({ profileUpdatedAt: { $gt: lastRun.startedAt } });
+  return !changedSince;
+}
+
+/**
+ * Are the stored match lists current, i.e. has no profile changed since
+ * the last completed run started? Checked at most every
+ * MATCH_FRESHNESS_CHECK_MS, so a change is noticed within that window.
+ * @returns {Promise<Boolean>}
+ */
+async function areStoredMatchesCurrent() {
+  if (Date.now() - freshnessState.checkedAt < FRESHNESS_CHECK_MS) return freshnessState.current;
+  if (!freshnessState.checking) {
+    freshnessState.checking = checkFreshness()
+      .then(current => {
+        freshnessState.current = current;
+        freshnessState.checkedAt = Date.now();
+        return current;
+      })
+      .finally(() => { freshnessState.checking = null; });
+  }
+  return freshnessState.checking;
+}
+
+let jobRunning = false;
+
+async function runJob(mode) {
+  if (jobRunning) {
+    console.log(`Match recompute (${mode}) skipped: previous run still in progress`);
+    return;
+  }
+  jobRunning = true;
+  try {
+    const run = await recomputeMatches({ mode });
+    console.log(`Match recompute (${run.mode}) done: ${run.processed} users at ${run.usersPerSecond} users/s`);
+  } catch (error) {
+    console.error('Match recompute error:', error);
+  } finally {
+    jobRunning = false;
+  }
+}
+
+function msUntilHour(hour) {
+  const next = new Date();
+  next.setHours(hour, 0, 0, 0);
+  if (next <= new Date()) next.setDate(next.getDate() + 1);
+  return next - Date.now();
+}
+
+/**
+ * Schedule the nightly full run and periodic incremental runs
+ * @param {Object} options
+ * @param {Number} options.nightlyHour - Local hour for the full run
+ * @param {Number} options.incrementalMinutes - Interval between incremental runs (0 = off)
+ */
+function scheduleMatchJobs({ nightlyHour = 3, incrementalMinutes = 15 } = {}) {
+  const scheduleNightly = () => {
+    setTimeout(async () => {
+      await runJob('full');
+      scheduleNightly();
+    }, msUntilHour(nightlyHour)).unref();
+  };
+  scheduleNightly();
+
+  if (incrementalMinutes > 0) {
+    setInterval(() => runJob('incremental'), incrementalMinutes * 60 * 1000).unref();
+  }
+  console.log(`Match jobs scheduled: full at ${nightlyHour}:00, incremental every ${incrementalMinutes} min`);
+}
+
+module.exports = {
+  recomputeMatches,
+  areStoredMatchesCurrent,
+  scheduleMatchJobs
+};
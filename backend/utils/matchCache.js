@@ -0,0 +1,160 @@
+const LRUCache = require('./lruCache');
+const matchEngine = require('./matchEngine');
+const stateSync = require('./stateSync');
+
+// Every list is computed at the largest page size and sliced per request,
+// so Dashboard (limit=3) and StudyBuddy (limit=10) share one entry
+const MAX_MATCH_LIMIT = 10;
+
+// Reverse indexes over the cached lists, so a profile change only visits
+// the lists it can affect instead of every cached entry
+const indexState = {
+  entries: new Map(),  // owner id -> indexed entry
+  byMember: new Map(), // member id -> Set<owner id> whose list contains it
+  byToken: new Map(),  // owner's skill/interest/availability token -> Set<owner id>
+  // Lists a candidate sharing only branch/year (or nothing) can still
+  // enter: not full, or worst score within reach of proximity alone
+  lowFloor: new Set()
+};
+
+function addTo(index, key, ownerId) {
+  let owners = index.get(key);
+  if (!owners) {
+    owners = new Set();
+    index.set(key, owners);
+  }
+  owners.add(ownerId);
+}
+
+function removeFrom(index, key, ownerId) {
+  const owners = index.get(key);
+  if (!owners) return;
+  owners.delete(ownerId);
+  if (owners.size === 0) index.delete(key);
+}
+
+function indexEntry(ownerId, entry) {
+  indexState.entries.set(ownerId, entry);
+  entry.memberIds.forEach(id => addTo(indexState.byMember, id, ownerId));
+  entry.tokens.forEach(token => addTo(indexState.byToken, token, ownerId));
+  if (!entry.full || entry.worstScore <= matchEngine.MAX_PROXIMITY_SCORE || !matchEngine.getProfile(ownerId)) {
+    indexState.lowFloor.add(ownerId);
+  }
+}
+
+function unindexEntry(ownerId) {
+  const entry = indexState.entries.get(ownerId);
+  if (!entry) return;
+  indexState.entries.delete(ownerId);
+  entry.memberIds.forEach(id => removeFrom(indexState.byMember, id, ownerId));
+  entry.tokens.forEach(token => removeFrom(indexState.byToken, token, ownerId));
+  indexState.lowFloor.delete(ownerId);
+}
+
+const cache = new LRUCache({
+  maxEntries: parseInt(process.env.MATCH_CACHE_MAX_ENTRIES) || 10000,
+  ttlMs: parseInt(process.env.MATCH_CACHE_TTL_MS) || 5 * 60 * 1000,
+  onEvict: unindexEntry
+});
+
+function storeEntry(ownerId, entry) {
+  unindexEntry(ownerId);
+  cache.set(ownerId, entry);
+  indexEntry(ownerId, entry);
+}
+
+function dropEntry(ownerId) {
+  unindexEntry(ownerId);
+  cache.delete(ownerId);
+}
+
+/**
+ * Can a changed profile enter this cached list?
+ * @param {String} ownerId - User the list belongs to
+ * @param {Object} profile - Changed profile
+ */
+function canEnter(ownerId, profile) {
+  const entry = indexState.entries.get(ownerId);
+  if (!entry) return false;
+  // Short lists are padded with zero-score users, so any new user can enter
+  if (!entry.full) return true;
+  const owner = matchEngine.getProfile(ownerId);
+  if (!owner) return true;
+  return matchEngine.scorePair(owner, profile) >= entry.worstScore;
+}
+
+// Stale lists: the changed user's own, those it is a member of, and those
+// it could now enter. A candidate sharing no skill/interest/availability
+// token with the owner scores at most MAX_PROXIMITY_SCORE, so only the
+// owners sharing one (byToken) and the low-floor lists need scoring.
+matchEngine.onProfileChange((profile, previous) => {
+  const changedId = (profile || previous).id;
+  const stale = new Set([changedId]);
+  (indexState.byMember.get(changedId) || []).forEach(ownerId => stale.add(ownerId));
+
+  if (profile) {
+    const check = ownerId => {
+      if (ownerId !== changedId && !stale.has(ownerId) && canEnter(ownerId, profile)) stale.add(ownerId);
+    };
+    matchEngine.profileTokens(profile, false).forEach(token => {
+      (indexState.byToken.get(token) || []).forEach(check);
+    });
+    indexState.lowFloor.forEach(check);
+  }
+  stale.forEach(dropEntry);
+});
+
+/**
+ * Ranked matches for a user, served from cache when possible
+ * @param {Object} currentUser - Authenticated user
+ * @param {Number} limit - Number of matches to return (<= MAX_MATCH_LIMIT)
+ * @returns {Promise<Array<Object>>} Top matches, best first
+ */
+async function getMatches(currentUser, limit) {
+  const ownerId = currentUser._id.toString();
+  const cached = cache.get(ownerId);
+  if (cached) return cached.matches.slice(0, limit);
+
+  const version = matchEngine.getVersion();
+  const matches = await matchEngine.findMatches(currentUser, MAX_MATCH_LIMIT);
+
+  // Don't keep a list that raced with a profile change
+  if (version === matchEngine.getVersion()) {
+    const owner = matchEngine.getProfile(ownerId);
+    storeEntry(ownerId, {
+      matches,
+      memberIds: new Set(matches.map(match => match.id.toString())),
+      tokens: owner ? matchEngine.profileTokens(owner, false) : [],
+      full: matches.length === MAX_MATCH_LIMIT,
+      worstScore: matches.length ? matches[matches.length - 1].score : 0
+    });
+  }
+  return matches.slice(0, limit);
+}
+
+function invalidateLocal(userIds) {
+  userIds.forEach(dropEntry);
+}
+
+/**
+ * Drop the cached lists of specific users (in every process)
+ * @param {...String} userIds - User IDs
+ */
+function invalidateUsers(...userIds) {
+  const ids = userIds.map(userId => userId.toString());
+  invalidateLocal(ids);
+  stateSync.publish('matchCache:invalidate', ids);
+}
+
+stateSync.onSync('matchCache:invalidate', invalidateLocal);
+
+function getCacheStats() {
+  return cache.stats();
+}
+
+module.exports = {
+  MAX_MATCH_LIMIT,
+  getMatches,
+  invalidateUsers,
+  getCacheStats
+};
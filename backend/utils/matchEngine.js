@@ -0,0 +1,435 @@
+const mongoose = require('mongoose');
+const User = require('../models/User');
+const TopK = require('./topK');
+const MatchWorkerPool = require('./matchWorkerPool');
+const { MinHashLSH, profileLshTokens } = require('./minhashLsh');
+const { Interner, toSparseVector, norm, has } = require('./sparseVector');
+const { WEIGHTS, scorePair, compareRanked } = require('./matchScoring');
+const { MATCH_CANDIDATE } = require('./userProjections');
+const stateSync = require('./stateSync');
+
+// Only the fields the matcher needs - never password hashes or mood history
+const MATCH_FIELDS = MATCH_CANDIDATE;
+
+// 'inline' scores on the event loop via the inverted index; 'pooled' fans
+// each query out to worker threads over a shared snapshot; 'approximate'
+// rescores only a MinHash/LSH shortlist (see benchmarks/matchLsh.js)
+const SCORING_MODES = ['inline', 'pooled', 'approximate'];
+const SCORING_MODE = SCORING_MODES.includes(process.env.MATCH_SCORING_MODE)
+  ? process.env.MATCH_SCORING_MODE
+  : 'inline';
+
+// Highest score a candidate can reach through branch/year alone
+const MAX_PROXIMITY_SCORE = WEIGHTS.proximity * 100;
+
+const engineState = {
+  profiles: new Map(),  // userId -> profile (Map order = collection order)
+  postings: new Map(),  // token -> Set<userId>
+  nextSeq: 0,
+  version: 0,           // bumped on every index change
+  listeners: [],        // notified with (profile, previous) on every change
+  pool: null,           // MatchWorkerPool, created on first pooled query
+  lsh: null,            // MinHashLSH, built on first approximate query
+  loaded: false,
+  loading: null,
+  pending: new Map(),   // upserts received while the initial load is running
+  vocab: {
+    skills: new Interner(),
+    interests: new Interner(),
+    availability: new Interner()
+  }
+};
+
+const skillToken = (id) => `s:${id}`;
+const interestToken = (id) => `i:${id}`;
+const availabilityToken = (id) => `a:${id}`;
+const branchToken = (branch) => `b:${branch}`;
+const yearToken = (year) => `y:${year}`;
+
+/**
+ * Build the in-memory match profile for a user document
+ * @param {Object} user - User document or lean object
+ * @param {Number} seq - Position of the user in collection order
+ * @returns {Object} Match profile
+ */
+function buildProfile(user, seq) {
+  const skills = Array.from(user.skills || []);
+  const interests = Array.from(user.interests || []);
+  const availability = Array.from(user.availability || []);
+  const { vocab } = engineState;
+
+  // Vectors keep repeated entries so overlap counts match Array#filter;
+  // norms only count distinct ids, like the old binary vectors did
+  const skillVec = toSparseVector(skills, vocab.skills, true);
+  const interestVec = toSparseVector(interests, vocab.interests, true);
+  const availabilityVec = toSparseVector(availability, vocab.availability, true);
+
+  return {
+    _id: user._id,
+    id: user._id.toString(),
+    seq,
+    name: user.name,
+    email: user.email,
+    branch: user.branch,
+    year: user.year,
+    skills,
+    interests,
+    availability,
+    skillVec,
+    interestVec,
+    availabilityVec,
+    skillNorm: norm(skillVec),
+    interestNorm: norm(interestVec)
+  };
+}
+
+/**
+ * Tokens a profile is indexed under. Branch and year are included because
+ * proximity alone is enough to give a candidate a non-zero score.
+ * @param {Object} profile - Match profile
+ * @param {Boolean} withProximity - Include the branch/year tokens
+ * @returns {Array<String>} Index tokens
+ */
+function profileTokens(profile, withProximity = true) {
+  const tokens = [];
+  profile.skillVec.forEach(id => tokens.push(skillToken(id)));
+  profile.interestVec.forEach(id => tokens.push(interestToken(id)));
+  profile.availabilityVec.forEach(id => tokens.push(availabilityToken(id)));
+  if (!withProximity) return tokens;
+  if (profile.branch) tokens.push(branchToken(profile.branch));
+  if (profile.year) tokens.push(yearToken(profile.year));
+  return tokens;
+}
+
+function indexProfile(profile) {
+  for (const token of profileTokens(profile)) {
+    let posting = engineState.postings.get(token);
+    if (!posting) {
+      posting = new Set();
+      engineState.postings.set(token, posting);
+    }
+    posting.add(profile.id);
+  }
+}
+
+function unindexProfile(profile) {
+  for (const token of profileTokens(profile)) {
+    const posting = engineState.postings.get(token);
+    if (!posting) continue;
+    posting.delete(profile.id);
+    if (posting.size === 0) engineState.postings.delete(token);
+  }
+}
+
+function applyUpsert(user) {
+  const id = user._id.toString();
+  const existing = engineState.profiles.get(id);
+  if (existing) unindexProfile(existing);
+
+  const profile = buildProfile(user, existing ? existing.seq : engineState.nextSeq++);
+  engineState.profiles.set(id, profile);
+  indexProfile(profile);
+  if (engineState.lsh) engineState.lsh.add(id, profileLshTokens(profile));
+  return profile;
+}
+
+function notifyChange(profile, previous) {
+  engineState.version++;
+  engineState.listeners.forEach(listener => listener(profile, previous));
+}
+
+/**
+ * Subscribe to index changes (used by the match cache to invalidate entries)
+ * @param {Function} listener - Called with (profile, previous); profile is
+ *   null when a user was removed, previous is null for new users
+ */
+function onProfileChange(listener) {
+  engineState.listeners.push(listener);
+}
+
+/**
+ * Counter that changes whenever any profile in the index changes
+ */
+function getVersion() {
+  return engineState.version;
+}
+
+function getProfile(userId) {
+  return engineState.profiles.get(userId.toString());
+}
+
+/**
+ * Load every user into the index once. Concurrent callers share the same load.
+ * @returns {Promise<void>}
+ */
+async function ensureLoaded() {
+  if (engineState.loaded) return;
+  if (!engineState.loading) {
+    engineState.loading = (async () => {
+      try {
+        const users = await User.find({}).select(MATCH_FIELDS).sort({ _id: 1 }).lean();
+        users.forEach(applyUpsert);
+        engineState.pending.forEach(applyUpsert);
+        engineState.pending.clear();
+        engineState.loaded = true;
+        console.log(`Match index loaded: ${engineState.profiles.size} users, ${engineState.postings.size} tokens`);
+      } finally {
+        engineState.loading = null;
+      }
+    })();
+  }
+  return engineState.loading;
+}
+
+function upsertLocal(user) {
+  if (!user || !user._id) return;
+  if (!engineState.loaded) {
+    // The initial load will pick this user up; replay once it finishes
+    engineState.pending.set(user._id.toString(), buildProfile(user, 0));
+    return;
+  }
+  const previous = engineState.profiles.get(user._id.toString()) || null;
+  notifyChange(applyUpsert(user), previous);
+}
+
+function removeLocal(userId) {
+  const id = userId.toString();
+  engineState.pending.delete(id);
+  const profile = engineState.profiles.get(id);
+  if (!profile) return;
+  unindexProfile(profile);
+  engineState.profiles.delete(id);
+  if (engineState.lsh) engineState.lsh.remove(id);
+  notifyChange(null, profile);
+}
+
+/**
+ * Add or refresh a user in the index (registration, profile updates), in
+ * this process and, when state is shared, in the others
+ * @param {Object} user - User document or lean object
+ */
+function upsertUser(user) {
+  if (!user || !user._id) return;
+  upsertLocal(user);
+  const fields = { _id: user._id.toString() };
+  MATCH_FIELDS.split(' ').forEach(field => {
+    if (user[field] !== undefined) fields[field] = user[field];
+  });
+  stateSync.publish('match:upsert', fields);
+}
+
+/**
+ * Drop a user from the index (here and in the other processes)
+ * @param {String} userId - User ID
+ */
+function removeUser(userId) {
+  removeLocal(userId);
+  stateSync.publish('match:remove', userId.toString());
+}
+
+stateSync.onSync('match:upsert', user => upsertLocal({ ...user, _id: new mongoose.Types.ObjectId(user._id) }));
+stateSync.onSync('match:remove', removeLocal);
+
+/**
+ * Items of the current user the candidate also has, in the current user's order
+ * @param {Object} current - Match profile of the current user
+ * @param {Object} user - Match profile of the candidate
+ * @returns {Object} { sharedSkills, sharedInterests }
+ */
+function sharedItems(current, user) {
+  const { vocab } = engineState;
+  return {
+    sharedSkills: current.skills.filter(skill => has(user.skillVec, vocab.skills.lookup(skill))),
+    sharedInterests: current.interests.filter(interest => has(user.interestVec, vocab.interests.lookup(interest)))
+  };
+}
+
+/**
+ * Shape a ranked candidate into the API response object
+ */
+function toMatch(current, { profile, score }) {
+  const { sharedSkills, sharedInterests } = sharedItems(current, profile);
+  return {
+    id: profile._id,
+    name: profile.name,
+    email: profile.email,
+    branch: profile.branch,
+    year: profile.year,
+    availability: profile.availability,
+    skills: profile.skills,
+    interests: profile.interests,
+    sharedSkills,
+    sharedInterests,
+    score,
+    // Include matchScore for backward compatibility
+    matchScore: score
+  };
+}
+
+/**
+ * Rank candidates on the event loop using the inverted index
+ * @param {Object} current - Match profile of the current user
+ * @param {Number} limit - Number of matches to return
+ * @returns {Array<Object>} [{ profile, seq, score }], best first
+ */
+function rankInline(current, limit) {
+  const heap = new TopK(limit, compareRanked);
+  const seen = new Set([current.id]);
+
+  const visit = (userId) => {
+    if (seen.has(userId)) return;
+    seen.add(userId);
+    const profile = engineState.profiles.get(userId);
+    if (!profile) return;
+    heap.push({ profile, seq: profile.seq, score: scorePair(current, profile) });
+  };
+
+  const visitPosting = (token) => {
+    const posting = engineState.postings.get(token);
+    if (posting) posting.forEach(visit);
+  };
+
+  // Candidates sharing a skill, interest or availability slot
+  current.skillVec.forEach(id => visitPosting(skillToken(id)));
+  current.interestVec.forEach(id => visitPosting(interestToken(id)));
+  current.availabilityVec.forEach(id => visitPosting(availabilityToken(id)));
+
+  // Branch/year-only candidates can score at most MAX_PROXIMITY_SCORE
+  const worst = heap.peek();
+  if (!heap.isFull() || worst.score <= MAX_PROXIMITY_SCORE) {
+    if (current.branch) visitPosting(branchToken(current.branch));
+    if (current.year) visitPosting(yearToken(current.year));
+  }
+
+  // Pad with zero-score users in collection order when the index runs dry
+  if (!heap.isFull()) {
+    for (const [userId, profile] of engineState.profiles) {
+      if (heap.isFull()) break;
+      if (seen.has(userId)) continue;
+      heap.push({ profile, seq: profile.seq, score: 0 });
+    }
+  }
+
+  return heap.toSortedArray();
+}
+
+/**
+ * Rank candidates on the worker pool (full scan, same scores and order)
+ * @param {Object} current - Match profile of the current user
+ * @param {Number} limit - Number of matches to return
+ * @returns {Promise<Array<Object>>} [{ profile, seq, score }], best first
+ */
+async function rankPooled(current, limit) {
+  if (!engineState.pool) {
+    engineState.pool = new MatchWorkerPool({
+      size: parseInt(process.env.MATCH_POOL_SIZE) || undefined
+    });
+  }
+  const { pool } = engineState;
+  pool.syncSnapshot(() => Array.from(engineState.profiles.values()), engineState.version);
+  return pool.topK(current, limit);
+}
+
+/**
+ * Rank candidates from the LSH shortlist, rescored exactly
+ * @param {Object} current - Match profile of the current user
+ * @param {Number} limit - Number of matches to return
+ * @returns {Array<Object>} [{ profile, seq, score }], best first
+ */
+function rankApproximate(current, limit) {
+  if (!engineState.lsh) {
+    const lsh = new MinHashLSH({
+      bands: parseInt(process.env.MATCH_LSH_BANDS) || 16,
+      rows: parseInt(process.env.MATCH_LSH_ROWS) || 2
+    });
+    engineState.profiles.forEach((profile, id) => lsh.add(id, profileLshTokens(profile)));
+    engineState.lsh = lsh;
+  }
+
+  const shortlist = engineState.lsh.query(profileLshTokens(current));
+  shortlist.delete(current.id);
+  // Too few look-alikes (or an empty profile): the exact index is cheap here
+  if (shortlist.size < limit) return rankInline(current, limit);
+
+  const heap = new TopK(limit, compareRanked);
+  shortlist.forEach(userId => {
+    const profile = engineState.profiles.get(userId);
+    if (profile) heap.push({ profile, seq: profile.seq, score: scorePair(current, profile) });
+  });
+  return heap.toSortedArray();
+}
+
+/**
+ * Rank the best study buddies for a user
+ * @param {Object} currentUser - Authenticated user (document or lean object)
+ * @param {Number} limit - Number of matches to return
+ * @param {String} mode - 'inline', 'pooled' or 'approximate' (defaults to MATCH_SCORING_MODE)
+ * @returns {Promise<Array<Object>>} Top matches, best first
+ */
+async function findMatches(currentUser, limit, mode = SCORING_MODE) {
+  await ensureLoaded();
+
+  const current = buildProfile(currentUser, -1);
+  let ranked;
+  if (mode === 'pooled') {
+    try {
+      ranked = await rankPooled(current, limit);
+    } catch (error) {
+      console.error('Pooled match scoring failed, scoring inline:', error);
+      ranked = rankInline(current, limit);
+    }
+  } else if (mode === 'approximate') {
+    ranked = rankApproximate(current, limit);
+  } else {
+    ranked = rankInline(current, limit);
+  }
+
+  return ranked.map(candidate => toMatch(current, candidate));
+}
+
+/**
+ * Stop the worker pool, if one was started
+ */
+async function closePool() {
+  if (!engineState.pool) return;
+  const { pool } = engineState;
+  engineState.pool = null;
+  await pool.close();
+}
+
+/**
+ * Index size statistics
+ */
+function getIndexStats() {
+  return {
+    mode: SCORING_MODE,
+    loaded: engineState.loaded,
+    users: engineState.profiles.size,
+    tokens: engineState.postings.size,
+    lshUsers: engineState.lsh ? engineState.lsh.size : 0,
+    vocabulary: {
+      skills: engineState.vocab.skills.size,
+      interests: engineState.vocab.interests.size,
+      availability: engineState.vocab.availability.size
+    }
+  };
+}
+
+module.exports = {
+  WEIGHTS,
+  MAX_PROXIMITY_SCORE,
+  MATCH_FIELDS,
+  ensureLoaded,
+  upsertUser,
+  removeUser,
+  onProfileChange,
+  getVersion,
+  getProfile,
+  buildProfile,
+  profileTokens,
+  scorePair,
+  sharedItems,
+  findMatches,
+  closePool,
+  getIndexStats
+};
@@ -0,0 +1,90 @@
+/**
+ * Match scoring shared by the inline engine, the worker pool and batch jobs
+ *
+ * Kept free of Mongoose so it can run inside worker threads.
+ */
+const { intersect, cosine } = require('./sparseVector');
+
+// Weight configuration for AI-driven matching
+const WEIGHTS = {
+  skillsCosine: 0.25,      // Cosine similarity for skills (enhanced)
+  skillsOverlap: 0.15,     // Direct overlap for skills (legacy)
+  interestsCosine: 0.20,    // Cosine similarity for interests (enhanced)
+  interestsOverlap: 0.10,  // Direct overlap for interests (legacy)
+  availability: 0.2,
+  proximity: 0.1
+};
+
+/**
+ * Proximity score: 1 if same branch and year, 0.5 if same branch or same year, 0 otherwise
+ */
+function proximityScore(current, user) {
+  if (current.branch && user.branch && current.year && user.year) {
+    if (current.branch === user.branch && current.year === user.year) {
+      return 1;
+    } else if (current.branch === user.branch || current.year === user.year) {
+      return 0.5;
+    }
+  } else if (current.branch && user.branch && current.branch === user.branch) {
+    return 0.5;
+  } else if (current.year && user.year && current.year === user.year) {
+    return 0.5;
+  }
+  return 0;
+}
+
+/**
+ * Score a candidate against the current user
+ * @param {Object} current - Match profile of the current user
+ * @param {Object} user - Match profile of the candidate
+ *   (needs skillVec/interestVec/availabilityVec, skillNorm/interestNorm, branch, year)
+ * @returns {Number} Match score (0-100, 2 decimal places)
+ */
+function scorePair(current, user) {
+  // One merge pass per field gives both the dot product and the overlap count
+  const skills = intersect(current.skillVec, user.skillVec);
+  const interests = intersect(current.interestVec, user.interestVec);
+  const availability = intersect(current.availabilityVec, user.availabilityVec);
+
+  const skillsCosineSim = cosine(skills.distinct, current.skillNorm, user.skillNorm);
+  const interestsCosineSim = cosine(interests.distinct, current.interestNorm, user.interestNorm);
+
+  // Normalize scores (0-1 scale)
+  // Vectors keep repeated entries, so their lengths are the raw list lengths
+  const maxSkills = Math.max(current.skillVec.length, user.skillVec.length, 1);
+  const skillsOverlapScore = skills.total / maxSkills;
+
+  const maxInterests = Math.max(current.interestVec.length, user.interestVec.length, 1);
+  const interestsOverlapScore = interests.total / maxInterests;
+
+  const maxAvailability = Math.max(current.availabilityVec.length, user.availabilityVec.length, 1);
+  const availabilityScore = availability.total / maxAvailability;
+
+  // Combines cosine similarity (more accurate) with overlap metrics (backward compatibility)
+  const finalScore = (
+    skillsCosineSim * WEIGHTS.skillsCosine +
+    skillsOverlapScore * WEIGHTS.skillsOverlap +
+    interestsCosineSim * WEIGHTS.interestsCosine +
+    interestsOverlapScore * WEIGHTS.interestsOverlap +
+    availabilityScore * WEIGHTS.availability +
+    proximityScore(current, user) * WEIGHTS.proximity
+  ) * 100; // Convert to percentage (0-100)
+
+  return Math.round(finalScore * 100) / 100; // Round to 2 decimal places
+}
+
+/**
+ * Heap/sort order for ranked candidates ({ score, seq }): higher score first,
+ * ties keep collection order like a stable sort would
+ */
+function compareRanked(a, b) {
+  if (a.score !== b.score) return a.score - b.score;
+  return b.seq - a.seq;
+}
+
+module.exports = {
+  WEIGHTS,
+  proximityScore,
+  scorePair,
+  compareRanked
+};
@@ -0,0 +1,60 @@
+/**
+ * Worker thread for match scoring (see utils/matchWorkerPool.js)
+ *
+ * Holds views over the pool's SharedArrayBuffer snapshot and scores a
+ * slice of it per query, returning that slice's top-k.
+ */
+const { parentPort } = require('worker_threads');
+const TopK = require('./topK');
+const { scorePair, compareRanked } = require('./matchScoring');
+
+let snapshot = null;
+let snapshotVersion = -1;
+
+/**
+ * Point a reusable candidate object at profile `index` in the snapshot
+ */
+function loadCandidate(candidate, index) {
+  const { skills, interests, availability } = snapshot;
+  candidate.skillVec = skills.ids.subarray(skills.offsets[index], skills.offsets[index + 1]);
+  candidate.interestVec = interests.ids.subarray(interests.offsets[index], interests.offsets[index + 1]);
+  candidate.availabilityVec = availability.ids.subarray(availability.offsets[index], availability.offsets[index + 1]);
+  candidate.skillNorm = snapshot.skillNorms[index];
+  candidate.interestNorm = snapshot.interestNorms[index];
+  candidate.branch = snapshot.branches[index];
+  candidate.year = snapshot.years[index];
+  return candidate;
+}
+
+function scoreRange({ query, start, end, k, exclude }) {
+  const heap = new TopK(k, compareRanked);
+  const candidate = {};
+  for (let index = start; index < end; index++) {
+    if (index === exclude) continue;
+    heap.push({
+      index,
+      seq: snapshot.seqs[index],
+      score: scorePair(query, loadCandidate(candidate, index))
+    });
+  }
+  return heap.items;
+}
+
+parentPort.on('message', (message) => {
+  if (message.type === 'snapshot') {
+    snapshot = message.snapshot;
+    snapshotVersion = message.version;
+    return;
+  }
+
+  if (message.type === 'query') {
+    try {
+      if (message.version !== snapshotVersion) {
+        throw new Error(`Snapshot version mismatch (have ${snapshotVersion}, want ${message.version})`);
+      }
+      parentPort.postMessage({ id: message.id, results: scoreRange(message) });
+    } catch (error) {
+      parentPort.postMessage({ id: message.id, error: error.message });
+    }
+  }
+});
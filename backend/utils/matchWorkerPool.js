@@ -0,0 +1,186 @@
+/**
+ * worker_threads pool for match scoring on large cohorts
+ *
+ * Match profiles are packed into SharedArrayBuffers (CSR layout: one offsets
+ * array and one ids array per field) that every worker reads without
+ * copying. A query is split into one contiguous slice per worker, and the
+ * partial top-k lists are merged on the main thread. Ranking uses the same
+ * scorePair/compareRanked as the inline engine, so both modes agree.
+ */
+const os = require('os');
+const path = require('path');
+const { Worker } = require('worker_threads');
+const TopK = require('./topK');
+const { Interner } = require('./sparseVector');
+const { compareRanked } = require('./matchScoring');
+
+function sharedInt32(length) {
+  return new Int32Array(new SharedArrayBuffer(Math.max(length, 1) * Int32Array.BYTES_PER_ELEMENT));
+}
+
+function sharedFloat64(length) {
+  return new Float64Array(new SharedArrayBuffer(Math.max(length, 1) * Float64Array.BYTES_PER_ELEMENT));
+}
+
+function packField(profiles, key) {
+  const offsets = sharedInt32(profiles.length + 1);
+  let total = 0;
+  profiles.forEach((profile, i) => {
+    offsets[i] = total;
+    total += profile[key].length;
+  });
+  offsets[profiles.length] = total;
+
+  const ids = sharedInt32(total);
+  profiles.forEach((profile, i) => ids.set(profile[key], offsets[i]));
+  return { offsets, ids };
+}
+
+class MatchWorkerPool {
+  /**
+   * @param {Object} options
+   * @param {Number} options.size - Number of worker threads
+   */
+  constructor({ size = Math.max(1, os.cpus().length - 1) } = {}) {
+    this.size = size;
+    this.workers = [];
+    this.pending = new Map();
+    this.nextRequestId = 0;
+    this.branchVocab = new Interner();
+    this.version = -1;
+    this.snapshot = null;
+    this.profiles = [];
+    this.indexById = new Map();
+    this.closed = false;
+
+    for (let i = 0; i < size; i++) this.workers.push(this.spawn());
+  }
+
+  spawn() {
+    const worker = new Worker(path.join(__dirname, 'matchWorker.js'));
+    worker.unref();
+    worker.on('message', ({ id, results, error }) => {
+      const request = this.pending.get(id);
+      if (!request) return;
+      this.pending.delete(id);
+      if (error) request.reject(new Error(error));
+      else request.resolve(results);
+    });
+    worker.on('error', (error) => {
+      console.error('Match worker error:', error);
+      this.replace(worker, error);
+    });
+    worker.on('exit', (code) => {
+      if (code !== 0 && !this.closed) this.replace(worker, new Error(`Match worker exited with code ${code}`));
+    });
+    if (this.snapshot) {
+      worker.postMessage({ type: 'snapshot', version: this.version, snapshot: this.snapshot });
+    }
+    return worker;
+  }
+
+  replace(worker, error) {
+    const index = this.workers.indexOf(worker);
+    if (index === -1) return;
+    for (const [id, request] of this.pending) {
+      if (request.worker === worker) {
+        this.pending.delete(id);
+        request.reject(error);
+      }
+    }
+    this.workers[index] = this.spawn();
+  }
+
+  // Branches become small positive ints (0 = no branch) so truthiness and
+  // equality behave like the original strings inside proximityScore
+  branchCode(branch) {
+    return branch ? this.branchVocab.intern(branch) + 1 : 0;
+  }
+
+  /**
+   * Rebuild the shared snapshot if the index changed since the last one
+   * @param {Function} getProfiles - Returns the profiles in collection order
+   * @param {Number} version - Index version the profiles belong to
+   */
+  syncSnapshot(getProfiles, version) {
+    if (version === this.version) return;
+
+    const profiles = getProfiles();
+    const count = profiles.length;
+    const snapshot = {
+      count,
+      skills: packField(profiles, 'skillVec'),
+      interests: packField(profiles, 'interestVec'),
+      availability: packField(profiles, 'availabilityVec'),
+      skillNorms: sharedFloat64(count),
+      interestNorms: sharedFloat64(count),
+      branches: sharedInt32(count),
+      years: sharedInt32(count),
+      seqs: sharedInt32(count)
+    };
+    const indexById = new Map();
+    profiles.forEach((profile, i) => {
+      snapshot.skillNorms[i] = profile.skillNorm;
+      snapshot.interestNorms[i] = profile.interestNorm;
+      snapshot.branches[i] = this.branchCode(profile.branch);
+      snapshot.years[i] = profile.year || 0;
+      snapshot.seqs[i] = profile.seq;
+      indexById.set(profile.id, i);
+    });
+
+    this.snapshot = snapshot;
+    this.profiles = profiles;
+    this.indexById = indexById;
+    this.version = version;
+    this.workers.forEach(worker => worker.postMessage({ type: 'snapshot', version, snapshot }));
+  }
+
+  request(worker, message) {
+    return new Promise((resolve, reject) => {
+      const id = this.nextRequestId++;
+      this.pending.set(id, { resolve, reject, worker });
+      worker.postMessage({ ...message, id });
+    });
+  }
+
+  /**
+   * Score every profile in the snapshot against a query profile
+   * @param {Object} current - Match profile of the current user
+   * @param {Number} k - Number of results
+   * @returns {Promise<Array<Object>>} [{ profile, seq, score }], best first
+   */
+  async topK(current, k) {
+    const { count } = this.snapshot;
+    const query = {
+      skillVec: current.skillVec,
+      interestVec: current.interestVec,
+      availabilityVec: current.availabilityVec,
+      skillNorm: current.skillNorm,
+      interestNorm: current.interestNorm,
+      branch: this.branchCode(current.branch),
+      year: current.year || 0
+    };
+    const exclude = this.indexById.has(current.id) ? this.indexById.get(current.id) : -1;
+    const profiles = this.profiles;
+    const chunk = Math.ceil(count / this.workers.length);
+
+    const partials = await Promise.all(this.workers.map((worker, w) => {
+      const start = w * chunk;
+      const end = Math.min(count, start + chunk);
+      if (start >= end) return [];
+      return this.request(worker, { type: 'query', version: this.version, query, start, end, k, exclude });
+    }));
+
+    const heap = new TopK(k, compareRanked);
+    partials.forEach(partial => heap.merge(partial));
+    return heap.toSortedArray().map(({ index, seq, score }) => ({ profile: profiles[index], seq, score }));
+  }
+
+  async close() {
+    this.closed = true;
+    await Promise.all(this.workers.map(worker => worker.terminate()));
+    this.workers = [];
+  }
+}
+
+module.exports = MatchWorkerPool;
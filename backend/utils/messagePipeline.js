@@ -0,0 +1,175 @@
+/**
+ * Write-batching persistence for chat messages sent over the socket
+ *
+ * Messages get their _id and createdAt up front, so they can be broadcast
+ * before they are stored. Buffered messages are written in micro-batches:
+ * one insertMany for the messages and one bulkWrite that sets each
+ * conversation's lastMessage and bumps its unread counters.
+ *
+ * - Ordering: sends are chained per conversation (see sequence), and
+ *   batches are written one at a time in arrival order.
+ * - Backpressure: once MESSAGE_PIPELINE_MAX_PENDING messages are waiting,
+ *   enqueue() waits for a flush before accepting more.
+ * - Durability: with durable set, callers await `persisted` before
+ *   broadcasting, so nothing is shown that could still be lost.
+ */
+const Conversation = require('../models/Conversation');
+const Message = require('../models/Message');
+
+const BATCH_SIZE = parseInt(process.env.MESSAGE_PIPELINE_BATCH_SIZE) || 200;
+const FLUSH_INTERVAL_MS = parseInt(process.env.MESSAGE_PIPELINE_FLUSH_MS) || 20;
+const MAX_PENDING = parseInt(process.env.MESSAGE_PIPELINE_MAX_PENDING) || 5000;
+const DURABLE = process.env.MESSAGE_PIPELINE_DURABLE === 'true';
+
+const pipelineState = {
+  buffer: [],          // { message, recipientId, resolve, reject }
+  timer: null,
+  flushing: null,      // promise of the batch being written
+  waiters: [],         // enqueue() calls waiting for capacity
+  chains: new Map(),   // conversationId -> tail of its send chain
+  stats: { enqueued: 0, persisted: 0, failed: 0, batches: 0, throttled: 0 }
+};
+
+function scheduleFlush() {
+  if (pipelineState.flushing || pipelineState.timer) return;
+  if (pipelineState.buffer.length >= BATCH_SIZE) {
+    flushMessages();
+  } else if (pipelineState.buffer.length > 0) {
+    pipelineState.timer = setTimeout(flushMessages, FLUSH_INTERVAL_MS);
+    pipelineState.timer.unref();
+  }
+}
+
+function releaseWaiters() {
+  while (pipelineState.waiters.length > 0 && pipelineState.buffer.length < MAX_PENDING) {
+    pipelineState.waiters.shift()();
+  }
+}
+
+async function writeBatch(batch) {
+  await Message.insertMany(batch.map(entry => entry.message), { ordered: true });
+
+  // Last text and unread increments per conversation, in batch order
+  const conversations = new Map();
+  batch.forEach(({ message, recipientId }) => {
+    const id = message.conversationId.toString();
+    const update = conversations.get(id) || { lastMessage: '', unread: {} };
+    update.lastMessage = message.text;
+    if (recipientId) update.unread[`unread.${recipientId}`] = (update.unread[`unread.${recipientId}`] || 0) + 1;
+    conversations.set(id, update);
+  });
+  await Conversation.bulkWrite(
+    Array.from(conversations, ([id, { lastMessage, unread }]) => ({
+      updateOne: {
+        filter: { _id: id },
+        update: { $set: { lastMessage }, $inc: unread }
+      }
+    })),
+    { ordered: false }
+  );
+}
+
+/**
+ * Write everything buffered so far, one batch at a time
+ * @returns {Promise<void>}
+ */
+async function flushMessages() {
+  if (pipelineState.timer) {
+    clearTimeout(pipelineState.timer);
+    pipelineState.timer = null;
+  }
+  if (pipelineState.flushing) {
+    await pipelineState.flushing;
+    return flushMessages();
+  }
+
+  while (pipelineState.buffer.length > 0) {
+    const batch = pipelineState.buffer.splice(0, BATCH_SIZE);
+    releaseWaiters();
+    pipelineState.flushing = writeBatch(batch);
+    try {
+      await pipelineState.flushing;
+      pipelineState.stats.persisted += batch.length;
+      pipelineState.stats.batches++;
+      batch.forEach(entry => entry.resolve(entry.message));
+    } catch (error) {
+      pipelineState.stats.failed += batch.length;
+      console.error(`[MessagePipeline] Failed to persist ${batch.length} messages:`, error);
+      batch.forEach(entry => entry.reject(error));
+    } finally {
+      pipelineState.flushing = null;
+    }
+  }
+}
+
+/**
+ * Queue a message for persistence
+ * @param {Object} params
+ * @param {String} params.conversationId - Conversation ID
+ * @param {String} params.senderId - Sender's user ID
+ * @param {String} params.recipientId - Participant whose unread count grows
+ * @param {String} params.text - Message text (already trimmed)
+ * @returns {Promise<Object>} { message, persisted } - the message to
+ *   broadcast now, and a promise that settles once it is stored
+ */
+async function enqueueMessage({ conversationId, senderId, recipientId, text }) {
+  if (pipelineState.buffer.length >= MAX_PENDING) {
+    pipelineState.stats.throttled++;
+    await new Promise(resolve => pipelineState.waiters.push(resolve));
+  }
+
+  const message = new Message({
+    conversationId,
+    sender: senderId,
+    text,
+    createdAt: new Date()
+  });
+  let entry;
+  const persisted = new Promise((resolve, reject) => {
+    entry = { message, recipientId, resolve, reject };
+  });
+  // Durable callers await this; everyone else must not see a rejection crash
+  persisted.catch(() => {});
+
+  pipelineState.buffer.push(entry);
+  pipelineState.stats.enqueued++;
+  scheduleFlush();
+  return { message, persisted };
+}
+
+/**
+ * Run sends for one conversation strictly one after another
+ * @param {String} conversationId - Conversation ID
+ * @param {Function} task - async () => void
+ * @returns {Promise<void>}
+ */
+function sequence(conversationId, task) {
+  const key = conversationId.toString();
+  const tail = (pipelineState.chains.get(key) || Promise.resolve())
+    .then(task)
+    .catch(error => console.error('[MessagePipeline] Send error:', error));
+  pipelineState.chains.set(key, tail);
+  tail.then(() => {
+    if (pipelineState.chains.get(key) === tail) pipelineState.chains.delete(key);
+  });
+  return tail;
+}
+
+function getPipelineStats() {
+  return {
+    ...pipelineState.stats,
+    durable: DURABLE,
+    pending: pipelineState.buffer.length,
+    waiting: pipelineState.waiters.length,
+    batchSize: BATCH_SIZE,
+    maxPending: MAX_PENDING
+  };
+}
+
+module.exports = {
+  DURABLE,
+  enqueueMessage,
+  sequence,
+  flushMessages,
+  getPipelineStats
+};
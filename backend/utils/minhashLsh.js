@@ -0,0 +1,142 @@
+/**
+ * MinHash signatures with banded LSH buckets
+ *
+ * A user's token set (interned skill and interest ids) is summarised by
+ * bands * rows MinHash values. Users whose signatures agree on every row
+ * of at least one band land in the same bucket. A query only looks at its
+ * own buckets, so candidate generation does not grow with the user count.
+ * Two sets with Jaccard similarity s share a bucket with probability
+ * 1 - (1 - s^rows)^bands.
+ */
+
+// murmur3 32-bit finalizer - cheap, well-mixed integer hash
+function fmix32(h) {
+  h ^= h >>> 16;
+  h = Math.imul(h, 0x85ebca6b);
+  h ^= h >>> 13;
+  h = Math.imul(h, 0xc2b2ae35);
+  h ^= h >>> 16;
+  return h >>> 0;
+}
+
+class MinHashLSH {
+  /**
+   * @param {Object} options
+   * @param {Number} options.bands - Number of LSH bands
+   * @param {Number} options.rows - MinHash rows per band
+   * @param {Number} options.seed - Seed for the hash family
+   */
+  constructor({ bands = 16, rows = 2, seed = 0x9e3779b9 } = {}) {
+    this.bands = bands;
+    this.rows = rows;
+    this.seeds = new Uint32Array(bands * rows);
+    for (let i = 0; i < this.seeds.length; i++) {
+      this.seeds[i] = fmix32(seed + i * 0x6d2b79f5);
+    }
+    this.buckets = Array.from({ length: bands }, () => new Map()); // bandKey -> Set<userId>
+    this.keys = new Map(); // userId -> Uint32Array of band keys
+  }
+
+  get size() {
+    return this.keys.size;
+  }
+
+  /**
+   * MinHash signature of a token set
+   * @param {ArrayLike<Number>} tokens - Non-negative integer tokens
+   * @returns {Uint32Array} bands * rows minimum hashes
+   */
+  signature(tokens) {
+    const signature = new Uint32Array(this.seeds.length).fill(0xffffffff);
+    for (let t = 0; t < tokens.length; t++) {
+      const token = tokens[t];
+      for (let i = 0; i < this.seeds.length; i++) {
+        const h = fmix32(token ^ this.seeds[i]);
+        if (h < signature[i]) signature[i] = h;
+      }
+    }
+    return signature;
+  }
+
+  /**
+   * Hash each band's rows into a single bucket key
+   * @param {ArrayLike<Number>} tokens - Token set
+   * @returns {Uint32Array|null} One key per band, or null for an empty set
+   */
+  bandKeys(tokens) {
+    if (tokens.length === 0) return null;
+    const signature = this.signature(tokens);
+    const keys = new Uint32Array(this.bands);
+    for (let band = 0; band < this.bands; band++) {
+      let key = band;
+      for (let row = 0; row < this.rows; row++) {
+        key = fmix32(Math.imul(key, 31) ^ signature[band * this.rows + row]);
+      }
+      keys[band] = key;
+    }
+    return keys;
+  }
+
+  /**
+   * Add or replace a user's token set
+   */
+  add(userId, tokens) {
+    this.remove(userId);
+    const keys = this.bandKeys(tokens);
+    if (!keys) return;
+    this.keys.set(userId, keys);
+    for (let band = 0; band < this.bands; band++) {
+      let bucket = this.buckets[band].get(keys[band]);
+      if (!bucket) {
+        bucket = new Set();
+        this.buckets[band].set(keys[band], bucket);
+      }
+      bucket.add(userId);
+    }
+  }
+
+  remove(userId) {
+    const keys = this.keys.get(userId);
+    if (!keys) return;
+    this.keys.delete(userId);
+    for (let band = 0; band < this.bands; band++) {
+      const bucket = this.buckets[band].get(keys[band]);
+      if (!bucket) continue;
+      bucket.delete(userId);
+      if (bucket.size === 0) this.buckets[band].delete(keys[band]);
+    }
+  }
+
+  /**
+   * Users sharing at least one bucket with a token set
+   * @param {ArrayLike<Number>} tokens - Query token set
+   * @returns {Set} Candidate user IDs
+   */
+  query(tokens) {
+    const candidates = new Set();
+    const keys = this.bandKeys(tokens);
+    if (!keys) return candidates;
+    for (let band = 0; band < this.bands; band++) {
+      const bucket = this.buckets[band].get(keys[band]);
+      if (bucket) bucket.forEach(userId => candidates.add(userId));
+    }
+    return candidates;
+  }
+}
+
+/**
+ * Token set for LSH: skill and interest ids in disjoint ranges
+ * @param {Object} profile - Match profile (skillVec, interestVec)
+ * @returns {Uint32Array} Tokens
+ */
+function profileLshTokens(profile) {
+  const tokens = new Uint32Array(profile.skillVec.length + profile.interestVec.length);
+  profile.skillVec.forEach((id, i) => { tokens[i] = id * 2; });
+  profile.interestVec.forEach((id, i) => { tokens[profile.skillVec.length + i] = id * 2 + 1; });
+  return tokens;
+}
+
+module.exports = {
+  MinHashLSH,
+  profileLshTokens
+};
@@ -0,0 +1,205 @@
+/**
+ * Wellness check-ins and their running aggregates
+ *
+ * Check-ins live in the MoodCheckin collection, one document per user per
+ * day. Each new check-in also bumps the user's MoodStats document in a
+ * single atomic update (counts per ISO week and per month, streaks), so
+ * weekly/monthly stats are one small read however long the history is.
+ *
+ * Days are YYYY-MM-DD in server local time, the boundary the check-in
+ * route has always used.
+ */
+const MoodStats = require('../models/MoodStats');
+const MoodCheckin = require('../models/MoodCheckin');
+
+const MOODS = ['happy', 'neutral', 'stressed'];
+
+const pad = value => String(value).padStart(2, '0');
+
+/**
+ * @param {String} mood - Mood as sent by the client (e.g. "Happy")
+ * @returns {String|null} Lower-case mood, or null if unknown
+ */
+function normalizeMood(mood) {
+  const key = String(mood || '').toLowerCase();
+  return MOODS.includes(key) ? key : null;
+}
+
+/**
+ * @param {Date} date
+ * @returns {String} Local day (YYYY-MM-DD)
+ */
+function dayKey(date = new Date()) {
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}`;
+}
+
+function parseDay(day) {
+  const [year, month, date] = day.split('-').map(Number);
+  return { year, month, date };
+}
+
+/**
+ * @param {String} day - YYYY-MM-DD
+ * @param {Number} days - Days to add (negative for earlier)
+ * @returns {String} Shifted day
+ */
+function shiftDay(day, days) {
+  const { year, month, date } = parseDay(day);
+  return dayKey(new Date(year, month - 1, date + days));
+}
+
+/**
+ * @param {String} day - YYYY-MM-DD
+ * @returns {String} ISO week (YYYY-Www)
+ */
+function weekKey(day) {
+  const { year, month, date } = parseDay(day);
+  const utc = new Date(Date.UTC(year, month - 1, date));
+  // The Thursday of this week decides the ISO year
+  utc.setUTCDate(utc.getUTCDate() + 4 - (utc.getUTCDay() || 7));
+  const yearStart = Date.UTC(utc.getUTCFullYear(), 0, 1);
+  const week = Math.ceil(((utc - yearStart) / 86400000 + 1) / 7);
+  return `${utc.getUTCFullYear()}-W${pad(week)}`;
+}
+
+/**
+ * @param {String} day - YYYY-MM-DD
+ * @returns {String} Month (YYYY-MM)
+ */
+function monthKey(day) {
+  return day.slice(0, 7);
+}
+
+const increment = path => ({ $add: [{ $ifNull: [`$${path}`, 0] }, 1] });
+
+/**
+ * Fold one new check-in into the user's stats (one atomic upsert)
+ * @param {ObjectId} userId - User ID
+ * @param {String} day - Check-in day (YYYY-MM-DD)
+ * @param {String} mood - Normalized mood
+ */
+async function recordCheckin(userId, day, mood) {
+  const week = `weekly.${weekKey(day)}`;
+  const month = `monthly.${monthKey(day)}`;
+  await MoodStats.updateOne({ userId }, [
+    {
+      $set: {
+        currentStreak: {
+          $cond: [{ $eq: ['$lastDay', shiftDay(day, -1)] }, increment('currentStreak'), 1]
+        },
+        totalCheckins: increment('totalCheckins'),
+        [`${week}.${mood}`]: increment(`${week}.${mood}`),
+        [`${week}.total`]: increment(`${week}.total`),
+        [`${month}.${mood}`]: increment(`${month}.${mood}`),
+        [`${month}.total`]: increment(`${month}.total`)
+      }
+    },
+    {
+      $set: {
+        longestStreak: { $max: [{ $ifNull: ['$longestStreak', 0] }, '$currentStreak'] },
+        lastDay: day,
+        lastMood: mood,
+        updatedAt: '$$NOW'
+      }
+    }
+  ], { upsert: true });
+}
+
+/**
+ * Stats for a full check-in history (used to rebuild them, e.g. after a
+ * backfill)
+ * @param {Array<Object>} checkins - { day, mood }, oldest first, one per day
+ * @returns {Object} MoodStats fields
+ */
+function summarizeCheckins(checkins) {
+  const stats = { totalCheckins: 0, currentStreak: 0, longestStreak: 0, weekly: {}, monthly: {} };
+  const bump = (buckets, key, mood) => {
+    buckets[key] = buckets[key] || { total: 0 };
+    buckets[key][mood] = (buckets[key][mood] || 0) + 1;
+    buckets[key].total++;
+  };
+  checkins.forEach(({ day, mood }) => {
+    const key = normalizeMood(mood) || 'neutral';
+    stats.currentStreak = stats.lastDay === shiftDay(day, -1) ? stats.currentStreak + 1 : 1;
+    stats.longestStreak = Math.max(stats.longestStreak, stats.currentStreak);
+    stats.totalCheckins++;
+    stats.lastDay = day;
+    stats.lastMood = key;
+    bump(stats.weekly, weekKey(day), key);
+    bump(stats.monthly, monthKey(day), key);
+  });
+  stats.updatedAt = new Date();
+  return stats;
+}
+
+/**
+ * Rebuild a user's stats from their stored check-ins (idempotent, so safe
+ * to run when it isn't known whether recordCheckin was applied)
+ * @param {ObjectId} userId - User ID
+ */
+async function rebuildStats(userId) {
+  const checkins = await MoodCheckin.find({ userId }).select('day mood -_id').sort({ day: 1 }).lean();
+  await MoodStats.replaceOne({ userId }, { userId, ...summarizeCheckins(checkins) }, { upsert: true });
+}
+
+function periodSummary(period, counts = {}) {
+  const summary = { period, total: counts.total || 0 };
+  MOODS.forEach(mood => {
+    summary[mood] = counts[mood] || 0;
+  });
+  summary.dominantMood = summary.total === 0
+    ? null
+    : MOODS.reduce((best, mood) => (summary[mood] > summary[best] ? mood : best));
+  return summary;
+}
+
+/**
+ * Precomputed mood aggregates and streaks for a user
+ * @param {ObjectId} userId - User ID
+ * @param {Object} options
+ * @param {Number} options.weeks - ISO weeks to return, newest first
+ * @param {Number} options.months - Months to return, newest first
+ * @returns {Promise<Object>} Streaks, totals, weekly and monthly summaries
+ */
+async function getMoodSummary(userId, { weeks = 8, months = 6 } = {}) {
+  const today = dayKey();
+  const weekKeys = Array.from({ length: weeks }, (_, i) => weekKey(shiftDay(today, -7 * i)));
+  const { year, month } = parseDay(today);
+  const monthKeys = Array.from({ length: months }, (_, i) => {
+    const date = new Date(year, month - 1 - i, 1);
+    return `${date.getFullYear()}-${pad(date.getMonth() + 1)}`;
+  });
+
+  // Only the requested periods are read, never the whole stats document
+  const projection = { totalCheckins: 1, currentStreak: 1, longestStreak: 1, lastDay: 1, lastMood: 1 };
+  weekKeys.forEach(key => { projection[`weekly.${key}`] = 1; });
+  monthKeys.forEach(key => { projection[`monthly.${key}`] = 1; });
+  const stats = await MoodStats.findOne({ userId }).select(projection).lean() || {};
+
+  // A streak is still alive until a full day passes without a check-in
+  const streakAlive = stats.lastDay === today || stats.lastDay === shiftDay(today, -1);
+  return {
+    today,
+    checkedInToday: stats.lastDay === today,
+    totalCheckins: stats.totalCheckins || 0,
+    currentStreak: streakAlive ? stats.currentStreak : 0,
+    longestStreak: stats.longestStreak || 0,
+    lastCheckinDay: stats.lastDay || null,
+    lastMood: stats.lastMood || null,
+    weekly: weekKeys.map(key => periodSummary(key, stats.weekly && stats.weekly[key])),
+    monthly: monthKeys.map(key => periodSummary(key, stats.monthly && stats.monthly[key]))
+  };
+}
+
+module.exports = {
+  MOODS,
+  normalizeMood,
+  dayKey,
+  shiftDay,
+  weekKey,
+  monthKey,
+  recordCheckin,
+  summarizeCheckins,
+  rebuildStats,
+  getMoodSummary
+};
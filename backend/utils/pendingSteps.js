@@ -0,0 +1,43 @@
+/**
+ * Follow-up steps of a write that must each happen once
+ *
+ * A route that inserts a row and then does more writes (XP, counters,
+ * stats) stores the follow-ups in the row's `pending` array. Each step is
+ * claimed with an atomic $pull before it runs, so only one request does
+ * it, and handed back with $addToSet if it fails, so a repeat of the
+ * request can finish it. Used by wellness check-ins and event joins.
+ */
+
+// Take a pending step; only one request gets it
+async function claimStep(Model, filter, step) {
+  const result = await Model.updateOne({ ...filter, pending: step }, { $pull: { pending: step } });
+  return result.modifiedCount === 1;
+}
+
+// Hand a failed step back so a repeat request retries it
+function releaseStep(Model, filter, step) {
+  return Model.updateOne(filter, { $addToSet: { pending: step } })
+    .catch(error => console.error('Pending step release error:', error));
+}
+
+/**
+ * Run a claimed step, releasing it if it fails
+ * @param {Model} Model - Mongoose model of the row
+ * @param {Object} filter - Selects the row
+ * @param {String} step - Step name
+ * @param {Function} run - async () => value
+ * @returns {Promise<Object>} { claimed, value }
+ */
+async function runStep(Model, filter, step, run) {
+  if (!(await claimStep(Model, filter, step))) return { claimed: false };
+  try {
+    return { claimed: true, value: await run() };
+  } catch (error) {
+    await releaseStep(Model, filter, step);
+    throw error;
+  }
+}
+
+module.exports = {
+  runStep
+};
@@ -0,0 +1,165 @@
+/**
+ * Indexable skip list: a sorted set that also answers positional queries.
+ *
+ * Every forward link stores its span (how many items it skips), so besides
+ * O(log n) insert/remove it can count the items ranked above a key and jump
+ * to the item at a given position in O(log n) - no scan of the items in
+ * front. Same layout as the sorted sets in Redis.
+ */
+const MAX_LEVEL = 32;
+const LEVEL_PROBABILITY = 0.25;
+
+class SkipNode {
+  constructor(item, level) {
+    this.item = item;
+    this.next = new Array(level).fill(null);
+    this.span = new Array(level).fill(0);
+  }
+}
+
+class RankedSkipList {
+  /**
+   * @param {Function} compare - compare(a, b) < 0 when a sorts before b;
+   *   0 only for the same item
+   */
+  constructor(compare) {
+    this.compare = compare;
+    this.head = new SkipNode(null, MAX_LEVEL);
+    this.level = 1;
+    this.length = 0;
+  }
+
+  get size() {
+    return this.length;
+  }
+
+  randomLevel() {
+    let level = 1;
+    while (level < MAX_LEVEL && Math.random() < LEVEL_PROBABILITY) level++;
+    return level;
+  }
+
+  /**
+   * Insert an item (must not already be in the list)
+   */
+  insert(item) {
+    const update = new Array(MAX_LEVEL);
+    const rank = new Array(MAX_LEVEL);
+    let node = this.head;
+    for (let i = this.level - 1; i >= 0; i--) {
+      rank[i] = i === this.level - 1 ? 0 : rank[i + 1];
+      while (node.next[i] && this.compare(node.next[i].item, item) < 0) {
+        rank[i] += node.span[i];
+        node = node.next[i];
+      }
+      update[i] = node;
+    }
+
+    const level = this.randomLevel();
+    if (level > this.level) {
+      for (let i = this.level; i < level; i++) {
+        rank[i] = 0;
+        update[i] = this.head;
+        this.head.span[i] = this.length;
+      }
+      this.level = level;
+    }
+
+    const inserted = new SkipNode(item, level);
+    for (let i = 0; i < level; i++) {
+      inserted.next[i] = update[i].next[i];
+      update[i].next[i] = inserted;
+      inserted.span[i] = update[i].span[i] - (rank[0] - rank[i]);
+      update[i].span[i] = rank[0] - rank[i] + 1;
+    }
+    for (let i = level; i < this.level; i++) {
+      update[i].span[i]++;
+    }
+    this.length++;
+  }
+
+  /**
+   * Remove the item comparing equal to `item`
+   * @returns {Boolean} true if it was found
+   */
+  remove(item) {
+    const update = new Array(MAX_LEVEL);
+    let node = this.head;
+    for (let i = this.level - 1; i >= 0; i--) {
+      while (node.next[i] && this.compare(node.next[i].item, item) < 0) {
+        node = node.next[i];
+      }
+      update[i] = node;
+    }
+
+    const target = node.next[0];
+    if (!target || this.compare(target.item, item) !== 0) return false;
+
+    for (let i = 0; i < this.level; i++) {
+      if (update[i].next[i] === target) {
+        update[i].span[i] += target.span[i] - 1;
+        update[i].next[i] = target.next[i];
+      } else {
+        update[i].span[i]--;
+      }
+    }
+    while (this.level > 1 && !this.head.next[this.level - 1]) {
+      this.level--;
+    }
+    this.length--;
+    return true;
+  }
+
+  /**
+   * Number of items that sort strictly before `item`
+   */
+  countBefore(item) {
+    let count = 0;
+    let node = this.head;
+    for (let i = this.level - 1; i >= 0; i--) {
+      while (node.next[i] && this.compare(node.next[i].item, item) < 0) {
+        count += node.span[i];
+        node = node.next[i];
+      }
+    }
+    return count;
+  }
+
+  nodeAt(index) {
+    if (index < 0 || index >= this.length) return null;
+    const target = index + 1;
+    let traversed = 0;
+    let node = this.head;
+    for (let i = this.level - 1; i >= 0; i--) {
+      while (node.next[i] && traversed + node.span[i] <= target) {
+        traversed += node.span[i];
+        node = node.next[i];
+      }
+      if (traversed === target) return node;
+    }
+    return null;
+  }
+
+  /**
+   * Item at a 0-based position (undefined when out of range)
+   */
+  at(index) {
+    const node = this.nodeAt(index);
+    return node ? node.item : undefined;
+  }
+
+  /**
+   * Up to `limit` items starting at position `offset`
+   */
+  slice(offset, limit) {
+    const items = [];
+    let node = this.nodeAt(offset);
+    while (node && items.length < limit) {
+      items.push(node.item);
+      node = node.next[0];
+    }
+    return items;
+  }
+}
+
+module.exports = RankedSkipList;
@@ -0,0 +1,89 @@
+/**
+ * express-rate-limit store that keeps its counters in shared state
+ *
+ * One counter key per client per window: INCR, and set the expiry on the
+ * first hit. Works with Redis or the cluster primary's store (see
+ * utils/redisConnection.js getSharedStateClient), so every worker and
+ * node counts the same attempts.
+ *
+ * While the shared client is unreachable, counting falls back to a
+ * per-process MemoryStore (limits then apply per worker) instead of
+ * failing the request; the shared client is retried after
+ * RATE_LIMIT_SHARED_RETRY_MS.
+ */
+const { MemoryStore } = require('express-rate-limit');
+const { getSharedStateClient } = require('./redisConnection');
+
+const SHARED_RETRY_MS = parseInt(process.env.RATE_LIMIT_SHARED_RETRY_MS) || 30 * 1000;
+
+class SharedRateLimitStore {
+  /**
+   * @param {Object} options
+   * @param {String} options.prefix - Key namespace, one per limiter
+   * @param {Function} options.getClient - Resolves the shared client
+   */
+  constructor({ prefix, getClient = getSharedStateClient }) {
+    this.prefix = prefix;
+    this.getClient = getClient;
+    // Counters live outside this process
+    this.localKeys = false;
+    this.windowMs = 60 * 1000;
+    this.fallback = new MemoryStore();
+    this.retryAt = 0; // while in the future, count in this.fallback
+  }
+
+  init(options) {
+    this.windowMs = options.windowMs;
+    this.fallback.init(options);
+  }
+
+  /**
+   * Run an operation on the shared client, or on the memory fallback
+   * while the client is down
+   * @param {Function} shared - async (client) => result
+   * @param {Function} local - async (fallback store) => result
+   */
+  async withClient(shared, local) {
+    if (Date.now() < this.retryAt) return local(this.fallback);
+    try {
+      const result = await shared(await this.getClient());
+      if (this.retryAt !== 0) {
+        this.retryAt = 0;
+        console.warn(`Rate limit store ${this.prefix} shared again`);
+      }
+      return result;
+    } catch (error) {
+      if (this.retryAt === 0) {
+        console.warn(`Rate limit store ${this.prefix} unavailable, counting per process:`, error.message);
+      }
+      this.retryAt = Date.now() + SHARED_RETRY_MS;
+      return local(this.fallback);
+    }
+  }
+
+  async increment(key) {
+    return this.withClient(client => this.incrementShared(client, key), fallback => fallback.increment(key));
+  }
+
+  async incrementShared(client, key) {
+    const redisKey = this.prefix + key;
+    const totalHits = await client.incr(redisKey);
+    let ttl = totalHits === 1 ? -1 : await client.pTTL(redisKey);
+    if (ttl < 0) {
+      // First hit of the window (or a counter left without expiry)
+      await client.pExpire(redisKey, this.windowMs);
+      ttl = this.windowMs;
+    }
+    return { totalHits, resetTime: new Date(Date.now() + ttl) };
+  }
+
+  async decrement(key) {
+    await this.withClient(client => client.decr(this.prefix + key), fallback => fallback.decrement(key));
+  }
+
+  async resetKey(key) {
+    await this.withClient(client => client.del(this.prefix + key), fallback => fallback.resetKey(key));
+  }
+}
+
+module.exports = SharedRateLimitStore;
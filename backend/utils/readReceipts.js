@@ -0,0 +1,119 @@
+/**
+ * Batched read receipts
+ *
+ * mark_read requests are collected for READ_RECEIPT_FLUSH_MS and repeats
+ * for the same (conversation, reader) are merged. A flush writes the whole
+ * batch with one Message.bulkWrite (mark delivered) and one
+ * Conversation.bulkWrite (reset the reader's unread counter), then emits
+ * one read_receipt per (conversation, reader).
+ */
+const Conversation = require('../models/Conversation');
+const Message = require('../models/Message');
+const messagePipeline = require('./messagePipeline');
+const { getIO } = require('../socket');
+
+const FLUSH_MS = parseInt(process.env.READ_RECEIPT_FLUSH_MS) || 250;
+
+const receiptState = {
+  pending: new Map(), // `${conversationId}|${userId}` -> { conversationId, userId, waiters }
+  timer: null,
+  flushing: Promise.resolve(),
+  stats: { received: 0, merged: 0, emitted: 0, batches: 0, failed: 0 }
+};
+
+/**
+ * Queue a read receipt; the caller must have checked membership
+ * @param {String} conversationId - Conversation ID
+ * @param {String} userId - Reader
+ * @returns {Promise<void>} Resolves once the batch holding it is written
+ */
+function queueReadReceipt(conversationId, userId) {
+  receiptState.stats.received++;
+  const key = `${conversationId}|${userId}`;
+  let entry = receiptState.pending.get(key);
+  if (entry) {
+    receiptState.stats.merged++;
+  } else {
+    entry = { conversationId: conversationId.toString(), userId: userId.toString(), waiters: [] };
+    receiptState.pending.set(key, entry);
+  }
+  const written = new Promise((resolve, reject) => entry.waiters.push({ resolve, reject }));
+  if (!receiptState.timer) {
+    receiptState.timer = setTimeout(flushReadReceipts, FLUSH_MS);
+    receiptState.timer.unref();
+  }
+  return written;
+}
+
+async function writeBatch(batch) {
+  // Queued messages must be stored before they can be marked read
+  await messagePipeline.flushMessages();
+  await Message.bulkWrite(
+    batch.map(({ conversationId, userId }) => ({
+      updateMany: {
+        filter: { conversationId, sender: { $ne: userId }, delivered: false },
+        update: { $set: { delivered: true } }
+      }
+    })),
+    { ordered: false }
+  );
+  // Reset without touching updatedAt, so reading doesn't reorder the inbox
+  await Conversation.bulkWrite(
+    batch.map(({ conversationId, userId }) => ({
+      updateOne: {
+        filter: { _id: conversationId },
+        update: { $set: { [`unread.${userId}`]: 0 } },
+        timestamps: false
+      }
+    })),
+    { ordered: false }
+  );
+}
+
+/**
+ * Write and announce everything queued so far
+ * @returns {Promise<void>}
+ */
+function flushReadReceipts() {
+  if (receiptState.timer) {
+    clearTimeout(receiptState.timer);
+    receiptState.timer = null;
+  }
+  // Batches are written one after another
+  receiptState.flushing = receiptState.flushing.then(async () => {
+    const batch = Array.from(receiptState.pending.values());
+    receiptState.pending.clear();
+    if (batch.length === 0) return;
+    receiptState.stats.batches++;
+    try {
+      await writeBatch(batch);
+    } catch (error) {
+      receiptState.stats.failed += batch.length;
+      console.error('Read receipt batch error:', error);
+      batch.forEach(entry => entry.waiters.forEach(waiter => waiter.reject(error)));
+      return;
+    }
+    const io = getIO();
+    batch.forEach(({ conversationId, userId, waiters }) => {
+      // Lets the other user's outgoing pending count drop
+      if (io) io.to(conversationId).emit('read_receipt', { conversationId, readerId: userId });
+      receiptState.stats.emitted++;
+      waiters.forEach(waiter => waiter.resolve());
+    });
+  });
+  return receiptState.flushing;
+}
+
+function getReadReceiptStats() {
+  return {
+    flushMs: FLUSH_MS,
+    pending: receiptState.pending.size,
+    ...receiptState.stats
+  };
+}
+
+module.exports = {
+  queueReadReceipt,
+  flushReadReceipts,
+  getReadReceiptStats
+};
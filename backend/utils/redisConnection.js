@@ -0,0 +1,82 @@
+const cluster = require('cluster');
+const { createRedisStandIn } = require('./redisStandIn');
+const { createClusterClient } = require('./clusterStore');
+
+const connectionState = {
+  client: null,  // promise of the shared connected client
+  shared: null   // promise of the shared-state client (Redis or cluster primary)
+};
+
+// Set by cluster.js on the workers it forks
+function isClusterWorker() {
+  return cluster.isWorker && process.env.SMARTBUDDY_CLUSTER === '1';
+}
+
+/**
+ * Shared Redis client for REDIS_URL, connected on first use
+ *
+ * The "redis" package (v4) is not a declared dependency: deployments that
+ * set REDIS_URL install it themselves (npm install redis@4); it is only
+ * loaded here. REDIS_URL=standin uses the in-process stand-in instead
+ * (single process only).
+ *
+ * @returns {Promise<Object>} Connected node-redis v4 client
+ */
+function getRedisClient() {
+  if (!connectionState.client) {
+    connectionState.client = (async () => {
+      const url = process.env.REDIS_URL;
+      if (!url) throw new Error('REDIS_URL is not set');
+      if (url === 'standin') {
+        return createRedisStandIn().createClient().connect();
+      }
+
+      let redis;
+      try {
+        redis = require('redis');
+      } catch (error) {
+        throw new Error('REDIS_URL is set but the "redis" package is not installed (npm install redis@4)');
+      }
+      const client = redis.createClient({ url });
+      client.on('error', (error) => console.error('Redis client error:', error.message));
+      await client.connect();
+      return client;
+    })();
+    // Let a later call retry after a failed connect
+    connectionState.client.catch(() => { connectionState.client = null; });
+  }
+  return connectionState.client;
+}
+
+/**
+ * Is state that must agree across processes (presence, caches, rate-limit
+ * counters) kept outside this process?
+ * @returns {Boolean} true with REDIS_URL, or in a cluster worker
+ */
+function isSharedStateEnabled() {
+  return !!process.env.REDIS_URL || isClusterWorker();
+}
+
+/**
+ * Client for shared state: Redis when REDIS_URL is set, otherwise the
+ * cluster primary's store (utils/clusterStore.js) in a cluster worker
+ * @returns {Promise<Object|null>} Connected client, or null when this
+ *   process keeps its state to itself
+ */
+function getSharedStateClient() {
+  if (process.env.REDIS_URL) return getRedisClient();
+  if (!isClusterWorker()) return Promise.resolve(null);
+  if (!connectionState.shared) {
+    connectionState.shared = createClusterClient().connect();
+    // Let a later call retry after a failed connect
+    connectionState.shared.catch(() => { connectionState.shared = null; });
+  }
+  return connectionState.shared;
+}
+
+module.exports = {
+  getRedisClient,
+  isClusterWorker,
+  isSharedStateEnabled,
+  getSharedStateClient
+};
@@ -0,0 +1,128 @@
+/**
+ * In-process stand-in for the subset of Redis the app uses
+ *
+ * createRedisStandIn() returns a "server"; every client from
+ * server.createClient() (or client.duplicate()) shares its keys and
+ * pub/sub channels, so several simulated nodes can run in one process.
+ * Clients follow the node-redis v4 API: connect/quit, get/set (PX)/del,
+ * incr/decr/pExpire/pTTL, sAdd/sRem/sMembers/sCard, publish/subscribe/unsubscribe.
+ * Pub/sub delivery is asynchronous, as it is over a real connection.
+ *
+ * Meant for tests and local runs (REDIS_URL=standin), not production.
+ */
+function createRedisStandIn() {
+  const keys = new Map();      // key -> { value, expiresAt }
+  const channels = new Map();  // channel -> Set<listener>
+
+  function read(key) {
+    const entry = keys.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt && entry.expiresAt <= Date.now()) {
+      keys.delete(key);
+      return undefined;
+    }
+    return entry;
+  }
+
+  function readSet(key) {
+    const entry = read(key);
+    return entry ? entry.value : new Set();
+  }
+
+  function createClient() {
+    const subscriptions = new Map(); // channel -> listener
+    const client = {
+      isOpen: false,
+      async connect() {
+        client.isOpen = true;
+        return client;
+      },
+      async quit() {
+        for (const channel of subscriptions.keys()) await client.unsubscribe(channel);
+        client.isOpen = false;
+      },
+      duplicate() {
+        return createClient();
+      },
+
+      async get(key) {
+        const entry = read(key);
+        return entry ? entry.value : null;
+      },
+      async set(key, value, options = {}) {
+        keys.set(key, { value: String(value), expiresAt: options.PX ? Date.now() + options.PX : 0 });
+        return 'OK';
+      },
+      async del(keyOrKeys) {
+        const list = Array.isArray(keyOrKeys) ? keyOrKeys : [keyOrKeys];
+        return list.filter(key => read(key) && keys.delete(key)).length;
+      },
+      async incr(key) {
+        const entry = read(key);
+        const value = (entry ? parseInt(entry.value) : 0) + 1;
+        keys.set(key, { value: String(value), expiresAt: entry ? entry.expiresAt : 0 });
+        return value;
+      },
+      async decr(key) {
+        const entry = read(key);
+        const value = (entry ? parseInt(entry.value) : 0) - 1;
+        keys.set(key, { value: String(value), expiresAt: entry ? entry.expiresAt : 0 });
+        return value;
+      },
+      async pExpire(key, ms) {
+        const entry = read(key);
+        if (!entry) return false;
+        entry.expiresAt = Date.now() + ms;
+        return true;
+      },
+      async pTTL(key) {
+        const entry = read(key);
+        if (!entry) return -2;
+        return entry.expiresAt ? entry.expiresAt - Date.now() : -1;
+      },
+
+      async sAdd(key, members) {
+        const set = readSet(key);
+        const before = set.size;
+        [].concat(members).forEach(member => set.add(String(member)));
+        if (!keys.has(key)) keys.set(key, { value: set, expiresAt: 0 });
+        return set.size - before;
+      },
+      async sRem(key, members) {
+        const set = readSet(key);
+        const before = set.size;
+        [].concat(members).forEach(member => set.delete(String(member)));
+        if (set.size === 0) keys.delete(key);
+        return before - set.size;
+      },
+      async sMembers(key) {
+        return Array.from(readSet(key));
+      },
+      async sCard(key) {
+        return readSet(key).size;
+      },
+
+      async publish(channel, message) {
+        const listeners = Array.from(channels.get(channel) || []);
+        setImmediate(() => listeners.forEach(listener => listener(String(message), channel)));
+        return listeners.length;
+      },
+      async subscribe(channel, listener) {
+        if (!channels.has(channel)) channels.set(channel, new Set());
+        channels.get(channel).add(listener);
+        subscriptions.set(channel, listener);
+      },
+      async unsubscribe(channel) {
+        const listener = subscriptions.get(channel);
+        if (!listener) return;
+        channels.get(channel)?.delete(listener);
+        subscriptions.delete(channel);
+      }
+    };
+    return client;
+  }
+
+  return { createClient };
+}
+
+module.exports = { createRedisStandIn };
@@ -0,0 +1,228 @@
+/**
+ * Pieces that let socket.io run on more than one process
+ *
+ * - Bus: publish/subscribe of string messages between processes.
+ *   createLocalBus() stays in this process; createRedisBus(client) goes
+ *   through Redis pub/sub (node-redis v4 client or utils/redisStandIn.js).
+ * - Presence: which users have at least one open socket, on any process.
+ *   createLocalPresence() keeps a Map; createRedisPresence(client) keeps a
+ *   set per user in Redis, so several tabs and nodes are all counted.
+ * - createBusAdapter(bus): a socket.io adapter that relays every broadcast
+ *   (io.to(room).emit) to the other processes over the bus, so rooms -
+ *   including the per-user rooms - work cluster-wide.
+ *
+ * Bus messages are JSON, so binary payloads are not supported across nodes.
+ */
+const os = require('os');
+const crypto = require('crypto');
+const { EventEmitter } = require('events');
+const { Adapter } = require('socket.io-adapter');
+
+// Identifies this process in presence entries
+const NODE_ID = `${os.hostname()}:${process.pid}`;
+
+function createLocalBus() {
+  const emitter = new EventEmitter();
+  emitter.setMaxListeners(0);
+  return {
+    kind: 'local',
+    async publish(channel, message) {
+      emitter.emit(channel, message);
+    },
+    async subscribe(channel, handler) {
+      emitter.on(channel, handler);
+    },
+    async close() {
+      emitter.removeAllListeners();
+    }
+  };
+}
+
+/**
+ * @param {Object} client - Connected Redis client (publishing connection)
+ */
+function createRedisBus(client) {
+  // A subscribed Redis connection can't run other commands
+  const subscriber = client.duplicate();
+  const connecting = subscriber.connect();
+  return {
+    kind: 'redis',
+    async publish(channel, message) {
+      await client.publish(channel, message);
+    },
+    async subscribe(channel, handler) {
+      await connecting;
+      await subscriber.subscribe(channel, handler);
+    },
+    async close() {
+      await connecting;
+      await subscriber.quit();
+    }
+  };
+}
+
+function createLocalPresence() {
+  const sockets = new Map(); // userId -> Set<socketId>
+  return {
+    kind: 'local',
+    async add(userId, socketId) {
+      if (!sockets.has(userId)) sockets.set(userId, new Set());
+      sockets.get(userId).add(socketId);
+    },
+    async remove(userId, socketId) {
+      const set = sockets.get(userId);
+      if (!set) return;
+      set.delete(socketId);
+      if (set.size === 0) sockets.delete(userId);
+    },
+    async socketCount(userId) {
+      return sockets.has(userId) ? sockets.get(userId).size : 0;
+    },
+    async isOnline(userId) {
+      return sockets.has(userId);
+    },
+    async clearNode() {
+      sockets.clear();
+    }
+  };
+}
+
+// Presence heartbeat: a node that misses NODE_TTL_MS of heartbeats is
+// taken for dead and its entries are cleared by the others
+const HEARTBEAT_MS = parseInt(process.env.PRESENCE_HEARTBEAT_MS) || 15 * 1000;
+const NODE_TTL_MS = HEARTBEAT_MS * 3;
+
+/**
+ * Presence kept in Redis (or the cluster store). Each node refreshes an
+ * "alive" key with a TTL; on every heartbeat, nodes whose key has expired
+ * (crashed, or restarted under a new pid) have their entries removed, so
+ * their users don't stay online forever.
+ * @param {Object} client - Connected Redis client
+ * @param {Object} options
+ * @param {String} options.prefix - Key namespace
+ * @param {String} options.nodeId - This process (defaults to NODE_ID)
+ */
+function createRedisPresence(client, { prefix = 'smartbuddy:presence:', nodeId = NODE_ID } = {}) {
+  const userKey = userId => `${prefix}user:${userId}`;
+  // What each node registered, so its entries can be cleared later
+  const nodeKey = id => `${prefix}node:${id}`;
+  const aliveKey = id => `${prefix}alive:${id}`;
+  const nodesKey = `${prefix}nodes`;
+  let heartbeatTimer = null;
+
+  async function clearEntries(id) {
+    const entries = await client.sMembers(nodeKey(id));
+    await Promise.all(entries.map(entry => {
+      const [userId, socketId] = entry.split('|');
+      return client.sRem(userKey(userId), `${id}|${socketId}`);
+    }));
+    await client.del(nodeKey(id));
+  }
+
+  async function heartbeat() {
+    await client.set(aliveKey(nodeId), '1', { PX: NODE_TTL_MS });
+    await client.sAdd(nodesKey, nodeId);
+    const nodes = await client.sMembers(nodesKey);
+    for (const id of nodes) {
+      if (id === nodeId || (await client.get(aliveKey(id))) !== null) continue;
+      await clearEntries(id);
+      await client.sRem(nodesKey, id);
+    }
+  }
+
+  return {
+    kind: 'redis',
+    async add(userId, socketId) {
+      await Promise.all([
+        client.sAdd(userKey(userId), `${nodeId}|${socketId}`),
+        client.sAdd(nodeKey(nodeId), `${userId}|${socketId}`)
+      ]);
+    },
+    async remove(userId, socketId) {
+      await Promise.all([
+        client.sRem(userKey(userId), `${nodeId}|${socketId}`),
+        client.sRem(nodeKey(nodeId), `${userId}|${socketId}`)
+      ]);
+    },
+    async socketCount(userId) {
+      return client.sCard(userKey(userId));
+    },
+    async isOnline(userId) {
+      return (await client.sCard(userKey(userId))) > 0;
+    },
+    /**
+     * Announce this node and sweep dead ones now and every HEARTBEAT_MS
+     */
+    async startHeartbeat() {
+      await heartbeat();
+      heartbeatTimer = setInterval(() => {
+        heartbeat().catch(error => console.error('Presence heartbeat error:', error.message));
+      }, HEARTBEAT_MS);
+      heartbeatTimer.unref();
+    },
+    async clearNode() {
+      if (heartbeatTimer) {
+        clearInterval(heartbeatTimer);
+        heartbeatTimer = null;
+      }
+      await clearEntries(nodeId);
+      await Promise.all([client.del(aliveKey(nodeId)), client.sRem(nodesKey, nodeId)]);
+    }
+  };
+}
+
+/**
+ * socket.io adapter class that relays broadcasts over a bus
+ * @param {Object} bus - createRedisBus() (or any bus shared between processes)
+ * @returns {Function} Adapter class for io.adapter()
+ */
+function createBusAdapter(bus) {
+  return class BusAdapter extends Adapter {
+    constructor(nsp) {
+      super(nsp);
+      // Per adapter, so our own broadcasts can be told apart on the bus
+      this.uid = crypto.randomUUID();
+      this.channel = `smartbuddy:socket.io:${nsp.name}`;
+      bus.subscribe(this.channel, raw => this.onRemoteBroadcast(raw))
+        .catch(error => console.error('[Socket][adapter] Subscribe error:', error));
+    }
+
+    onRemoteBroadcast(raw) {
+      try {
+        const { from, packet, rooms, except, flags } = JSON.parse(raw);
+        if (from === this.uid) return;
+        super.broadcast(packet, {
+          rooms: new Set(rooms),
+          except: new Set(except),
+          flags: { ...flags, local: true }
+        });
+      } catch (error) {
+        console.error('[Socket][adapter] Bad broadcast:', error);
+      }
+    }
+
+    broadcast(packet, opts) {
+      if (!opts.flags || !opts.flags.local) {
+        const message = JSON.stringify({
+          from: this.uid,
+          packet,
+          rooms: Array.from(opts.rooms || []),
+          except: Array.from(opts.except || []),
+          flags: opts.flags || {}
+        });
+        bus.publish(this.channel, message)
+          .catch(error => console.error('[Socket][adapter] Publish error:', error));
+      }
+      super.broadcast(packet, opts);
+    }
+  };
+}
+
+module.exports = {
+  NODE_ID,
+  createLocalBus,
+  createRedisBus,
+  createLocalPresence,
+  createRedisPresence,
+  createBusAdapter
+};
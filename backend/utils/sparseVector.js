@@ -0,0 +1,164 @@
+/**
+ * Sparse binary vectors for match similarity
+ *
+ * Each distinct skill/interest/availability string is interned to a small
+ * integer id. A profile field becomes a sorted Int32Array of ids, so
+ * similarity is a linear merge of two short arrays instead of a pass over
+ * the whole vocabulary.
+ */
+
+/**
+ * Maps strings to dense integer ids (ids are never reused)
+ */
+class Interner {
+  constructor() {
+    this.ids = new Map();
+    this.tokens = [];
+  }
+
+  get size() {
+    return this.tokens.length;
+  }
+
+  /**
+   * Get the id for a token, assigning a new one if needed
+   * @param {String} token - Token to intern
+   * @returns {Number} Token id
+   */
+  intern(token) {
+    let id = this.ids.get(token);
+    if (id === undefined) {
+      id = this.tokens.length;
+      this.ids.set(token, id);
+      this.tokens.push(token);
+    }
+    return id;
+  }
+
+  /**
+   * Get the id for a token without assigning one
+   * @returns {Number} Token id, or -1 if unknown
+   */
+  lookup(token) {
+    const id = this.ids.get(token);
+    return id === undefined ? -1 : id;
+  }
+
+  token(id) {
+    return this.tokens[id];
+  }
+}
+
+/**
+ * Convert a list of items to a sparse vector
+ * @param {Array<String>} items - Skills, interests or availability slots
+ * @param {Interner} interner - Interner for this field
+ * @param {Boolean} keepDuplicates - Keep repeated ids (query side overlap counts)
+ * @returns {Int32Array} Sorted ids
+ */
+function toSparseVector(items, interner, keepDuplicates = false) {
+  const ids = new Int32Array(items.length);
+  for (let i = 0; i < items.length; i++) {
+    ids[i] = interner.intern(items[i]);
+  }
+  ids.sort();
+  if (keepDuplicates || ids.length < 2) return ids;
+
+  let unique = 1;
+  for (let i = 1; i < ids.length; i++) {
+    if (ids[i] !== ids[unique - 1]) ids[unique++] = ids[i];
+  }
+  return unique === ids.length ? ids : ids.slice(0, unique);
+}
+
+/**
+ * Number of distinct ids in a sorted vector (its squared norm)
+ * @param {Int32Array} vec - Sorted ids, possibly with duplicates
+ * @returns {Number} Distinct count
+ */
+function distinctCount(vec) {
+  let count = 0;
+  for (let i = 0; i < vec.length; i++) {
+    if (i === 0 || vec[i] !== vec[i - 1]) count++;
+  }
+  return count;
+}
+
+/**
+ * Vector magnitude of a binary sparse vector
+ * @param {Int32Array} vec - Sorted ids
+ * @returns {Number} Magnitude
+ */
+function norm(vec) {
+  return Math.sqrt(distinctCount(vec));
+}
+
+/**
+ * Merge-intersect a query vector with a candidate vector in one pass
+ * @param {Int32Array} query - Sorted ids, duplicates allowed
+ * @param {Int32Array} candidate - Sorted unique ids
+ * @returns {Object} { distinct, total } - distinct shared ids, and shared
+ *   query entries counting duplicates (what Array#filter would return)
+ */
+function intersect(query, candidate) {
+  let distinct = 0;
+  let total = 0;
+  let i = 0;
+  let j = 0;
+  while (i < query.length && j < candidate.length) {
+    const a = query[i];
+    const b = candidate[j];
+    if (a < b) {
+      i++;
+    } else if (a > b) {
+      j++;
+    } else {
+      total++;
+      if (i === 0 || query[i - 1] !== a) distinct++;
+      i++;
+    }
+  }
+  return { distinct, total };
+}
+
+/**
+ * Cosine similarity from a shared count and cached norms
+ * @param {Number} shared - Distinct shared ids (dot product)
+ * @param {Number} normA - Magnitude of the first vector
+ * @param {Number} normB - Magnitude of the second vector
+ * @returns {Number} Cosine similarity (0-1)
+ */
+function cosine(shared, normA, normB) {
+  if (normA === 0 || normB === 0) {
+    return 0; // No similarity if either vector is empty
+  }
+  return shared / (normA * normB);
+}
+
+/**
+ * Binary search for an id in a sorted vector
+ * @param {Int32Array} vec - Sorted ids
+ * @param {Number} id - Id to find
+ * @returns {Boolean} true if present
+ */
+function has(vec, id) {
+  let lo = 0;
+  let hi = vec.length - 1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1;
+    if (vec[mid] === id) return true;
+    if (vec[mid] < id) lo = mid + 1;
+    else hi = mid - 1;
+  }
+  return false;
+}
+
+module.exports = {
+  Interner,
+  toSparseVector,
+  distinctCount,
+  norm,
+  intersect,
+  cosine,
+  has
+};
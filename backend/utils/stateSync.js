@@ -0,0 +1,105 @@
+/**
+ * Keeps per-process indexes and caches in step across processes
+ *
+ * The match index and match cache, the leaderboard boards, the event
+ * ranking cache, the user-name cache and the conversation membership cache
+ * live in each process. When state
+ * is shared (cluster workers, or REDIS_URL across nodes), every change a
+ * process applies to its own copy is also published here, and the other
+ * processes apply it to theirs - otherwise, with sticky routing, users
+ * would keep reading their own worker's stale copy.
+ *
+ * Modules register a handler per message type with onSync() and call
+ * publish() after each local change. Messages are batched per tick and
+ * JSON-encoded, so payloads must be plain data (ids as strings).
+ */
+const { NODE_ID, createRedisBus } = require('./socketScaling');
+
+const CHANNEL = 'smartbuddy:state-sync';
+
+const syncState = {
+  bus: null,
+  handlers: new Map(), // type -> handler(payload)
+  queue: [],
+  scheduled: false,
+  stats: { published: 0, received: 0, errors: 0 }
+};
+
+/**
+ * Apply changes of a type published by other processes
+ * @param {String} type - Message type, e.g. 'match:upsert'
+ * @param {Function} handler - Called with the payload; must not publish
+ */
+function onSync(type, handler) {
+  syncState.handlers.set(type, handler);
+}
+
+function flush() {
+  syncState.scheduled = false;
+  const messages = syncState.queue.splice(0);
+  if (messages.length === 0 || !syncState.bus) return;
+  syncState.stats.published += messages.length;
+  syncState.bus.publish(CHANNEL, JSON.stringify({ from: NODE_ID, messages }))
+    .catch(error => {
+      syncState.stats.errors++;
+      console.error('State sync publish error:', error.message);
+    });
+}
+
+/**
+ * Send a local change to the other processes (no-op until startSync)
+ * @param {String} type - Message type
+ * @param {Object} payload - Plain, JSON-serializable data
+ */
+function publish(type, payload) {
+  if (!syncState.bus) return;
+  syncState.queue.push({ type, payload });
+  if (!syncState.scheduled) {
+    syncState.scheduled = true;
+    setImmediate(flush);
+  }
+}
+
+function receive(raw) {
+  let batch;
+  try {
+    batch = JSON.parse(raw);
+  } catch (error) {
+    syncState.stats.errors++;
+    return;
+  }
+  if (batch.from === NODE_ID) return;
+  batch.messages.forEach(({ type, payload }) => {
+    const handler = syncState.handlers.get(type);
+    if (!handler) return;
+    syncState.stats.received++;
+    try {
+      handler(payload);
+    } catch (error) {
+      syncState.stats.errors++;
+      console.error(`State sync ${type} error:`, error.message);
+    }
+  });
+}
+
+/**
+ * Start publishing and receiving changes through a shared client
+ * @param {Object} client - Connected Redis client (or cluster store client)
+ */
+async function startSync(client) {
+  if (syncState.bus) return;
+  const bus = createRedisBus(client);
+  await bus.subscribe(CHANNEL, receive);
+  syncState.bus = bus;
+}
+
+function getSyncStats() {
+  return { enabled: !!syncState.bus, node: NODE_ID, ...syncState.stats };
+}
+
+module.exports = {
+  onSync,
+  publish,
+  startSync,
+  getSyncStats
+};
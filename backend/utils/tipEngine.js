@@ -0,0 +1,199 @@
+/**
+ * Local tip engine: personalized tips from templates, no network
+ *
+ * At load, every template in utils/tipTemplates.js is compiled into
+ * static text and placeholder slots, and an index is built for every
+ * (mood, XP tier, branch family, activity) combination, holding the
+ * matching templates grouped by specificity. A request normalizes its
+ * context to one index key, picks templates from the most specific
+ * groups first and fills the slots - a few microseconds, no I/O.
+ *
+ * Picks are seeded, so a seed like `${userId}-${date}` gives a user the
+ * same tips all day; without a seed they are random.
+ */
+const templates = require('./tipTemplates');
+
+const MOODS = ['happy', 'neutral', 'stressed'];
+const TIERS = ['new', 'rising', 'steady', 'veteran'];
+const BRANCHES = ['cs', 'ec', 'other'];
+const ACTIVITIES = ['studying', 'events', 'connecting', 'wellness'];
+
+const BRANCH_FAMILIES = { CSE: 'cs', CSH: 'cs', CSD: 'cs', CSA: 'cs', ECE: 'ec', ECI: 'ec' };
+const ACTIVITY_PATTERNS = [
+  { pattern: /event/i, activity: 'events' },
+  { pattern: /connect|buddy|buddies|conversation|chat/i, activity: 'connecting' },
+  { pattern: /wellness|check-?in|mood/i, activity: 'wellness' }
+];
+// Words shown for {activity}
+const ACTIVITY_LABELS = {
+  studying: 'studying',
+  events: 'event participation',
+  connecting: 'networking',
+  wellness: 'wellness check-ins'
+};
+
+const engineState = {
+  // `${mood}|${tier}|${branch}|${activity}` -> { groups: [[parts, ...] per
+  // specificity, most specific first], all: every matching template }
+  index: new Map(),
+  stats: { renders: 0 }
+};
+
+/**
+ * Split a template into alternating static text and slot names
+ * @param {String} text - Template text
+ * @returns {Array<String>} parts; odd indexes are slot names
+ */
+function compile(text) {
+  return text.split(/\{(name|xp|branch|activity)\}/);
+}
+
+function fill(parts, values) {
+  let out = parts[0];
+  for (let i = 1; i < parts.length; i += 2) {
+    out += values[parts[i]] + parts[i + 1];
+  }
+  return out;
+}
+
+function matches(field, value) {
+  if (field === undefined) return true;
+  return Array.isArray(field) ? field.includes(value) : field === value;
+}
+
+function buildIndex() {
+  const compiled = templates.map(template => ({
+    parts: compile(template.text),
+    template,
+    specificity: ['mood', 'tier', 'branch', 'activity'].filter(field => template[field] !== undefined).length
+  }));
+  for (const mood of MOODS) {
+    for (const tier of TIERS) {
+      for (const branch of BRANCHES) {
+        for (const activity of ACTIVITIES) {
+          const groups = [[], [], [], [], []];
+          compiled.forEach(entry => {
+            const { template } = entry;
+            if (matches(template.mood, mood) && matches(template.tier, tier) &&
+                matches(template.branch, branch) && matches(template.activity, activity)) {
+              groups[4 - entry.specificity].push(entry.parts);
+            }
+          });
+          const nonEmpty = groups.filter(group => group.length > 0);
+          engineState.index.set(`${mood}|${tier}|${branch}|${activity}`, { groups: nonEmpty, all: nonEmpty.flat() });
+        }
+      }
+    }
+  }
+}
+
+/**
+ * @param {Number} xp - User's XP
+ * @returns {String} XP tier
+ */
+function xpTier(xp) {
+  const value = Number(xp) || 0;
+  if (value < 100) return 'new';
+  if (value < 500) return 'rising';
+  if (value < 1500) return 'steady';
+  return 'veteran';
+}
+
+/**
+ * Reduce free-form request fields to the index vocabularies
+ * @param {Object} context - { mood, xp, branch, activity }
+ * @returns {Object} { mood, tier, branch, activity }
+ */
+function normalizeContext({ mood, xp, branch, activity } = {}) {
+  const moodKey = String(mood || '').toLowerCase();
+  const match = ACTIVITY_PATTERNS.find(({ pattern }) => pattern.test(activity || ''));
+  return {
+    mood: MOODS.includes(moodKey) ? moodKey : 'neutral',
+    tier: xpTier(xp),
+    branch: BRANCH_FAMILIES[String(branch || '').toUpperCase()] || 'other',
+    activity: match ? match.activity : 'studying'
+  };
+}
+
+// FNV-1a; seeds the pick so it is stable for a given seed string
+function hash(seed) {
+  let value = 0x811c9dc5;
+  for (let i = 0; i < seed.length; i++) {
+    value ^= seed.charCodeAt(i);
+    value = Math.imul(value, 0x01000193);
+  }
+  return value >>> 0;
+}
+
+function lookup(context) {
+  const key = normalizeContext(context);
+  const entry = engineState.index.get(`${key.mood}|${key.tier}|${key.branch}|${key.activity}`);
+  const values = {
+    name: context.name || 'there',
+    xp: Number(context.xp) || 0,
+    branch: context.branch || 'Your',
+    activity: ACTIVITY_LABELS[key.activity]
+  };
+  return { entry, values };
+}
+
+function initialState(seed) {
+  return seed === undefined ? Math.floor(Math.random() * 0xffffffff) : hash(String(seed));
+}
+
+/**
+ * Render tips for a user
+ * @param {Object} context - { name, mood, xp, branch, activity }
+ * @param {Object} options
+ * @param {Number} options.count - Tips wanted
+ * @param {String} options.seed - Same seed, same tips (random if omitted)
+ * @returns {Array<String>} Tips, most specific first
+ */
+function renderTips(context = {}, { count = 3, seed } = {}) {
+  engineState.stats.renders++;
+  const { entry: { groups }, values } = lookup(context);
+  let state = initialState(seed);
+  const tips = [];
+  for (const group of groups) {
+    // Consecutive templates from a seeded start, wrapping around
+    const start = state % group.length;
+    state = Math.imul(state ^ (state >>> 15), 0x2c1b3c6d) >>> 0;
+    for (let i = 0; i < group.length && tips.length < count; i++) {
+      tips.push(fill(group[(start + i) % group.length], values));
+    }
+    if (tips.length >= count) break;
+  }
+  return tips;
+}
+
+/**
+ * One tip, drawn from every template that matches (not only the most
+ * specific), so repeated requests vary
+ * @param {Object} context - { name, mood, xp, branch, activity }
+ * @param {Object} options
+ * @param {String} options.seed - Same seed, same tip (random if omitted)
+ * @returns {String} Tip
+ */
+function renderTip(context = {}, { seed } = {}) {
+  engineState.stats.renders++;
+  const { entry: { all }, values } = lookup(context);
+  return fill(all[initialState(seed) % all.length], values);
+}
+
+function getTipEngineStats() {
+  return {
+    templates: templates.length,
+    indexedContexts: engineState.index.size,
+    ...engineState.stats
+  };
+}
+
+buildIndex();
+
+module.exports = {
+  xpTier,
+  normalizeContext,
+  renderTips,
+  renderTip,
+  getTipEngineStats
+};
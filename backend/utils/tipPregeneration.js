@@ -0,0 +1,211 @@
+/**
+ * Daily pre-generation of tips for recently active users
+ *
+ * Runs shortly after midnight (UTC, the day boundary routes/tips.js uses)
+ * so the morning's POST /api/tips calls are cache hits:
+ *
+ * 1. Users who logged in within the last activeDays are streamed in chunks.
+ * 2. Each user is reduced to prompt parameters (latest check-in mood, XP band,
+ *    recent activity from the XP ledger) and grouped; users with identical
+ *    parameters share one model call for the whole run.
+ * 3. Model calls run with bounded concurrency; each user's tips go into
+ *    the tips cache. Groups whose call fails are left to on-demand
+ *    generation rather than caching fallback tips.
+ *
+ * Only useful when the cache outlives the process that fills it: run in
+ * the server, or use a shared/persistent tips cache with the CLI.
+ */
+const User = require('../models/User');
+const XpLedger = require('../models/XpLedger');
+const MoodStats = require('../models/MoodStats');
+const tipService = require('./tipService');
+const tipsCache = require('./tipsCache');
+
+const DEFAULT_ACTIVE_DAYS = 7;
+const DEFAULT_CHUNK_SIZE = 500;
+const DEFAULT_CONCURRENCY = 4;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// XP ledger reasons, reduced to the few activities prompts distinguish
+const ACTIVITY_PATTERNS = [
+  { pattern: /event/i, activity: 'joining campus events' },
+  { pattern: /connect|conversation/i, activity: 'connecting with study buddies' },
+  { pattern: /wellness|check-in/i, activity: 'wellness check-ins' }
+];
+
+/**
+ * @param {String} reason - XP ledger reason
+ * @returns {String} Activity used in prompts
+ */
+function activityFromReason(reason) {
+  const match = ACTIVITY_PATTERNS.find(({ pattern }) => pattern.test(reason || ''));
+  return match ? match.activity : 'studying';
+}
+
+/**
+ * Run tasks with at most `limit` at a time
+ * @param {Number} limit - Concurrency
+ * @returns {Function} run(task) -> promise of task()
+ */
+function createLimiter(limit) {
+  let active = 0;
+  const queue = [];
+  const next = () => {
+    if (active >= limit || queue.length === 0) return;
+    active++;
+    const { task, resolve, reject } = queue.shift();
+    task().then(resolve, reject).finally(() => {
+      active--;
+      next();
+    });
+  };
+  return task => new Promise((resolve, reject) => {
+    queue.push({ task, resolve, reject });
+    next();
+  });
+}
+
+// Latest ledger reason per user in the chunk
+async function latestReasons(userIds, since) {
+  const rows = await XpLedger.aggregate([
+    { $match: { userId: { $in: userIds }, createdAt: { $gte: since } } },
+    { $sort: { userId: 1, createdAt: -1 } },
+    { $group: { _id: '$userId', reason: { $first: '$reason' } } }
+  ]);
+  return new Map(rows.map(row => [row._id.toString(), row.reason]));
+}
+
+// Latest check-in mood per user in the chunk
+async function latestMoods(userIds) {
+  const rows = await MoodStats.find({ userId: { $in: userIds } }).select('userId lastMood').lean();
+  return new Map(rows.map(row => [row.userId.toString(), row.lastMood]));
+}
+
+function promptParams(user, reason, lastMood) {
+  return {
+    mood: (lastMood || 'neutral').toLowerCase(),
+    xpBand: tipService.xpBand(user.xp),
+    activity: activityFromReason(reason)
+  };
+}
+
+/**
+ * Pre-generate today's tips for active users
+ * @param {Object} options
+ * @param {Number} options.activeDays - Users who logged in this recently
+ * @param {Number} options.chunkSize - Users read per batch
+ * @param {Number} options.concurrency - Model calls in flight at once
+ * @param {String} options.date - Day to fill (YYYY-MM-DD, default today UTC)
+ * @param {Function} options.onProgress - Called with the running totals
+ * @returns {Promise<Object>} { date, users, groups, cached, skipped, ms }
+ */
+async function pregenerateTips({
+  activeDays = DEFAULT_ACTIVE_DAYS,
+  chunkSize = DEFAULT_CHUNK_SIZE,
+  concurrency = DEFAULT_CONCURRENCY,
+  date = new Date().toISOString().split('T')[0],
+  onProgress = null
+} = {}) {
+  const startedAt = Date.now();
+  const since = new Date(startedAt - activeDays * DAY_MS);
+  const limit = createLimiter(concurrency);
+  const groups = new Map(); // prompt key -> promise of tips | null
+  const totals = { date, users: 0, groups: 0, cached: 0, skipped: 0 };
+
+  const tipsFor = (key, params) => {
+    if (!groups.has(key)) {
+      totals.groups++;
+      groups.set(key, limit(async () => {
+        const result = await tipService.generateTips(`pregen:${date}:${key}`, {
+          name: 'a student',
+          xp: params.xpBand,
+          mood: params.mood,
+          activity: params.activity
+        });
+        return result.source === 'model' ? result.tips : null;
+      }));
+    }
+    return groups.get(key);
+  };
+
+  const processChunk = async (users) => {
+    const userIds = users.map(user => user._id);
+    const [reasons, moods] = await Promise.all([latestReasons(userIds, since), latestMoods(userIds)]);
+    await Promise.all(users.map(async (user) => {
+      const userId = user._id.toString();
+      const params = promptParams(user, reasons.get(userId), moods.get(userId));
+      const tips = await tipsFor(`${params.mood}|${params.xpBand}|${params.activity}`, params);
+      if (!tips) {
+        totals.skipped++;
+        return;
+      }
+      await tipsCache.setTips(userId, date, tips);
+      totals.cached++;
+    }));
+    totals.users += users.length;
+    if (onProgress) onProgress({ ...totals });
+  };
+
+  const cursor = User.find({ lastLogin: { $gte: since } })
+    .select('xp')
+    .lean()
+    .cursor({ batchSize: chunkSize });
+
+  let chunk = [];
+  for await (const user of cursor) {
+    chunk.push(user);
+    if (chunk.length >= chunkSize) {
+      await processChunk(chunk);
+      chunk = [];
+    }
+  }
+  if (chunk.length) await processChunk(chunk);
+
+  return { ...totals, ms: Date.now() - startedAt };
+}
+
+const jobState = { running: false };
+
+async function runJob(options) {
+  if (jobState.running) {
+    console.log('Tip pre-generation skipped: previous run still in progress');
+    return;
+  }
+  jobState.running = true;
+  try {
+    const result = await pregenerateTips(options);
+    console.log(`Tip pre-generation for ${result.date}: ${result.cached}/${result.users} users cached from ${result.groups} prompts in ${result.ms} ms`);
+  } catch (error) {
+    console.error('Tip pre-generation error:', error);
+  } finally {
+    jobState.running = false;
+  }
+}
+
+function msUntilAfterMidnightUTC(delayMinutes) {
+  const next = new Date();
+  next.setUTCHours(0, delayMinutes, 0, 0);
+  if (next <= new Date()) next.setUTCDate(next.getUTCDate() + 1);
+  return next - Date.now();
+}
+
+/**
+ * Schedule the daily run shortly after midnight UTC
+ * @param {Object} options - delayMinutes past midnight, plus pregenerateTips options
+ */
+function scheduleTipPregeneration({ delayMinutes = 5, ...options } = {}) {
+  const scheduleNext = () => {
+    setTimeout(async () => {
+      await runJob(options);
+      scheduleNext();
+    }, msUntilAfterMidnightUTC(delayMinutes)).unref();
+  };
+  scheduleNext();
+  console.log(`Tip pre-generation scheduled: daily at 00:${String(delayMinutes).padStart(2, '0')} UTC`);
+}
+
+module.exports = {
+  activityFromReason,
+  pregenerateTips,
+  scheduleTipPregeneration
+};
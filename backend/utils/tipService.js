@@ -0,0 +1,202 @@
+/**
+ * Tip generation against the text model (Hugging Face inference API)
+ *
+ * - Single-flight: concurrent requests for the same key share one model
+ *   call instead of each missing the cache and calling the model.
+ * - One pooled keep-alive agent per protocol, with a strict timeout on
+ *   every call (TIPS_MODEL_TIMEOUT_MS).
+ * - getTips() waits at most TIPS_MODEL_WAIT_MS; if the model is slower,
+ *   fallback tips are returned right away and the call keeps running in
+ *   the background, handing its tips to onFresh (to fill the cache) when
+ *   it finishes.
+ *
+ * TIPS_MODEL_URL points the service at another endpoint, e.g. the local
+ * stub in benchmarks/tipModelStub.js.
+ */
+const http = require('http');
+const https = require('https');
+const axios = require('axios');
+
+const MODEL_URL = process.env.TIPS_MODEL_URL || 'https://api-inference.huggingface.co/models/google/flan-t5-small';
+const TIMEOUT_MS = parseInt(process.env.TIPS_MODEL_TIMEOUT_MS) || 5000;
+const WAIT_MS = parseInt(process.env.TIPS_MODEL_WAIT_MS) || 1500;
+const MAX_SOCKETS = parseInt(process.env.TIPS_MODEL_MAX_SOCKETS) || 16;
+const XP_BAND_SIZE = parseInt(process.env.TIPS_XP_BAND_SIZE) || 100;
+
+const agentOptions = { keepAlive: true, maxSockets: MAX_SOCKETS, maxFreeSockets: MAX_SOCKETS, timeout: TIMEOUT_MS };
+const modelClient = axios.create({
+  timeout: TIMEOUT_MS,
+  httpAgent: new http.Agent(agentOptions),
+  httpsAgent: new https.Agent(agentOptions),
+  headers: { 'Content-Type': 'application/json' }
+});
+
+const serviceState = {
+  inFlight: new Map(), // key -> promise of { tips, source }
+  stats: {
+    requests: 0,
+    coalesced: 0,
+    modelCalls: 0,
+    modelErrors: 0,
+    cacheWriteErrors: 0,
+    fallbacksServed: 0,
+    backgroundCompleted: 0
+  }
+};
+
+/**
+ * @param {Object} params - { name, xp, mood, activity }
+ * @returns {String} Model prompt
+ */
+function buildPrompt({ name, xp, mood, activity }) {
+  return `You are SmartBuddy, an AI companion for students.
+Generate 3 short motivational or wellness tips (<25 words each)
+personalized for ${name}, XP level ${xp}, feeling ${mood},
+with recent activity ${activity}.
+Keep tone friendly, positive, and helpful.`;
+}
+
+/**
+ * XP range a user falls in, e.g. 100-199
+ * @param {Number} xp - User's XP
+ * @returns {String} Band label
+ */
+function xpBand(xp) {
+  const low = Math.floor(Math.max(Number(xp) || 0, 0) / XP_BAND_SIZE) * XP_BAND_SIZE;
+  return `${low}-${low + XP_BAND_SIZE - 1}`;
+}
+
+/**
+ * Split generated text into up to three tips
+ * @param {String} generatedText - Model output
+ * @returns {Array<String>} Tips (empty if nothing usable)
+ */
+function parseTips(generatedText) {
+  if (!generatedText) return [];
+  // Remove any prefix/suffix text if present
+  const cleanedText = generatedText.replace(/^(You are SmartBuddy[^:]*:)?\s*/i, '').trim();
+  // Try to split by numbers or bullets
+  return cleanedText
+    .split(/\d+\.|[-•]\s*/)
+    .map(tip => tip.trim())
+    .filter(tip => tip.length > 0 && tip.length < 150) // Filter out invalid tips
+    .slice(0, 3); // Limit to 3 tips
+}
+
+/**
+ * Tips used when the model is slow, down or returns nothing usable
+ * @param {Object} params - { name, xp, mood, activity }
+ * @returns {Array<String>} Three tips
+ */
+function fallbackTips({ name, xp, mood, activity }) {
+  return [
+    `Hey ${name}! Keep going strong at level ${xp}! Your perseverance is admirable.`,
+    `Feeling ${mood}? Remember that every challenge is an opportunity to grow. You've got this!`,
+    `Your recent ${activity} is building your success, ${name}. Stay positive and keep moving forward!`
+  ];
+}
+
+/**
+ * One model call
+ * @param {Object} params - { name, xp, mood, activity }
+ * @returns {Promise<Array<String>>} Parsed tips; rejects on error, timeout
+ *   or unusable output
+ */
+async function requestModelTips(params) {
+  serviceState.stats.modelCalls++;
+  const headers = process.env.HF_API_KEY ? { Authorization: `Bearer ${process.env.HF_API_KEY}` } : {};
+  const response = await modelClient.post(MODEL_URL, { inputs: buildPrompt(params) }, { headers });
+  // flan-t5-small returns [{ generated_text }]
+  const tips = parseTips(response.data?.[0]?.generated_text || '');
+  if (tips.length === 0) throw new Error('Model returned no usable tips');
+  return tips;
+}
+
+/**
+ * Generate tips, sharing the call with concurrent requests for the key
+ * @param {String} key - Single-flight key (e.g. the tips cache key)
+ * @param {Object} params - { name, xp, mood, activity }
+ * @param {Object} options
+ * @param {Function} options.onFresh - Called with model tips once they arrive
+ * @returns {Promise<Object>} { tips, source: 'model' | 'fallback' }; never rejects
+ */
+function generateTips(key, params, { onFresh } = {}) {
+  serviceState.stats.requests++;
+  if (serviceState.inFlight.has(key)) {
+    serviceState.stats.coalesced++;
+    return serviceState.inFlight.get(key);
+  }
+  const flight = (async () => {
+    let tips;
+    try {
+      tips = await requestModelTips(params);
+    } catch (error) {
+      serviceState.stats.modelErrors++;
+      console.error('Error calling tips model:', error.message);
+      serviceState.inFlight.delete(key);
+      return { tips: fallbackTips(params), source: 'fallback' };
+    }
+    // The model succeeded: a failed cache write must not discard its tips
+    try {
+      if (onFresh) await onFresh(tips);
+    } catch (error) {
+      serviceState.stats.cacheWriteErrors++;
+      console.error('Tips cache write error:', error.message);
+    } finally {
+      serviceState.inFlight.delete(key);
+    }
+    return { tips, source: 'model' };
+  })();
+  serviceState.inFlight.set(key, flight);
+  return flight;
+}
+
+/**
+ * Model tips if they arrive within waitMs, otherwise fallback tips now
+ * while the model call finishes in the background
+ * @param {String} key - Single-flight key
+ * @param {Object} params - { name, xp, mood, activity }
+ * @param {Object} options
+ * @param {Number} options.waitMs - Longest wait for the model
+ * @param {Function} options.onFresh - Called with model tips once they arrive
+ * @param {Array<String>} options.fallback - Tips to serve instead (default
+ *   fallbackTips(params))
+ * @returns {Promise<Object>} { tips, source: 'model' | 'fallback', pending }
+ */
+async function getTips(key, params, { waitMs = WAIT_MS, onFresh, fallback = fallbackTips(params) } = {}) {
+  const flight = generateTips(key, params, { onFresh });
+  let timer = null;
+  const timedOut = new Promise(resolve => {
+    timer = setTimeout(() => resolve(null), waitMs);
+  });
+  const result = await Promise.race([flight, timedOut]);
+  clearTimeout(timer);
+  if (result && result.source === 'model') return { ...result, pending: false };
+
+  serviceState.stats.fallbacksServed++;
+  if (result) return { tips: fallback, source: 'fallback', pending: false };
+  flight.then(({ source }) => {
+    if (source === 'model') serviceState.stats.backgroundCompleted++;
+  });
+  return { tips: fallback, source: 'fallback', pending: true };
+}
+
+function getTipServiceStats() {
+  return {
+    modelUrl: MODEL_URL,
+    timeoutMs: TIMEOUT_MS,
+    waitMs: WAIT_MS,
+    inFlight: serviceState.inFlight.size,
+    ...serviceState.stats
+  };
+}
+
+module.exports = {
+  xpBand,
+  buildPrompt,
+  parseTips,
+  fallbackTips,
+  generateTips,
+  getTips,
+  getTipServiceStats
+};
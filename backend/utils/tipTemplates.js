@@ -0,0 +1,62 @@
+/**
+ * Tip template library for utils/tipEngine.js
+ *
+ * Each template may narrow itself to moods, XP tiers, branch families
+ * and activities; a field that is left out matches everything. The engine
+ * prefers the most specific templates that match a user.
+ *
+ * Placeholders: {name}, {xp}, {branch}, {activity}
+ *
+ * Vocabularies:
+ *   mood     - happy | neutral | stressed
+ *   tier     - new (<100 XP) | rising (<500) | steady (<1500) | veteran
+ *   branch   - cs (CSE, CSH, CSD, CSA) | ec (ECE, ECI)
+ *   activity - studying | events | connecting | wellness
+ */
+module.exports = [
+  // Mood tips (the original /api/wellness set)
+  { mood: 'happy', text: "Keep it up! Try joining today's AI Workshop 🎯" },
+  { mood: 'happy', text: 'Your positive energy is contagious! Keep spreading the smiles.' },
+  { mood: 'happy', text: 'A great day! Consider helping a friend with their studies.' },
+  { mood: 'neutral', text: 'Take a 10-minute break, you got this.' },
+  { mood: 'neutral', text: 'Every moment is a fresh beginning. Keep going!' },
+  { mood: 'neutral', text: 'Small progress is still progress. Stay steady.' },
+  { mood: 'stressed', text: 'Breathe deeply — focus on one small task at a time.' },
+  { mood: 'stressed', text: "It's okay to take a step back. You're doing your best." },
+  { mood: 'stressed', text: "Remember: this moment will pass. You've overcome challenges before." },
+
+  // Mood and XP tier
+  { mood: 'happy', tier: 'new', text: 'Great start, {name}! Ride this energy into your first study session of the day.' },
+  { mood: 'happy', tier: ['steady', 'veteran'], text: '{xp} XP and smiling, {name}! Share a trick that helped you with someone just starting out.' },
+  { mood: 'neutral', tier: 'new', text: 'Every expert started at zero, {name}. Pick one small goal and tick it off today.' },
+  { mood: 'neutral', tier: 'rising', text: "You're climbing steadily at {xp} XP, {name}. A short focused session will keep the momentum." },
+  { mood: 'neutral', tier: ['steady', 'veteran'], text: 'Steady days build big results, {name}. Review one old topic before starting something new.' },
+  { mood: 'stressed', tier: 'new', text: "New places feel heavy at first, {name}. Reach out to one study buddy - you don't have to do it alone." },
+  { mood: 'stressed', tier: ['rising', 'steady'], text: "You've earned {xp} XP by showing up, {name}. Split today's work into three small pieces." },
+  { mood: 'stressed', tier: 'veteran', text: "You've handled a lot to reach {xp} XP, {name}. Rest is part of the work - take a real break." },
+
+  // Branch family
+  { branch: 'cs', text: 'Stuck on a bug, {name}? Explain it out loud to a friend - rubber-duck debugging works.' },
+  { branch: 'cs', mood: 'happy', text: 'Good mood, good code. Try a quick practice problem while the energy is high, {name}!' },
+  { branch: 'cs', mood: 'stressed', text: 'Step away from the screen for five minutes, {name}. The bug will still be there, and you will see it clearer.' },
+  { branch: 'ec', text: 'Sketch the circuit before you solve it, {name} - a clear diagram makes the maths easier.' },
+  { branch: 'ec', mood: 'happy', text: 'Great day to tinker, {name}! Build or simulate one small circuit from this week\'s lecture.' },
+  { branch: 'ec', mood: 'stressed', text: 'Signals and systems can wait ten minutes, {name}. A short walk will reset your focus.' },
+  { branch: ['cs', 'ec'], tier: 'veteran', text: '{branch} juniors could learn a lot from you, {name}. Consider mentoring one this week.' },
+
+  // Recent activity
+  { activity: 'studying', text: 'Your {activity} is paying off, {name}. Remember to drink water and stretch between sessions.' },
+  { activity: 'studying', mood: 'stressed', text: 'Long study stretch, {name}? Try 25 minutes on, 5 minutes off.' },
+  { activity: 'studying', mood: 'happy', text: 'Studying feels good today, {name}! Lock in what you learned with a quick self-quiz.' },
+  { activity: 'events', text: 'Loved that event, {name}? Follow up with someone you met there.' },
+  { activity: 'events', mood: 'neutral', text: "Check this week's campus events, {name} - one new experience can change the whole week." },
+  { activity: 'connecting', text: 'New connections open doors, {name}. Plan a study session with your latest buddy.' },
+  { activity: 'connecting', mood: 'stressed', text: "Talk it through with a study buddy, {name} - shared problems feel lighter." },
+  { activity: 'wellness', text: 'Checking in with yourself is a strength, {name}. Keep the streak going tomorrow.' },
+  { activity: 'wellness', mood: 'stressed', text: 'Thanks for checking in, {name}. Name one thing that went well today, however small.' },
+
+  // General
+  { text: 'Hey {name}! Keep going strong at {xp} XP. Your perseverance is admirable.' },
+  { text: 'Small steps lead to big achievements, {name}. Keep pushing forward!' },
+  { text: 'Sleep is a study tool too, {name}. Aim for a consistent bedtime tonight.' }
+];
@@ -0,0 +1,288 @@
+/**
+ * Cache of each user's generated tips for the day
+ *
+ * Tiers, checked in order:
+ *   1. In-process LRU, bounded by TIPS_CACHE_MAX_ENTRIES. Keys are also
+ *      grouped by date; tips are only valid for their day, so when the
+ *      date changes whole buckets are dropped at once - no per-entry timers.
+ *   2. Shared store (Redis or the cluster primary) when shared state is
+ *      enabled, so every worker/node sees tips generated by the others.
+ *   3. Optional persistent store, so tips survive restarts and deploys:
+ *      TIPS_CACHE_STORE=mongo  - TipCacheEntry collection with a TTL index
+ *      TIPS_CACHE_STORE=file   - one JSON-lines file per day in
+ *                                TIPS_CACHE_DIR, loaded into the LRU on
+ *                                first use (the newest entries that fit)
+ *
+ * Dates are the YYYY-MM-DD strings used by routes/tips.js.
+ */
+const fs = require('fs');
+const path = require('path');
+const LRUCache = require('./lruCache');
+const { createRedisStore } = require('./cacheStores');
+const { isSharedStateEnabled, getSharedStateClient } = require('./redisConnection');
+
+const MAX_ENTRIES = parseInt(process.env.TIPS_CACHE_MAX_ENTRIES) || 50000;
+const STORE = (process.env.TIPS_CACHE_STORE || '').toLowerCase();
+const CACHE_DIR = process.env.TIPS_CACHE_DIR || path.join(__dirname, '..', '.cache', 'tips');
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+const cacheState = {
+  buckets: new Map(), // date -> Set<key>
+  currentDate: null,  // newest date seen; older buckets are swept
+  shared: null,       // promise of the shared store, or null
+  persistent: null,
+  stats: {
+    memoryHits: 0,
+    sharedHits: 0,
+    persistentHits: 0,
+    misses: 0,
+    sets: 0,
+    sweptBuckets: 0,
+    sweptEntries: 0,
+    sharedErrors: 0,
+    persistentErrors: 0
+  }
+};
+
+function getCacheKey(userId, date) {
+  return `${userId}-${date}`;
+}
+
+function dateOfKey(key) {
+  return key.slice(-10);
+}
+
+function removeFromBucket(key) {
+  const date = dateOfKey(key);
+  const bucket = cacheState.buckets.get(date);
+  if (!bucket) return;
+  bucket.delete(key);
+  if (bucket.size === 0) cacheState.buckets.delete(date);
+}
+
+const memory = new LRUCache({ maxEntries: MAX_ENTRIES, onEvict: removeFromBucket });
+
+function remember(key, value) {
+  const date = dateOfKey(key);
+  memory.set(key, value);
+  if (!cacheState.buckets.has(date)) cacheState.buckets.set(date, new Set());
+  cacheState.buckets.get(date).add(key);
+}
+
+/**
+ * Drop every bucket older than the given date
+ * @param {String} date - Today's date (YYYY-MM-DD)
+ */
+function sweep(date) {
+  if (cacheState.currentDate && date <= cacheState.currentDate) return;
+  cacheState.currentDate = date;
+  for (const [bucketDate, keys] of cacheState.buckets) {
+    if (bucketDate >= date) continue;
+    keys.forEach(key => memory.delete(key));
+    cacheState.buckets.delete(bucketDate);
+    cacheState.stats.sweptBuckets++;
+    cacheState.stats.sweptEntries += keys.size;
+  }
+  if (cacheState.persistent) {
+    cacheState.persistent.sweep(date).catch(handlePersistentError);
+  }
+}
+
+function handlePersistentError(error) {
+  cacheState.stats.persistentErrors++;
+  console.error('Tips cache store error:', error.message);
+}
+
+// Keep shared entries until the end of their day (UTC), plus an hour
+function ttlForDate(date) {
+  return Math.max(new Date(`${date}T00:00:00Z`).getTime() + DAY_MS + 60 * 60 * 1000 - Date.now(), 1000);
+}
+
+/**
+ * The shared store, or null when state isn't shared or it can't connect
+ * (a failed connect is retried on a later call; the tier is skipped)
+ * @returns {Promise<Object|null>}
+ */
+async function getSharedStore() {
+  if (!isSharedStateEnabled()) return null;
+  if (!cacheState.shared) {
+    cacheState.shared = getSharedStateClient().then(client => createRedisStore(client, { prefix: 'smartbuddy:tips:' }));
+    cacheState.shared.catch(() => { cacheState.shared = null; });
+  }
+  try {
+    return await cacheState.shared;
+  } catch (error) {
+    cacheState.stats.sharedErrors++;
+    console.error('Tips cache shared store error:', error.message);
+    return null;
+  }
+}
+
+function createMongoStore() {
+  const TipCacheEntry = require('../models/TipCacheEntry');
+  return {
+    kind: 'mongo',
+    async get(key) {
+      const entry = await TipCacheEntry.findById(key).select('tips date timestamp').lean();
+      return entry ? { tips: entry.tips, date: entry.date, timestamp: entry.timestamp } : undefined;
+    },
+    async set(key, value) {
+      await TipCacheEntry.updateOne(
+        { _id: key },
+        {
+          $set: {
+            userId: key.slice(0, -11),
+            date: value.date,
+            tips: value.tips,
+            timestamp: value.timestamp,
+            expiresAt: new Date(Date.now() + ttlForDate(value.date))
+          }
+        },
+        { upsert: true }
+      );
+    },
+    // The TTL index expires old entries
+    async sweep() {}
+  };
+}
+
+function createFileStore(dir) {
+  const loaded = new Set(); // dates whose file has been read
+  let writing = Promise.resolve();
+  const fileFor = date => path.join(dir, `tips-${date}.jsonl`);
+
+  async function load(date) {
+    if (loaded.has(date)) return;
+    loaded.add(date);
+    let content = '';
+    try {
+      content = await fs.promises.readFile(fileFor(date), 'utf8');
+    } catch (error) {
+      if (error.code !== 'ENOENT') throw error;
+    }
+    content.split('\n').forEach(line => {
+      if (!line) return;
+      try {
+        const { key, value } = JSON.parse(line);
+        remember(key, value);
+      } catch (error) {
+        // A torn last line after a crash; skip it
+      }
+    });
+  }
+
+  return {
+    kind: 'file',
+    async get(key) {
+      await load(dateOfKey(key));
+      return memory.peek(key);
+    },
+    async set(key, value) {
+      const line = JSON.stringify({ key, value }) + '\n';
+      // One append at a time; a failed write doesn't block later ones
+      writing = writing.catch(() => {}).then(async () => {
+        await fs.promises.mkdir(dir, { recursive: true });
+        await fs.promises.appendFile(fileFor(value.date), line);
+      });
+      await writing;
+    },
+    async sweep(date) {
+      let files = [];
+      try {
+        files = await fs.promises.readdir(dir);
+      } catch (error) {
+        if (error.code !== 'ENOENT') throw error;
+      }
+      await Promise.all(files
+        .filter(file => /^tips-\d{4}-\d{2}-\d{2}\.jsonl$/.test(file) && file.slice(5, 15) < date)
+        .map(file => fs.promises.unlink(path.join(dir, file))));
+    }
+  };
+}
+
+if (STORE === 'mongo') cacheState.persistent = createMongoStore();
+else if (STORE === 'file') cacheState.persistent = createFileStore(CACHE_DIR);
+
+/**
+ * Cached tips for a user and day
+ * @param {String} userId - User ID
+ * @param {String} date - Day (YYYY-MM-DD)
+ * @returns {Promise<Object|undefined>} { tips, date, timestamp }
+ */
+async function getTips(userId, date) {
+  sweep(date);
+  const key = getCacheKey(userId, date);
+  const cached = memory.get(key);
+  if (cached !== undefined) {
+    cacheState.stats.memoryHits++;
+    return cached;
+  }
+
+  const shared = await getSharedStore();
+  if (shared) {
+    const value = await shared.get(key);
+    if (value !== undefined) {
+      cacheState.stats.sharedHits++;
+      remember(key, value);
+      return value;
+    }
+  }
+
+  if (cacheState.persistent) {
+    try {
+      const value = await cacheState.persistent.get(key);
+      if (value !== undefined) {
+        cacheState.stats.persistentHits++;
+        remember(key, value);
+        if (shared) await shared.set(key, value, ttlForDate(date));
+        return value;
+      }
+    } catch (error) {
+      handlePersistentError(error);
+    }
+  }
+
+  cacheState.stats.misses++;
+  return undefined;
+}
+
+/**
+ * Cache a user's tips for a day, in every tier
+ * @param {String} userId - User ID
+ * @param {String} date - Day (YYYY-MM-DD)
+ * @param {Array<String>} tips - Generated tips
+ */
+async function setTips(userId, date, tips) {
+  sweep(date);
+  const key = getCacheKey(userId, date);
+  const value = { tips, date, timestamp: Date.now() };
+  cacheState.stats.sets++;
+  remember(key, value);
+
+  const writes = [];
+  const shared = await getSharedStore();
+  if (shared) writes.push(shared.set(key, value, ttlForDate(date)));
+  if (cacheState.persistent) writes.push(cacheState.persistent.set(key, value).catch(handlePersistentError));
+  await Promise.all(writes);
+}
+
+function getTipsCacheStats() {
+  const { memoryHits, sharedHits, persistentHits, misses } = cacheState.stats;
+  const lookups = memoryHits + sharedHits + persistentHits + misses;
+  return {
+    size: memory.size,
+    maxEntries: MAX_ENTRIES,
+    evictions: memory.counters.evictions,
+    buckets: Array.from(cacheState.buckets, ([date, keys]) => ({ date, entries: keys.size })),
+    shared: isSharedStateEnabled(),
+    persistent: cacheState.persistent ? cacheState.persistent.kind : null,
+    ...cacheState.stats,
+    hitRate: lookups === 0 ? 0 : Math.round(((lookups - misses) / lookups) * 10000) / 10000
+  };
+}
+
+module.exports = {
+  getTips,
+  setTips,
+  getTipsCacheStats
+};
@@ -0,0 +1,96 @@
+/**
+ * Bounded min-heap that keeps the best `k` items seen so far.
+ *
+ * The root is always the worst item currently kept, so a new item only has
+ * to beat the root to get in. Pushing n items costs O(n log k) instead of
+ * the O(n log n) of sorting everything and slicing.
+ */
+class TopK {
+  /**
+   * @param {Number} k - Maximum number of items to keep
+   * @param {Function} compare - compare(a, b) > 0 when a ranks above b
+   */
+  constructor(k, compare) {
+    this.k = Math.max(0, k);
+    this.compare = compare;
+    this.items = [];
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  isFull() {
+    return this.items.length >= this.k;
+  }
+
+  /**
+   * Worst item currently kept (undefined when empty)
+   */
+  peek() {
+    return this.items[0];
+  }
+
+  /**
+   * Offer an item to the heap
+   * @returns {Boolean} true if the item was kept
+   */
+  push(item) {
+    if (this.k === 0) return false;
+
+    if (this.items.length < this.k) {
+      this.items.push(item);
+      this.siftUp(this.items.length - 1);
+      return true;
+    }
+
+    if (this.compare(item, this.items[0]) <= 0) return false;
+
+    this.items[0] = item;
+    this.siftDown(0);
+    return true;
+  }
+
+  /**
+   * Merge another heap's items into this one
+   */
+  merge(other) {
+    const items = other instanceof TopK ? other.items : other;
+    for (const item of items) this.push(item);
+    return this;
+  }
+
+  /**
+   * Kept items, best first
+   */
+  toSortedArray() {
+    return this.items.slice().sort((a, b) => this.compare(b, a));
+  }
+
+  siftUp(index) {
+    const { items, compare } = this;
+    while (index > 0) {
+      const parent = (index - 1) >> 1;
+      if (compare(items[index], items[parent]) >= 0) break;
+      [items[index], items[parent]] = [items[parent], items[index]];
+      index = parent;
+    }
+  }
+
+  siftDown(index) {
+    const { items, compare } = this;
+    const length = items.length;
+    for (;;) {
+      const left = index * 2 + 1;
+      const right = left + 1;
+      let smallest = index;
+      if (left < length && compare(items[left], items[smallest]) < 0) smallest = left;
+      if (right < length && compare(items[right], items[smallest]) < 0) smallest = right;
+      if (smallest === index) break;
+      [items[index], items[smallest]] = [items[smallest], items[index]];
+      index = smallest;
+    }
+  }
+}
+
+module.exports = TopK;
@@ -1,7 +1,126 @@
+const mongoose = require('mongoose');
 const User = require('../models/User');
+const XpLedger = require('../models/XpLedger');
+const { invalidatePrincipal } = require('./authCache');
+const leaderboard = require('./leaderboard');
+
+const LEDGER_BATCH_SIZE = parseInt(process.env.XP_LEDGER_BATCH_SIZE) || 200;
+const LEDGER_FLUSH_MS = parseInt(process.env.XP_LEDGER_FLUSH_MS) || 1000;
+// Entries held while the database is unreachable; the oldest go first
+const LEDGER_MAX_BUFFER = parseInt(process.env.XP_LEDGER_MAX_BUFFER) || 50000;
+const LEDGER_MAX_BACKOFF_MS = 60 * 1000;
+const LEDGER_DRAIN_ATTEMPTS = 3;
+
+const ledgerState = {
+  buffer: [],
+  timer: null,
+  failures: 0,   // consecutive failed flushes; drives the retry backoff
+  dropped: 0,
+  writes: new Set() // insertMany calls in flight
+};
+
+function scheduleFlush(delayMs) {
+  if (ledgerState.timer) return;
+  ledgerState.timer = setTimeout(flushXPLedger, delayMs);
+  ledgerState.timer.unref();
+}
+
+function enforceBufferCap() {
+  const overflow = ledgerState.buffer.length - LEDGER_MAX_BUFFER;
+  if (overflow <= 0) return;
+  ledgerState.buffer.splice(0, overflow);
+  ledgerState.dropped += overflow;
+  console.error(`XP ledger buffer full: dropped ${overflow} oldest entries (${ledgerState.dropped} total)`);
+}
+
+// Entries of a failed insertMany that still need writing. Entries carry
+// their own _id, so ones an earlier attempt already wrote come back as
+// duplicate-key errors and count as written.
+function unwrittenEntries(batch, error) {
+  if (!Array.isArray(error.writeErrors)) return batch;
+  return error.writeErrors
+    .filter(writeError => writeError.code !== 11000)
+    .map(writeError => batch[writeError.index])
+    .filter(Boolean);
+}
+
+/**
+ * Write all buffered ledger entries in one insertMany. Entries that fail
+ * go back to the head of the buffer and are retried with backoff.
+ * @returns {Promise<Number>} Number of entries written
+ */
+async function flushXPLedger() {
+  if (ledgerState.timer) {
+    clearTimeout(ledgerState.timer);
+    ledgerState.timer = null;
+  }
+  const batch = ledgerState.buffer.splice(0);
+  if (batch.length === 0) return 0;
+  const write = XpLedger.insertMany(batch, { ordered: false });
+  ledgerState.writes.add(write);
+  try {
+    await write;
+    ledgerState.failures = 0;
+    return batch.length;
+  } catch (error) {
+    const failed = unwrittenEntries(batch, error);
+    ledgerState.buffer.unshift(...failed);
+    enforceBufferCap();
+    if (failed.length === 0) {
+      ledgerState.failures = 0;
+      return batch.length;
+    }
+    ledgerState.failures++;
+    const retryMs = Math.min(LEDGER_FLUSH_MS * 2 ** ledgerState.failures, LEDGER_MAX_BACKOFF_MS);
+    console.error(`Error writing ${failed.length} of ${batch.length} XP ledger entries, retrying in ${retryMs} ms:`, error.message);
+    scheduleFlush(retryMs);
+    return batch.length - failed.length;
+  } finally {
+    ledgerState.writes.delete(write);
+  }
+}
+
+/**
+ * Flush until the buffer is empty or a few attempts failed (shutdown)
+ * @returns {Promise<Number>} Entries left unwritten
+ */
+async function drainXPLedger() {
+  // Failed in-flight writes put their entries back in the buffer
+  await Promise.allSettled(Array.from(ledgerState.writes));
+  for (let attempt = 0; attempt < LEDGER_DRAIN_ATTEMPTS && ledgerState.buffer.length > 0; attempt++) {
+    await flushXPLedger();
+  }
+  if (ledgerState.timer) {
+    clearTimeout(ledgerState.timer);
+    ledgerState.timer = null;
+  }
+  if (ledgerState.buffer.length > 0) {
+    console.error(`XP ledger: ${ledgerState.buffer.length} entries could not be written before exit`);
+  }
+  return ledgerState.buffer.length;
+}
+
+/**
+ * Buffer ledger entries; flushed when the batch fills or after LEDGER_FLUSH_MS
+ * (while writes are failing, only by the retry timer)
+ * @param {Array<Object>} entries - { userId, delta, reason, createdAt }
+ */
+function queueLedgerEntries(entries) {
+  ledgerState.buffer.push(...entries.map(entry => ({ _id: new mongoose.Types.ObjectId(), ...entry })));
+  enforceBufferCap();
+  if (ledgerState.buffer.length >= LEDGER_BATCH_SIZE && ledgerState.failures === 0) {
+    flushXPLedger();
+  } else {
+    scheduleFlush(LEDGER_FLUSH_MS);
+  }
+}
 
 /**
  * Updates user XP and logs the action
+ *
+ * A single atomic $inc that returns the new total, so concurrent awards
+ * never overwrite each other. The ledger entry is written in a batch.
+ *
  * @param {String} userId - The user's ID
  * @param {Number} xpToAdd - Amount of XP to add
  * @param {String} reason - Reason for the XP award
@@ -9,21 +128,21 @@ const User = require('../models/User');
  */
 async function updateXP(userId, xpToAdd, reason) {
   try {
-    // Find the user
-    const user = await User.findById(userId);
+    const user = await User.findOneAndUpdate(
+      { _id: userId },
+      { $inc: { xp: xpToAdd } },
+      { new: true, projection: { name: 1, xp: 1, branch: 1, year: 1 } }
+    ).lean();
     if (!user) {
       throw new Error(`User with ID ${userId} not found`);
     }
 
-    // Add XP
-    user.xp = (user.xp || 0) + xpToAdd;
-    
-    // Save the updated user
-    await user.save();
+    queueLedgerEntries([{ userId: user._id, delta: xpToAdd, reason, createdAt: new Date() }]);
+    leaderboard.upsertUser(user);
+    await invalidatePrincipal(userId);
 
     // Log to console
-    console.log(`Added ${xpToAdd} XP to ${user.name} for ${reason}`);
-    console.log(`User ${user.name} now has ${user.xp} total XP`);
+    console.log(`Added ${xpToAdd} XP to ${user.name} for ${reason} (now ${user.xp} total XP)`);
 
     // Return updated XP
     return user.xp;
@@ -33,5 +152,38 @@ async function updateXP(userId, xpToAdd, reason) {
   }
 }
 
-module.exports = updateXP;
+/**
+ * Apply several XP awards in one bulkWrite (when callers don't need the new totals)
+ * @param {Array<Object>} awards - { userId, xp, reason }
+ * @returns {Promise<void>}
+ */
+async function awardXPBatch(awards) {
+  if (awards.length === 0) return;
+  try {
+    await User.bulkWrite(
+      awards.map(({ userId, xp }) => ({
+        updateOne: { filter: { _id: userId }, update: { $inc: { xp } } }
+      })),
+      { ordered: false }
+    );
+
+    const createdAt = new Date();
+    queueLedgerEntries(awards.map(({ userId, xp, reason }) => ({ userId, delta: xp, reason, createdAt })));
+
+    // Read back the new totals for the leaderboard
+    const userIds = Array.from(new Set(awards.map(({ userId }) => userId.toString())));
+    const totals = await User.find({ _id: { $in: userIds } }).select('xp branch year').lean();
+    totals.forEach(user => leaderboard.upsertUser(user));
+    await Promise.all(userIds.map(invalidatePrincipal));
+
+    console.log(`Applied ${awards.length} XP awards: ${awards.map(a => `${a.xp} for ${a.reason}`).join(', ')}`);
+  } catch (error) {
+    console.error('Error applying XP awards:', error);
+    throw error;
+  }
+}
 
+module.exports = updateXP;
+module.exports.awardXPBatch = awardXPBatch;
+module.exports.flushXPLedger = flushXPLedger;
+module.exports.drainXPLedger = drainXPLedger;
@@ -0,0 +1,58 @@
+const User = require('../models/User');
+const LRUCache = require('./lruCache');
+const stateSync = require('./stateSync');
+
+// userId -> display name, so lists of conversations don't need populate()
+const cache = new LRUCache({
+  maxEntries: parseInt(process.env.USER_NAME_CACHE_MAX_ENTRIES) || 50000,
+  ttlMs: parseInt(process.env.USER_NAME_CACHE_TTL_MS) || 10 * 60 * 1000
+});
+
+/**
+ * Display names for a set of users, loading misses in one query
+ * @param {Array<String>} userIds - User IDs (duplicates allowed)
+ * @returns {Promise<Map>} userId -> name ('' for unknown users)
+ */
+async function getNames(userIds) {
+  const names = new Map();
+  const misses = [];
+  for (const userId of new Set(userIds.map(id => id.toString()))) {
+    const name = cache.get(userId);
+    if (name !== undefined) names.set(userId, name);
+    else misses.push(userId);
+  }
+
+  if (misses.length > 0) {
+    const users = await User.find({ _id: { $in: misses } }).select('name').lean();
+    users.forEach(user => {
+      const userId = user._id.toString();
+      cache.set(userId, user.name || '');
+      names.set(userId, user.name || '');
+    });
+    misses.forEach(userId => {
+      if (!names.has(userId)) names.set(userId, '');
+    });
+  }
+  return names;
+}
+
+/**
+ * Forget a cached name (after a profile rename), in every process
+ * @param {String} userId - User ID
+ */
+function invalidateName(userId) {
+  cache.delete(userId.toString());
+  stateSync.publish('names:invalidate', userId.toString());
+}
+
+stateSync.onSync('names:invalidate', userId => cache.delete(userId));
+
+function getNameCacheStats() {
+  return cache.stats();
+}
+
+module.exports = {
+  getNames,
+  invalidateName,
+  getNameCacheStats
+};
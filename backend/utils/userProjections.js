@@ -0,0 +1,22 @@
+/**
+ * Named field projections for User reads
+ *
+ * Hot read paths select one of these and use .lean(), so password hashes
+ * and the unbounded moodHistory/connections/joinedEvents arrays are only
+ * loaded by routes that actually need them.
+ */
+
+// What authMiddleware attaches as req.user
+const AUTH_CONTEXT = '_id name email skills interests branch year availability xp profileUpdatedAt accountLocked lockUntil';
+
+// What the match engine indexes and returns for a candidate
+const MATCH_CANDIDATE = 'name email branch year availability skills interests';
+
+// What other users may see of a profile
+const PUBLIC_PROFILE = 'name about branch year xp skills interests avatar';
+
+module.exports = {
+  AUTH_CONTEXT,
+  MATCH_CANDIDATE,
+  PUBLIC_PROFILE
+};
@@ -21,7 +21,7 @@ export default function Chat() {
 
   const fetchMessages = async () => {
     try {
-      const { data } = await axios.get(`/api/conversations/${conversationId}/messages?limit=50&skip=0`, {
+      const { data } = await axios.get(`/api/conversations/${conversationId}/messages?limit=50`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       const loaded = data.messages || [];
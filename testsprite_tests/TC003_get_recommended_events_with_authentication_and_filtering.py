@@ -64,30 +64,35 @@ def test_get_recommended_events_with_auth_and_filtering():
         events = auth_resp.json()
         assert isinstance(events, list), "Events response should be a list"
 
-        # Check that events are filtered by user interests (at least one event should match interests)
+        # Each event is a full event object with a relevance score (0-100)
         # We assume each event has "tags" field which is a list of strings
         for event in events:
             assert "date" in event or "datetime" in event or "time" in event, \
                 "Event should have a date/time field"
             assert "tags" in event and isinstance(event["tags"], list), "Event should have tags as a list"
+            assert isinstance(event.get("score"), (int, float)), "Event should have a numeric score"
+            assert 0 <= event["score"] <= 100, f"Score out of range: {event['score']}"
 
-        # Validate events are sorted by date/time ascending
-        def get_event_datetime(ev):
-            for key in ("datetime", "date", "time"):
-                if key in ev:
-                    return ev[key]
-            return None
+        # Validate events are ranked by score, best first
+        scores = [ev["score"] for ev in events]
+        assert scores == sorted(scores, reverse=True), "Events are not sorted by score descending"
 
-        event_datetimes = [get_event_datetime(ev) for ev in events]
-        # Filter out None values (if any event missing date/time)
-        event_datetimes = [dt for dt in event_datetimes if dt is not None]
-        assert event_datetimes == sorted(event_datetimes), "Events are not sorted by date/time ascending"
-
-        # Validate filtering: each event tags intersects with user interests
-        user_interests_set = set(interests)
+        # Validate filtering: each event shares a tag (case-insensitive) with
+        # the user's interests or skills
+        user_tags = {tag.strip().lower() for tag in interests + skills}
         for ev in events:
-            ev_tags = set(ev.get("tags", []))
-            assert ev_tags.intersection(user_interests_set), "Event tags do not match user interests"
+            ev_tags = {tag.strip().lower() for tag in ev.get("tags", [])}
+            assert ev_tags.intersection(user_tags), "Event tags match neither user interests nor skills"
+
+        # Validate paging: a full page comes with a cursor for the next one
+        next_cursor = auth_resp.headers.get("X-Next-Cursor")
+        if next_cursor:
+            next_resp = requests.get(EVENTS_URL, headers=headers_auth, params={"cursor": next_cursor}, timeout=TIMEOUT)
+            assert next_resp.status_code == 200, f"Expected 200 OK for next page, got {next_resp.status_code}"
+            next_events = next_resp.json()
+            assert isinstance(next_events, list), "Next page should be a list"
+            page_ids = {ev.get("_id") for ev in events}
+            assert not page_ids.intersection(ev.get("_id") for ev in next_events), "Pages should not overlap"
     except requests.RequestException as e:
         assert False, f"Authorized events request failed: {e}"
 
@@ -72,22 +72,22 @@ async def run_test():
         await page.wait_for_timeout(3000); await elem.click(timeout=5000)
         
 
-        # -> Send GET request to /api/events with valid JWT token to retrieve events filtered by user interests and sorted by date and time.
+        # -> Send GET request to /api/events with valid JWT token to retrieve events matching user interests or skills, ranked by score.
         await page.goto('http://localhost:3000/api/events', timeout=10000)
         await asyncio.sleep(3)
         
 
-        # -> Send GET request to /api/events with valid JWT token and verify response status, filtering by user interests, and sorting by date and time.
+        # -> Send GET request to /api/events with valid JWT token and verify response status, filtering by user interests or skills, and ranking by score.
         await page.goto('http://localhost:3000/api/events', timeout=10000)
         await asyncio.sleep(3)
         
 
-        # -> Send GET request to /api/events with valid JWT token to verify events filtering by user interests and sorting by date and time.
+        # -> Send GET request to /api/events with valid JWT token to verify events filtering by user interests or skills and ranking by score.
         await page.goto('http://localhost:3000/api/events', timeout=10000)
         await asyncio.sleep(3)
         
 
-        # -> Send GET request to /api/events with valid JWT token and verify response status, filtering by user interests, and sorting by date and time.
+        # -> Send GET request to /api/events with valid JWT token and verify response status, filtering by user interests or skills, and ranking by score.
         frame = context.pages[-1]
         # Click on Events link in navigation bar to check events page or trigger API call
         elem = frame.locator('xpath=html/body/div/div[2]/nav/div/div/div/div/a[2]').nth(0)
@@ -116,6 +116,12 @@ async def run_test():
         await expect(frame.locator('text=2025-11-10').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=4:00 PM').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Hall B').first).to_be_visible(timeout=30000)
+        # Matches the demo user's skills (Node.js) only; listed since events are ranked on interests and skills
+        await expect(frame.locator('text=Node.js API Development').first).to_be_visible(timeout=30000)
+        await expect(frame.locator('text=Build robust REST APIs using Node.js and Express.').first).to_be_visible(timeout=30000)
+        await expect(frame.locator('text=Lab 1').first).to_be_visible(timeout=30000)
+        # Shares no tag with the demo user's interests or skills
+        await expect(frame.locator('text=UI/UX Design Workshop')).to_have_count(0)
         await asyncio.sleep(5)
     
     finally:
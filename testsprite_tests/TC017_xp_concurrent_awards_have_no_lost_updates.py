@@ -0,0 +1,47 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://localhost:5000"
+TIMEOUT = 30
+PARALLEL_AWARDS = 500
+
+def test_xp_concurrent_awards_have_no_lost_updates():
+    login_url = f"{BASE_URL}/api/auth/login"
+    xp_url = f"{BASE_URL}/api/xp"
+    add_url = f"{BASE_URL}/api/xp/add"
+
+    try:
+        login = requests.post(
+            login_url,
+            json={"email": "demo@smartbuddy.com", "password": "Demo123!"},
+            timeout=TIMEOUT
+        )
+        assert login.status_code == 200, f"Expected 200 OK on login, got {login.status_code}"
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {login.json()['token']}"
+        }
+
+        before = requests.get(xp_url, headers=headers, timeout=TIMEOUT)
+        assert before.status_code == 200, f"Expected 200 OK, got {before.status_code}"
+        initial_xp = before.json()["xp"]
+
+        def award(_):
+            return requests.post(add_url, json={"xpToAdd": 1}, headers=headers, timeout=TIMEOUT)
+
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            responses = list(pool.map(award, range(PARALLEL_AWARDS)))
+
+        failed = [r.status_code for r in responses if r.status_code != 200]
+        assert not failed, f"{len(failed)} awards failed: {failed[:5]}"
+
+        after = requests.get(xp_url, headers=headers, timeout=TIMEOUT)
+        assert after.status_code == 200, f"Expected 200 OK, got {after.status_code}"
+        final_xp = after.json()["xp"]
+        assert final_xp == initial_xp + PARALLEL_AWARDS, \
+            f"Lost updates: expected {initial_xp + PARALLEL_AWARDS} XP, got {final_xp}"
+
+    except requests.exceptions.RequestException as e:
+        assert False, f"Request failed with exception: {e}"
+
+test_xp_concurrent_awards_have_no_lost_updates()